@@ -0,0 +1,210 @@
+"""
+Dao Comprehension and Elemental Affinity Vectors for Cultivation Game
+Fixed-index typed storage with a dict-compatible view and a running total
+"""
+
+from array import array
+from collections.abc import Mapping, MutableMapping
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class DaoType(Enum):
+    SWORD = "sword"
+    FIRE = "fire"
+    WATER = "water"
+    EARTH = "earth"
+    WIND = "wind"
+    LIGHTNING = "lightning"
+    ICE = "ice"
+    NATURE = "nature"
+    LIGHT = "light"
+    SHADOW = "shadow"
+    BALANCE = "balance"
+    DESTRUCTION = "destruction"
+
+
+class ElementType(Enum):
+    FIRE = "fire"
+    WATER = "water"
+    EARTH = "earth"
+    AIR = "air"
+    LIGHTNING = "lightning"
+    ICE = "ice"
+    NATURE = "nature"
+    LIGHT = "light"
+    SHADOW = "shadow"
+
+
+def _number(value: float) -> Union[int, float]:
+    """Hand whole numbers back as ints so displays and saves keep their old look"""
+    return int(value) if value.is_integer() else value
+
+
+class AffinityVector(MutableMapping):
+    """
+    Fixed-key vector of comprehension/affinity values
+
+    Values live in a typed array indexed by enum order, and can be accessed
+    with either the string key or the enum member. The sum of all values is
+    maintained on every write, so total() is O(1). The key set is fixed:
+    reading or writing an unknown key raises KeyError, and keys cannot be
+    deleted.
+    """
+
+    __slots__ = ("_values", "_total")
+
+    KEY_TYPE = None
+    KEYS: Tuple[str, ...] = ()
+    _INDEX: Dict[object, int] = {}
+
+    def __init_subclass__(cls, key_type=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if key_type is not None:
+            cls.KEY_TYPE = key_type
+            cls.KEYS = tuple(member.value for member in key_type)
+            cls._INDEX = {}
+            for i, member in enumerate(key_type):
+                cls._INDEX[member] = i
+                cls._INDEX[member.value] = i
+
+    def __init__(self, values: Optional[Mapping] = None):
+        self._values = array('d', bytes(8 * len(self.KEYS)))
+        self._total = 0.0
+        if values:
+            self.update_known(values)
+
+    @classmethod
+    def from_mapping(cls, values: Optional[Mapping]) -> "AffinityVector":
+        """Build a vector from a dict (e.g. save data), ignoring unknown keys"""
+        if isinstance(values, cls):
+            return values
+        return cls(values)
+
+    # ----- dict-compatible view -----
+
+    def __getitem__(self, key) -> Union[int, float]:
+        return _number(self._values[self._INDEX[key]])
+
+    def __setitem__(self, key, value) -> None:
+        index = self._INDEX[key]
+        self._total += value - self._values[index]
+        self._values[index] = value
+
+    def __delitem__(self, key) -> None:
+        raise TypeError(f"{type(self).__name__} has a fixed set of keys")
+
+    def __contains__(self, key) -> bool:
+        return key in self._INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def get(self, key, default=None):
+        index = self._INDEX.get(key)
+        return default if index is None else _number(self._values[index])
+
+    def items(self) -> List[Tuple[str, Union[int, float]]]:
+        return [(key, _number(value)) for key, value in zip(self.KEYS, self._values)]
+
+    def values(self) -> List[Union[int, float]]:
+        return [_number(value) for value in self._values]
+
+    def clear(self) -> None:
+        """Reset every value to zero"""
+        for i in range(len(self._values)):
+            self._values[i] = 0.0
+        self._total = 0.0
+
+    def copy(self) -> "AffinityVector":
+        clone = type(self)()
+        clone._values = array('d', self._values)
+        clone._total = self._total
+        return clone
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        """Plain dict for saving and display"""
+        return dict(self.items())
+
+    # ----- vector operations -----
+
+    def total(self) -> Union[int, float]:
+        """Sum of all values (maintained on every write)"""
+        return _number(self._total)
+
+    def add(self, key, amount: float) -> None:
+        index = self._INDEX[key]
+        self._values[index] += amount
+        self._total += amount
+
+    def update_known(self, values: Mapping, scale: float = 1.0, add: bool = False) -> None:
+        """Set (or add, if add is True) the known keys of a mapping, ignoring the rest"""
+        index_of = self._INDEX.get
+        stored = self._values
+        for key, value in values.items():
+            index = index_of(key)
+            if index is None:
+                continue
+            value *= scale
+            if add:
+                stored[index] += value
+                self._total += value
+            else:
+                self._total += value - stored[index]
+                stored[index] = value
+
+    def add_known(self, bonuses: Mapping, scale: float = 1.0) -> None:
+        """Add a mapping of bonuses (optionally scaled), ignoring unknown keys"""
+        self.update_known(bonuses, scale, add=True)
+
+    @classmethod
+    def bonus_array(cls, bonuses: Mapping, scale: float = 1.0) -> List[Tuple[int, float]]:
+        """Resolve a bonus mapping to (index, amount) pairs once for reuse across vectors"""
+        index_of = cls._INDEX.get
+        resolved = []
+        for key, value in bonuses.items():
+            index = index_of(key)
+            if index is not None and value:
+                resolved.append((index, value * scale))
+        return resolved
+
+    @classmethod
+    def apply_to_all(cls, vectors: Iterable["AffinityVector"], bonuses: Mapping,
+                     scale: float = 1.0) -> None:
+        """Apply the same bonuses to many vectors (e.g. every player in a location)"""
+        resolved = cls.bonus_array(bonuses, scale)
+        if not resolved:
+            return
+        gained = sum(amount for _, amount in resolved)
+        for vector in vectors:
+            stored = vector._values
+            for index, amount in resolved:
+                stored[index] += amount
+            vector._total += gained
+
+
+class DaoComprehension(AffinityVector, key_type=DaoType):
+    """Dao comprehension values for the 12 dao paths"""
+    __slots__ = ()
+
+
+class ElementalAffinities(AffinityVector, key_type=ElementType):
+    """Elemental affinity values for the 9 elements"""
+    __slots__ = ()
+
+
+if __name__ == "__main__":
+    dao = DaoComprehension({"sword": 5, "balance": 3})
+    dao[DaoType.FIRE] += 2.5
+    print(dao)
+    print(f"Total comprehension: {dao.total()}")
+
+    players = [ElementalAffinities() for _ in range(3)]
+    ElementalAffinities.apply_to_all(players, {"fire": 2, "air": 1, "unknown": 5}, scale=0.5)
+    print(players[0].to_dict(), players[0].total())
@@ -0,0 +1,404 @@
+"""
+Cultivation Throughput Benchmarks
+Times the core gameplay loop and gates changes against a stored baseline
+
+Usage:
+    python benchmarks.py                      # run and compare with benchmark_baseline.json
+    python benchmarks.py --update-baseline    # run and store the results as the new baseline
+    python benchmarks.py --only cultivate --iterations 5000
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from cultivation_encounters import SmartEncounterManager, generate_encounter_reward, generate_encounter_rewards
+from player import EnhancedPlayer
+from realm_stage_system import CultivationRealm, RealmStageManager
+from rng import GameRNG
+import save_codec
+from save_store import SaveStore
+from save_system import SaveSystem
+from spirit_stones import (SpiritStoneGrade, SpiritStoneManager, generate_spirit_stone_reward,
+                           generate_spirit_stone_rewards)
+from stone_journal import StoneJournal
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_SEED = 1234
+LONG_HISTORY_DEPTH = 2000
+
+# Regression thresholds, relative to the baseline
+DEFAULT_TOLERANCE = 0.25       # ops/sec may drop and p99 may rise by this fraction
+ALLOCATION_TOLERANCE = 0.50    # peak bytes per op may rise by this fraction
+
+
+# ----- benchmark cases -----
+# Each setup function builds its fixtures and returns the operation to time.
+# Fixtures use a fixed seed so every run measures the same workload.
+
+def _cultivate(focus: str) -> Callable[[], Callable[[], object]]:
+    def setup():
+        player = EnhancedPlayer("Benchmark Cultivator", rng=GameRNG(DEFAULT_SEED))
+        return lambda: player.cultivate_with_choice(focus)
+    return setup
+
+
+def _process_encounter():
+    manager = SmartEncounterManager(rng=GameRNG(DEFAULT_SEED))
+    session = [0]
+
+    def op():
+        session[0] += 1
+        return manager.process_encounter("Foundation Building", 5, [], session[0])
+    return op
+
+
+def _generate_encounter_reward():
+    rng = GameRNG(DEFAULT_SEED)
+    manager = SmartEncounterManager(rng=rng)
+    samples = [(encounter_type.value, encounter)
+               for encounter_type, encounters in manager.encounters.items()
+               for encounter in encounters]
+    index = [0]
+
+    def op():
+        encounter_type, encounter = samples[index[0] % len(samples)]
+        index[0] += 1
+        return generate_encounter_reward(encounter_type, encounter, "Core Formation", rng=rng)
+    return op
+
+
+def _generate_encounter_rewards():
+    rng = GameRNG(DEFAULT_SEED)
+    manager = SmartEncounterManager(rng=rng)
+    batch = [(encounter_type.value, encounter)
+             for encounter_type, encounters in manager.encounters.items()
+             for encounter in encounters]
+
+    def op():
+        return generate_encounter_rewards(batch, "Core Formation", rng=rng)
+    return op
+
+
+def _spirit_stone_rewards(batched: bool):
+    def setup():
+        rng = GameRNG(DEFAULT_SEED)
+        if batched:
+            return lambda: generate_spirit_stone_rewards("Core Formation", 100, rng=rng)
+        return lambda: [generate_spirit_stone_reward("Core Formation", rng=rng) for _ in range(100)]
+    return setup
+
+
+def _pay_cost():
+    manager = SpiritStoneManager()
+    cost = {SpiritStoneGrade.MID: 3, SpiritStoneGrade.LOW: 5}
+
+    def op():
+        # Keep only low-grade stones on hand so every payment goes through conversion
+        manager.add_stones(SpiritStoneGrade.LOW, 40)
+        return manager.pay_cost(cost)
+    return op
+
+
+def _journaled_pay_cost(directory: str):
+    def setup():
+        manager = SpiritStoneManager()
+        manager.attach_journal(StoneJournal(os.path.join(directory, f"stones_{len(os.listdir(directory))}.journal")))
+        cost = {SpiritStoneGrade.MID: 3, SpiritStoneGrade.LOW: 5}
+
+        def op():
+            manager.add_stones(SpiritStoneGrade.LOW, 40, source="benchmark")
+            return manager.pay_cost(cost, label="cure:Benchmark")
+        return op
+    return setup
+
+
+def _save_load(directory: str):
+    def setup():
+        player = EnhancedPlayer("Benchmark Cultivator", rng=GameRNG(DEFAULT_SEED))
+        player.cultivate_batch(500, "balanced")
+        save_system = SaveSystem(os.path.join(directory, "saves"))
+
+        def op():
+            save_system.save_player(player)
+            return save_system.load_player()
+        return op
+    return setup
+
+
+def _save_store(directory: str):
+    def setup():
+        store = SaveStore(os.path.join(directory, "cultivation_saves.db"))
+        players = [EnhancedPlayer(f"Benchmark Cultivator {i}", rng=GameRNG(DEFAULT_SEED + i)) for i in range(50)]
+        for player in players:
+            player.cultivate_batch(100, "balanced")
+            store.save_player(player)
+        index = [0]
+
+        def op():
+            player = players[index[0] % len(players)]
+            index[0] += 1
+            store.save_player(player)
+            return store.load_player(player.name)
+        return op
+    return setup
+
+
+def _save_store_listing(directory: str):
+    def setup():
+        store = SaveStore(os.path.join(directory, "cultivation_saves_listing.db"))
+        for i in range(200):
+            player = EnhancedPlayer(f"Listed Cultivator {i}", rng=GameRNG(DEFAULT_SEED + i))
+            player.cultivate_batch(20 + i, "balanced")
+            store.save_player(player)
+        return lambda: store.list_saves(order_by="progress", limit=20)
+    return setup
+
+
+def _long_history_player() -> EnhancedPlayer:
+    """A player whose every session is kept in a deep history"""
+    player = EnhancedPlayer("Benchmark Cultivator", rng=GameRNG(DEFAULT_SEED), history_depth=LONG_HISTORY_DEPTH)
+    player.cultivate_batch(LONG_HISTORY_DEPTH, "balanced", record_details=True)
+    return player
+
+
+def _save_encode(directory: str, save_format: str):
+    def setup():
+        player = _long_history_player()
+        save_system = SaveSystem(os.path.join(directory, f"saves_{save_format}"), save_format)
+
+        def op():
+            # A fresh history version each call, so the cached section is re-encoded too
+            player.session_history.version += 1
+            return save_system._encode_save(player)
+        return op
+    return setup
+
+
+def _save_decode(directory: str, save_format: str):
+    def setup():
+        player = _long_history_player()
+        save_system = SaveSystem(os.path.join(directory, f"saves_{save_format}"), save_format)
+        data = save_system._encode_save(player)
+        if save_format == "binary":
+            decode = lambda: save_codec.loads(data)[0]
+        else:
+            decode = lambda: json.loads(data.decode("utf-8"))
+        return lambda: save_system.dict_to_enhanced_player(decode(), rng=GameRNG(DEFAULT_SEED))
+    return setup
+
+
+def _breakthrough_rate():
+    manager = RealmStageManager(rng=GameRNG(DEFAULT_SEED))
+    realms = list(CultivationRealm)
+    bonus = {"pill": 0.05, "technique": 0.02}
+    index = [0]
+
+    def op():
+        realm = realms[index[0] % len(realms)]
+        index[0] += 1
+        return manager.calculate_breakthrough_success_rate(realm, 80, bonus)
+    return op
+
+
+def build_benchmarks(work_directory: str) -> Dict[str, Callable[[], Callable[[], object]]]:
+    """Get every benchmark case keyed by name"""
+    return {
+        "cultivate_with_choice.balanced": _cultivate("balanced"),
+        "cultivate_with_choice.aggressive": _cultivate("aggressive"),
+        "cultivate_with_choice.foundation": _cultivate("foundation"),
+        "process_encounter": _process_encounter,
+        "generate_encounter_reward": _generate_encounter_reward,
+        "generate_encounter_rewards.batch": _generate_encounter_rewards,
+        "spirit_stone_rewards.x100": _spirit_stone_rewards(False),
+        "spirit_stone_rewards.x100.batch": _spirit_stone_rewards(True),
+        "pay_cost": _pay_cost,
+        "pay_cost.journaled": _journaled_pay_cost(work_directory),
+        "save_load": _save_load(work_directory),
+        "save_store.save_load": _save_store(work_directory),
+        "save_store.list_saves": _save_store_listing(work_directory),
+        "save_encode.json.long_history": _save_encode(work_directory, "json"),
+        "save_encode.binary.long_history": _save_encode(work_directory, "binary"),
+        "save_decode.json.long_history": _save_decode(work_directory, "json"),
+        "save_decode.binary.long_history": _save_decode(work_directory, "binary"),
+        "calculate_breakthrough_success_rate": _breakthrough_rate,
+    }
+
+
+# Save/load touches the disk, so it gets far fewer iterations than in-memory cases
+ITERATION_SCALE = {"save_load": 0.02, "save_store.save_load": 0.1}
+ITERATION_SCALE.update({f"save_{step}.{save_format}.long_history": 0.1
+                        for step in ("encode", "decode") for save_format in ("json", "binary")})
+
+
+# ----- measurement -----
+
+def _percentile(ordered: List[int], percent: float) -> int:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(0, min(len(ordered) - 1, -(-len(ordered) * percent // 100) - 1))
+    return ordered[int(rank)]
+
+
+def run_benchmark(setup: Callable[[], Callable[[], object]], iterations: int,
+                  warmup: int, allocation_samples: int) -> Dict:
+    """
+    Time one benchmark case
+
+    Latency is measured per call with the garbage collector disabled. Allocation
+    figures come from a separate tracemalloc pass so tracing overhead does not
+    distort the timings.
+    """
+    op = setup()
+    for _ in range(warmup):
+        op()
+
+    timings = [0] * iterations
+    clock = time.perf_counter_ns
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = clock()
+        for i in range(iterations):
+            t0 = clock()
+            op()
+            timings[i] = clock() - t0
+        elapsed = clock() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # Allocation pass on a fresh fixture
+    op = setup()
+    for _ in range(min(warmup, 10)):
+        op()
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        start_current, _ = tracemalloc.get_traced_memory()
+        for _ in range(allocation_samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (elapsed / 1e9), 1),
+        "mean_us": round(sum(timings) / iterations / 1000, 3),
+        "p50_us": round(_percentile(timings, 50) / 1000, 3),
+        "p99_us": round(_percentile(timings, 99) / 1000, 3),
+        "peak_bytes_per_op": round(peak_total / allocation_samples, 1),
+        "retained_bytes_per_op": round((end_current - start_current) / allocation_samples, 1),
+    }
+
+
+def run_all(iterations: int = 2000, warmup: int = 100, allocation_samples: int = 200,
+            only: Optional[List[str]] = None, output=None) -> Dict:
+    """Run the selected benchmarks and return the results document"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="cultivation_bench_") as work_directory:
+        for name, setup in build_benchmarks(work_directory).items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            scale = ITERATION_SCALE.get(name, 1.0)
+            case_iterations = max(10, int(iterations * scale))
+            results[name] = run_benchmark(
+                setup, case_iterations, max(1, int(warmup * scale)),
+                max(5, min(allocation_samples, case_iterations))
+            )
+            if output is not None:
+                r = results[name]
+                print(f"{name:<40}{r['ops_per_sec']:>12,.0f}/s{r['p50_us']:>11.1f}us"
+                      f"{r['p99_us']:>11.1f}us{r['peak_bytes_per_op']:>12,.0f}B", file=output, flush=True)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE,
+                        allocation_tolerance: float = ALLOCATION_TOLERANCE) -> List[str]:
+    """Get a list of regression descriptions (empty when everything is within tolerance)"""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['ops_per_sec']:,.0f}/s "
+                               f"vs baseline {base['ops_per_sec']:,.0f}/s")
+        # Sub-microsecond cases have noisy tails, so p99 also needs a small absolute rise
+        if result["p99_us"] > max(base["p99_us"] * (1 + tolerance), base["p99_us"] + 5):
+            regressions.append(f"{name}: p99 latency {result['p99_us']:.1f}us "
+                               f"vs baseline {base['p99_us']:.1f}us")
+        if result["peak_bytes_per_op"] > max(base["peak_bytes_per_op"] * (1 + allocation_tolerance),
+                                             base["peak_bytes_per_op"] + 256):
+            regressions.append(f"{name}: peak allocation {result['peak_bytes_per_op']:,.0f}B/op "
+                               f"vs baseline {base['peak_bytes_per_op']:,.0f}B/op")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Cultivation throughput benchmarks")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=100, help="Untimed calls before measuring")
+    parser.add_argument("--allocation-samples", type=int, default=200, help="Calls traced by tracemalloc")
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--output", help="Write the results JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative throughput/latency regression")
+    args = parser.parse_args(argv)
+
+    print(f"{'Benchmark':<40}{'throughput':>14}{'p50':>13}{'p99':>13}{'peak alloc':>13}")
+    current = run_all(args.iterations, args.warmup, args.allocation_samples, args.only, output=sys.stdout)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n📊 Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(current, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+
+    print("\n✅ No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -230,13 +230,13 @@ never crumble.
         for bonus in background.starting_bonuses:
             if bonus.type == "spirit_stones_low":
                 # Use your SpiritStoneManager's add_stones method
-                player.spirit_stones.add_stones(SpiritStoneGrade.LOW, int(bonus.value))
+                player.spirit_stones.add_stones(SpiritStoneGrade.LOW, int(bonus.value), source="background")
             elif bonus.type == "spirit_stones_mid":
-                player.spirit_stones.add_stones(SpiritStoneGrade.MID, int(bonus.value))
+                player.spirit_stones.add_stones(SpiritStoneGrade.MID, int(bonus.value), source="background")
             elif bonus.type == "spirit_stones_high":
-                player.spirit_stones.add_stones(SpiritStoneGrade.HIGH, int(bonus.value))
+                player.spirit_stones.add_stones(SpiritStoneGrade.HIGH, int(bonus.value), source="background")
             elif bonus.type == "spirit_stones_peak":
-                player.spirit_stones.add_stones(SpiritStoneGrade.PEAK, int(bonus.value))
+                player.spirit_stones.add_stones(SpiritStoneGrade.PEAK, int(bonus.value), source="background")
             elif bonus.type == "foundation_quality":
                 player.foundation_quality += bonus.value
             elif bonus.type == "max_experience":
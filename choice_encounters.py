@@ -3,519 +3,155 @@ Choice-Based Encounter System for Cultivation Game
 Gives players meaningful decisions during encounters
 """
 
-import random
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from encounter_packs import load_pack
+from frozen_data import freeze, thaw
+from rng import GameRNG, default_rng
+from sampling import AliasSampler, trials_until_success
+from spirit_stones import SpiritStoneGrade, SpiritStoneManager
+
+PROBABILITY_TOLERANCE = 1e-6
+
+DEFAULT_CHOICE_RARITY_WEIGHTS = {"common": 0.5, "uncommon": 0.3, "rare": 0.15, "very_rare": 0.05}
+
+# Rarity weights of choice encounters per realm (other realms use FALLBACK_CHOICE_RARITY_WEIGHTS)
+REALM_CHOICE_RARITY_WEIGHTS = {
+    "Body Tempering": {"common": 0.7, "uncommon": 0.2, "rare": 0.1},
+    "Qi Gathering": {"common": 0.6, "uncommon": 0.3, "rare": 0.1},
+    "Foundation Building": {"common": 0.4, "uncommon": 0.4, "rare": 0.2},
+    "Core Formation": {"common": 0.3, "uncommon": 0.4, "rare": 0.25, "very_rare": 0.05},
+    "Nascent Soul": {"common": 0.2, "uncommon": 0.3, "rare": 0.4, "very_rare": 0.1}
+}
+FALLBACK_CHOICE_RARITY_WEIGHTS = {"common": 0.5, "uncommon": 0.3, "rare": 0.2}
+
+# Numeric outcome metrics used for expected value / variance reports
+OUTCOME_METRICS = ("experience", "foundation", "dao_comprehension", "elemental_affinity",
+                   "spirit_stones", "breakthrough_bonus", "tribulation_resistance", "negative_effect")
+
+
+def outcome_metrics(outcome: Mapping) -> Dict[str, float]:
+    """Reduce one outcome to numbers (dao/elemental gains summed, stones in low-grade value)"""
+    metrics = dict.fromkeys(OUTCOME_METRICS, 0.0)
+    for effect_type, effect_value in outcome.items():
+        if effect_type in ("experience", "foundation", "breakthrough_bonus", "tribulation_resistance"):
+            metrics[effect_type] = float(effect_value)
+        elif effect_type in ("dao_comprehension", "elemental_affinity"):
+            metrics[effect_type] = float(sum(effect_value.values()))
+        elif effect_type == "spirit_stones":
+            metrics[effect_type] = float(sum(
+                SpiritStoneManager.EXCHANGE_RATES[SpiritStoneGrade[grade_name.upper()]] * amount
+                for grade_name, amount in effect_value.items()
+            ))
+        elif effect_type == "negative_effect":
+            metrics[effect_type] = 1.0
+    return metrics
+
+
+def _mean_and_variance(weighted_values: List[Tuple[float, float]]) -> Dict[str, float]:
+    """Mean and variance of a discrete distribution given (weight, value) pairs with weights summing to 1"""
+    mean = sum(weight * value for weight, value in weighted_values)
+    variance = sum(weight * (value - mean) ** 2 for weight, value in weighted_values)
+    return {"mean": mean, "variance": variance}
+
 
 class EncounterChoice:
+    """
+    One option of a choice encounter
+    
+    The outcome probabilities are validated and compiled into a cumulative
+    distribution when the choice is created, so resolving an outcome is a
+    single bisect.
+    """
+    __slots__ = ("description", "consequences", "risk_level", "outcome_names", "_cumulative")
+    
     def __init__(self, description: str, consequences: Dict, risk_level: str = "medium"):
         self.description = description
-        self.consequences = consequences  # Dict of possible outcomes
+        self.consequences = freeze(consequences)  # Read-only mapping of possible outcomes
         self.risk_level = risk_level  # low, medium, high
+        self._compile_outcomes()
+    
+    def _compile_outcomes(self) -> None:
+        names = []
+        cumulative = []
+        total = 0.0
+        for name, outcome in self.consequences.items():
+            probability = outcome.get("probability")
+            if not isinstance(probability, (int, float)) or probability < 0:
+                raise ValueError(f"Outcome '{name}' of choice '{self.description}' needs a probability of at least 0")
+            if probability == 0:
+                continue  # Can never happen
+            total += probability
+            names.append(name)
+            cumulative.append(total)
+        
+        if abs(total - 1.0) > PROBABILITY_TOLERANCE:
+            raise ValueError(f"Outcome probabilities of choice '{self.description}' sum to {total:g}, not 1")
+        
+        cumulative[-1] = 1.0  # Absorb rounding so every roll in [0, 1) resolves
+        self.outcome_names: Tuple[str, ...] = tuple(names)
+        self._cumulative: Tuple[float, ...] = tuple(cumulative)
+    
+    def resolve(self, roll: float) -> Tuple[str, Mapping]:
+        """Outcome name and data for a uniform roll in [0, 1)"""
+        name = self.outcome_names[bisect_left(self._cumulative, roll)]
+        return name, self.consequences[name]
+    
+    def outcome_probabilities(self) -> Dict[str, float]:
+        probabilities = {}
+        previous = 0.0
+        for name, cumulative in zip(self.outcome_names, self._cumulative):
+            probabilities[name] = cumulative - previous
+            previous = cumulative
+        return probabilities
+    
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """Exact expected value and variance of each outcome metric"""
+        per_outcome = [(probability, outcome_metrics(self.consequences[name]))
+                       for name, probability in self.outcome_probabilities().items()]
+        return {metric: _mean_and_variance([(p, metrics[metric]) for p, metrics in per_outcome])
+                for metric in OUTCOME_METRICS}
 
-@dataclass
+@dataclass(frozen=True)
 class ChoiceEncounter:
     name: str
     description: str
-    choices: List[EncounterChoice]
+    choices: Tuple[EncounterChoice, ...]
     rarity: str
     context: str  # Additional context for immersion
+    
+    def __post_init__(self):
+        object.__setattr__(self, "choices", tuple(self.choices))
 
 class ChoiceEncounterManager:
     """Manages choice-based encounters with meaningful decisions"""
     
-    def __init__(self):
-        self.choice_encounters = self._initialize_choice_encounters()
+    def __init__(self, rng: Optional[GameRNG] = None):
+        self.rng = rng if rng is not None else default_rng()
+        self.choice_encounters = choice_encounter_catalog()  # Shared by every manager
         self.last_choice_made = None
     
-    def _initialize_choice_encounters(self) -> List[ChoiceEncounter]:
-        """Initialize all choice-based encounters"""
-        encounters = []
-        
-        # Foundation Building Encounters
-        encounters.append(ChoiceEncounter(
-            name="Ancient Foundation Pill",
-            description="You discover an ancient pill glowing with spiritual energy. Its power could strengthen your foundation, but ancient pills are unpredictable.",
-            context="The pill emanates a faint aura of bygone eras. Will you risk consumption?",
-            rarity="uncommon",
-            choices=[
-                EncounterChoice(
-                    "🌟 Consume the pill immediately",
-                    {
-                        "success": {
-                            "probability": 0.7,
-                            "foundation": 15,
-                            "message": "The ancient pill strengthens your foundation significantly!"
-                        },
-                        "failure": {
-                            "probability": 0.3,
-                            "negative_effect": {
-                                'name': 'Pill Poisoning',
-                                'type': 'negative',
-                                'description': 'Ancient pill caused spiritual poisoning',
-                                'exp_multiplier': 0.8,
-                                'remaining_duration': 5
-                            },
-                            "message": "The ancient pill was corrupted! You suffer from spiritual poisoning."
-                        }
-                    },
-                    "high"
-                ),
-                EncounterChoice(
-                    "🧪 Study the pill carefully first",
-                    {
-                        "success": {
-                            "probability": 0.9,
-                            "foundation": 8,
-                            "dao_comprehension": {"balance": 2},
-                            "message": "Careful study reveals the pill's secrets and safely grants benefits."
-                        },
-                        "partial": {
-                            "probability": 0.1,
-                            "foundation": 3,
-                            "message": "Your study reveals the pill is too degraded to be safely useful."
-                        }
-                    },
-                    "low"
-                ),
-                EncounterChoice(
-                    "💰 Preserve it as a valuable treasure",
-                    {
-                        "success": {
-                            "probability": 1.0,
-                            "spirit_stones": {"mid": 3, "high": 1},
-                            "message": "You preserve the pill as a treasure, sensing its future value."
-                        }
-                    },
-                    "low"
-                )
-            ]
-        ))
-        
-        # Elemental Awakening Encounter
-        encounters.append(ChoiceEncounter(
-            name="Elemental Spirit Convergence",
-            description="Multiple elemental spirits gather around you, each offering to share their essence. You can only accept one offering.",
-            context="Fire crackles, water flows, earth rumbles, and wind whispers. Each spirit awaits your choice.",
-            rarity="rare",
-            choices=[
-                EncounterChoice(
-                    "🔥 Accept the Fire Spirit's offering",
-                    {
-                        "success": {
-                            "probability": 1.0,
-                            "elemental_affinity": {"fire": 12},
-                            "dao_comprehension": {"fire": 3},
-                            "message": "Fire spirit essence awakens your inner flame!"
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "💧 Accept the Water Spirit's offering",
-                    {
-                        "success": {
-                            "probability": 1.0,
-                            "elemental_affinity": {"water": 12},
-                            "dao_comprehension": {"water": 3},
-                            "message": "Water spirit essence flows through your meridians!"
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "🌍 Accept the Earth Spirit's offering", 
-                    {
-                        "success": {
-                            "probability": 1.0,
-                            "elemental_affinity": {"earth": 12},
-                            "foundation": 8,
-                            "message": "Earth spirit essence solidifies your foundation!"
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "💨 Accept the Wind Spirit's offering",
-                    {
-                        "success": {
-                            "probability": 1.0,
-                            "elemental_affinity": {"air": 12},
-                            "experience": 20,
-                            "message": "Wind spirit essence accelerates your cultivation!"
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "⚖️ Try to balance all four elements",
-                    {
-                        "success": {
-                            "probability": 0.4,
-                            "elemental_affinity": {"fire": 5, "water": 5, "earth": 5, "air": 5},
-                            "dao_comprehension": {"balance": 8},
-                            "message": "You achieve perfect elemental balance! A rare feat!"
-                        },
-                        "failure": {
-                            "probability": 0.6,
-                            "negative_effect": {
-                                'name': 'Elemental Chaos',
-                                'type': 'negative',
-                                'description': 'Conflicting elements disrupt your cultivation',
-                                'exp_multiplier': 0.7,
-                                'remaining_duration': 8
-                            },
-                            "message": "The conflicting elements create chaos in your spiritual body!"
-                        }
-                    },
-                    "high"
-                )
-            ]
-        ))
-        
-        # Dao Insight Encounter
-        encounters.append(ChoiceEncounter(
-            name="Mysterious Dao Monument",
-            description="An ancient stone monument covered in mysterious symbols appears before you. Each symbol resonates with different aspects of the Dao.",
-            context="The monument hums with ancient wisdom. Different sections glow faintly, each representing a path of understanding.",
-            rarity="uncommon",
-            choices=[
-                EncounterChoice(
-                    "⚔️ Study the Sword Dao inscriptions",
-                    {
-                        "success": {
-                            "probability": 0.8,
-                            "dao_comprehension": {"sword": 5},
-                            "message": "The sword dao inscriptions reveal the path of sharpness and precision!"
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "message": "The sword dao mysteries remain beyond your current understanding."
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "🌿 Study the Nature Dao inscriptions",
-                    {
-                        "success": {
-                            "probability": 0.8,
-                            "dao_comprehension": {"nature": 5},
-                            "foundation": 5,
-                            "message": "The nature dao inscriptions teach you harmony with the natural world!"
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "message": "The nature dao concepts slip away like morning mist."
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "💀 Study the Destruction Dao inscriptions",
-                    {
-                        "success": {
-                            "probability": 0.6,
-                            "dao_comprehension": {"destruction": 8},
-                            "experience": 25,
-                            "message": "The destruction dao reveals the power to unmake and reshape!"
-                        },
-                        "failure": {
-                            "probability": 0.4,
-                            "negative_effect": {
-                                'name': 'Dao Backlash',
-                                'type': 'negative', 
-                                'description': 'Destruction dao damaged your spiritual stability',
-                                'exp_multiplier': 0.85,
-                                'remaining_duration': 6
-                            },
-                            "message": "The destruction dao proves too volatile for your current level!"
-                        }
-                    },
-                    "high"
-                ),
-                EncounterChoice(
-                    "📚 Try to comprehend all inscriptions",
-                    {
-                        "success": {
-                            "probability": 0.3,
-                            "dao_comprehension": {"sword": 2, "nature": 2, "destruction": 2, "balance": 4},
-                            "message": "Your broad understanding grants insight into the interconnection of all Dao!"
-                        },
-                        "partial": {
-                            "probability": 0.5,
-                            "dao_comprehension": {"balance": 2},
-                            "message": "You gain some understanding of dao balance, but the deeper mysteries elude you."
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "negative_effect": {
-                                'name': 'Mental Exhaustion',
-                                'type': 'negative',
-                                'description': 'Overextending your comprehension causes mental fatigue',
-                                'exp_multiplier': 0.9,
-                                'remaining_duration': 4
-                            },
-                            "message": "Attempting to grasp too much leaves your mind exhausted."
-                        }
-                    },
-                    "high"
-                )
-            ]
-        ))
-        
-        # Resource Gathering Encounter
-        encounters.append(ChoiceEncounter(
-            name="Spirit Stone Mine Discovery",
-            description="You discover a small spirit stone mine with visible veins of spiritual energy. However, the mine seems unstable and dangerous to extract from.",
-            context="Glowing crystals peek through rock crevices. You sense both opportunity and danger in the unstable formations.",
-            rarity="common",
-            choices=[
-                EncounterChoice(
-                    "⛏️ Mine aggressively for maximum yield",
-                    {
-                        "success": {
-                            "probability": 0.6,
-                            "spirit_stones": {"low": 8, "mid": 3, "high": 1},
-                            "message": "Aggressive mining yields a rich haul of spirit stones!"
-                        },
-                        "failure": {
-                            "probability": 0.4,
-                            "spirit_stones": {"low": 2},
-                            "negative_effect": {
-                                'name': 'Mining Injuries',
-                                'type': 'negative',
-                                'description': 'Cave-in caused physical injuries affecting cultivation',
-                                'exp_multiplier': 0.8,
-                                'remaining_duration': 6
-                            },
-                            "message": "The mine collapses! You escape with injuries and few stones."
-                        }
-                    },
-                    "high"
-                ),
-                EncounterChoice(
-                    "🎯 Mine carefully and safely",
-                    {
-                        "success": {
-                            "probability": 0.9,
-                            "spirit_stones": {"low": 5, "mid": 1},
-                            "message": "Careful mining yields a modest but safe harvest."
-                        },
-                        "failure": {
-                            "probability": 0.1,
-                            "spirit_stones": {"low": 1},
-                            "message": "Even careful mining yields little from the depleted veins."
-                        }
-                    },
-                    "low"
-                ),
-                EncounterChoice(
-                    "🔍 Study the formation first",
-                    {
-                        "success": {
-                            "probability": 0.8,
-                            "spirit_stones": {"low": 3, "mid": 2},
-                            "dao_comprehension": {"earth": 2},
-                            "message": "Understanding the formation improves your extraction and earth dao insight!"
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "dao_comprehension": {"earth": 1},
-                            "message": "Your study reveals the formation's nature but yields little material reward."
-                        }
-                    },
-                    "medium"
-                )
-            ]
-        ))
-        
-        # Breakthrough Assistance Encounter
-        encounters.append(ChoiceEncounter(
-            name="Senior Cultivator's Guidance",
-            description="A mysterious senior cultivator observes your cultivation and offers guidance. Their aura suggests immense power, but their intentions are unclear.",
-            context="The senior's eyes seem to see through your very soul. They speak little but their presence radiates ancient wisdom.",
-            rarity="rare",
-            choices=[
-                EncounterChoice(
-                    "🙏 Humbly request breakthrough guidance",
-                    {
-                        "success": {
-                            "probability": 0.8,
-                            "foundation": 10,
-                            "breakthrough_bonus": 0.15,  # 15% better breakthrough success rate
-                            "dao_comprehension": {"balance": 3},
-                            "message": "The senior imparts valuable insights about breakthrough principles!"
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "message": "The senior finds you unprepared and offers no guidance."
-                        }
-                    },
-                    "low"
-                ),
-                EncounterChoice(
-                    "⚔️ Challenge them to test your strength",
-                    {
-                        "success": {
-                            "probability": 0.3,
-                            "experience": 50,
-                            "dao_comprehension": {"sword": 5, "destruction": 3},
-                            "foundation": 8,
-                            "message": "Your boldness impresses the senior! They spar with you and you learn much!"
-                        },
-                        "failure": {
-                            "probability": 0.7,
-                            "negative_effect": {
-                                'name': 'Cultivation Setback',
-                                'type': 'negative',
-                                'description': 'Overwhelming defeat shakes your confidence',
-                                'exp_multiplier': 0.7,
-                                'remaining_duration': 10
-                            },
-                            "message": "The senior easily defeats you, leaving you humbled and shaken."
-                        }
-                    },
-                    "high"
-                ),
-                EncounterChoice(
-                    "🤝 Offer to exchange insights",
-                    {
-                        "success": {
-                            "probability": 0.6,
-                            "dao_comprehension": {"balance": 2, "wisdom": 3},
-                            "spirit_stones": {"mid": 2},
-                            "message": "A mutual exchange of insights benefits both of you!"
-                        },
-                        "partial": {
-                            "probability": 0.3,
-                            "dao_comprehension": {"balance": 1},
-                            "message": "You share insights, though you gain less than you give."
-                        },
-                        "failure": {
-                            "probability": 0.1,
-                            "message": "The senior finds your insights lacking and departs without exchange."
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "👁️ Observe them secretly to learn",
-                    {
-                        "success": {
-                            "probability": 0.5,
-                            "dao_comprehension": {"shadow": 4, "balance": 2},
-                            "experience": 15,
-                            "message": "Silent observation teaches you about stealth and the senior's techniques!"
-                        },
-                        "failure": {
-                            "probability": 0.5,
-                            "negative_effect": {
-                                'name': 'Senior\'s Displeasure',
-                                'type': 'negative',
-                                'description': 'The senior noticed your spying and is displeased',
-                                'exp_multiplier': 0.85,
-                                'remaining_duration': 7
-                            },
-                            "message": "The senior detects your observation and expresses their displeasure!"
-                        }
-                    },
-                    "medium"
-                )
-            ]
-        ))
-        
-        # Tribulation Training Encounter
-        encounters.append(ChoiceEncounter(
-            name="Natural Lightning Formation",
-            description="You encounter a natural formation where lightning constantly strikes. This could be dangerous tribulation training or a deadly trap.",
-            context="Lightning arcs between ancient conductors, creating a natural tribulation chamber. The air crackles with power.",
-            rarity="uncommon",
-            choices=[
-                EncounterChoice(
-                    "⚡ Train directly in the lightning",
-                    {
-                        "success": {
-                            "probability": 0.4,
-                            "foundation": 15,
-                            "elemental_affinity": {"lightning": 10},
-                            "tribulation_resistance": 0.1,  # 10% better tribulation resistance
-                            "message": "Lightning tempering strengthens your body and spirit dramatically!"
-                        },
-                        "failure": {
-                            "probability": 0.6,
-                            "negative_effect": {
-                                'name': 'Lightning Scars',
-                                'type': 'negative',
-                                'description': 'Lightning damage impairs cultivation efficiency',
-                                'exp_multiplier': 0.6,
-                                'remaining_duration': 12
-                            },
-                            "foundation": -5,
-                            "message": "The lightning proves too powerful! You escape scarred and weakened."
-                        }
-                    },
-                    "high"
-                ),
-                EncounterChoice(
-                    "🛡️ Train at the formation's edge",
-                    {
-                        "success": {
-                            "probability": 0.8,
-                            "foundation": 6,
-                            "elemental_affinity": {"lightning": 5},
-                            "dao_comprehension": {"lightning": 2},
-                            "message": "Cautious training at the edge provides steady improvement!"
-                        },
-                        "failure": {
-                            "probability": 0.2,
-                            "negative_effect": {
-                                'name': 'Minor Lightning Burns',
-                                'type': 'negative',
-                                'description': 'Minor electrical damage reduces cultivation speed',
-                                'exp_multiplier': 0.9,
-                                'remaining_duration': 4
-                            },
-                            "message": "Even at the edge, stray lightning causes minor injuries."
-                        }
-                    },
-                    "medium"
-                ),
-                EncounterChoice(
-                    "📚 Study the formation's principles",
-                    {
-                        "success": {
-                            "probability": 0.9,
-                            "dao_comprehension": {"lightning": 4, "balance": 2},
-                            "experience": 20,
-                            "message": "Understanding the formation's principles advances your theoretical knowledge!"
-                        },
-                        "failure": {
-                            "probability": 0.1,
-                            "message": "The formation's complexity exceeds your current understanding."
-                        }
-                    },
-                    "low"
-                )
-            ]
-        ))
-        
-        return encounters
-    
     def get_random_choice_encounter(self, rarity_weights: Dict[str, float] = None) -> Optional[ChoiceEncounter]:
-        """Get a random choice encounter based on rarity weights"""
-        if rarity_weights is None:
-            rarity_weights = {"common": 0.5, "uncommon": 0.3, "rare": 0.15, "very_rare": 0.05}
+        """
+        Get a random choice encounter based on rarity weights
         
-        # Filter encounters by rarity
-        available_encounters = []
-        for encounter in self.choice_encounters:
-            weight = rarity_weights.get(encounter.rarity, 0)
-            if weight > 0 and random.random() < weight:
-                available_encounters.append(encounter)
-        
-        return random.choice(available_encounters) if available_encounters else None
+        Each rarity is picked in proportion to its weight (among rarities the
+        catalog has), then an encounter uniformly within it. Returns None only
+        if no encounter has a positive weight.
+        """
+        if rarity_weights is None:
+            rarity_weights = DEFAULT_CHOICE_RARITY_WEIGHTS
+        sampler = _choice_sampler(_weights_key(rarity_weights))
+        return sampler.sample(self.rng) if sampler else None
+    
+    def get_realm_choice_encounter(self, player_realm: str) -> Optional[ChoiceEncounter]:
+        """Get a random choice encounter using the rarity weights of a realm"""
+        sampler = _realm_choice_sampler(player_realm)
+        return sampler.sample(self.rng) if sampler else None
     
     def process_choice_encounter(self, encounter: ChoiceEncounter, choice_index: int, player) -> Dict:
         """Process the player's choice and return results"""
@@ -526,8 +162,7 @@ class ChoiceEncounterManager:
         self.last_choice_made = chosen_option.description
         
         # Determine outcome based on probabilities
-        outcome_roll = random.random()
-        cumulative_prob = 0.0
+        outcome_name, outcome_data = chosen_option.resolve(self.rng.random())
         
         result = {
             "encounter_name": encounter.name,
@@ -536,26 +171,46 @@ class ChoiceEncounterManager:
             "outcomes": []
         }
         
-        for outcome_name, outcome_data in chosen_option.consequences.items():
-            probability = outcome_data.get("probability", 0)
-            cumulative_prob += probability
+        result["primary_outcome"] = outcome_name
+        result["message"] = outcome_data.get("message", "")
+        
+        # Apply all effects from this outcome
+        for effect_type, effect_value in outcome_data.items():
+            if effect_type in ["probability", "message"]:
+                continue
             
-            if outcome_roll <= cumulative_prob:
-                # This outcome occurs
-                result["primary_outcome"] = outcome_name
-                result["message"] = outcome_data.get("message", "")
-                
-                # Apply all effects from this outcome
-                for effect_type, effect_value in outcome_data.items():
-                    if effect_type in ["probability", "message"]:
-                        continue
-                    
-                    self._apply_encounter_effect(player, effect_type, effect_value, result)
-                
-                break
+            self._apply_encounter_effect(player, effect_type, effect_value, result)
         
         return result
     
+    def resolve_many(self, choice: EncounterChoice, n: int) -> Dict:
+        """
+        Roll a choice n times without applying anything to a player
+        
+        Returns outcome counts with the sampled and exact (expected) mean and
+        variance of each outcome metric, for AI players and balance reports.
+        """
+        cumulative = choice._cumulative
+        names = choice.outcome_names
+        counts = dict.fromkeys(names, 0)
+        for roll in self.rng.uniform_pool(n):
+            counts[names[bisect_left(cumulative, roll)]] += 1
+        
+        metrics = {name: outcome_metrics(choice.consequences[name]) for name in names}
+        sampled = {}
+        if n > 0:
+            frequencies = [(count / n, metrics[name]) for name, count in counts.items()]
+            sampled = {metric: _mean_and_variance([(f, values[metric]) for f, values in frequencies])
+                       for metric in OUTCOME_METRICS}
+        
+        return {
+            "choice": choice.description,
+            "n": n,
+            "counts": counts,
+            "sampled": sampled,
+            "expected": choice.statistics()
+        }
+    
     def _apply_encounter_effect(self, player, effect_type: str, effect_value, result: Dict):
         """Apply a specific encounter effect to the player"""
         if effect_type == "experience":
@@ -586,14 +241,14 @@ class ChoiceEncounterManager:
                 from spirit_stones import SpiritStoneGrade
                 try:
                     grade = SpiritStoneGrade(grade_name.upper().replace("_", "-") + "-GRADE" if "_" in grade_name else grade_name.upper())
-                    player.spirit_stones.add_stones(grade, amount)
+                    player.spirit_stones.add_stones(grade, amount, source=f"choice:{result['encounter_name']}")
                     result["outcomes"].append(f"Gained {amount} {grade_name} spirit stones")
                 except:
                     # Fallback for grade name issues
                     result["outcomes"].append(f"Gained spirit stones: {grade_name}x{amount}")
         
         elif effect_type == "negative_effect":
-            player.ongoing_effects.append(effect_value)
+            player.ongoing_effects.append(thaw(effect_value))
             result["outcomes"].append(f"Afflicted with: {effect_value['name']}")
         
         elif effect_type == "breakthrough_bonus":
@@ -631,18 +286,71 @@ class ChoiceEncounterManager:
     
     def get_encounter_by_name(self, name: str) -> Optional[ChoiceEncounter]:
         """Get specific encounter by name (for testing)"""
-        for encounter in self.choice_encounters:
-            if encounter.name == name:
-                return encounter
-        return None
+        return _choice_name_index().get(name)
+
+
+CHOICE_ENCOUNTER_PACK = "choice_encounters"
+
+
+@lru_cache(maxsize=None)
+def choice_encounter_catalog() -> Tuple[ChoiceEncounter, ...]:
+    """Process-wide choice encounter definitions, built once and shared by every manager"""
+    return tuple(
+        ChoiceEncounter(
+            name=entry["name"],
+            description=entry["description"],
+            context=entry["context"],
+            rarity=entry["rarity"],
+            choices=[
+                EncounterChoice(choice["description"], choice["consequences"], choice.get("risk_level", "medium"))
+                for choice in entry["choices"]
+            ]
+        )
+        for entry in load_pack(CHOICE_ENCOUNTER_PACK).load("choice")
+    )
+
+
+@lru_cache(maxsize=None)
+def _choice_name_index() -> Mapping[str, ChoiceEncounter]:
+    return MappingProxyType({encounter.name: encounter for encounter in choice_encounter_catalog()})
+
+
+def _weights_key(rarity_weights: Mapping[str, float]) -> Tuple[Tuple[str, float], ...]:
+    return tuple(sorted((rarity, weight) for rarity, weight in rarity_weights.items() if weight > 0))
+
+
+@lru_cache(maxsize=64)
+def _choice_sampler(weights_key: Tuple[Tuple[str, float], ...]) -> Optional[AliasSampler]:
+    """Alias sampler over the catalog for one set of rarity weights (None if nothing can be drawn)"""
+    rarity_weights = dict(weights_key)
+    by_rarity: Dict[str, List[ChoiceEncounter]] = {}
+    for encounter in choice_encounter_catalog():
+        if encounter.rarity in rarity_weights:
+            by_rarity.setdefault(encounter.rarity, []).append(encounter)
+    
+    encounters = []
+    weights = []
+    for rarity, members in by_rarity.items():
+        # A rarity's weight is shared by its encounters, so adding content doesn't shift rarity odds
+        share = rarity_weights[rarity] / len(members)
+        encounters.extend(members)
+        weights.extend([share] * len(members))
+    return AliasSampler(encounters, weights) if encounters else None
+
+
+@lru_cache(maxsize=None)
+def _realm_choice_sampler(player_realm: str) -> Optional[AliasSampler]:
+    weights = REALM_CHOICE_RARITY_WEIGHTS.get(player_realm, FALLBACK_CHOICE_RARITY_WEIGHTS)
+    return _choice_sampler(_weights_key(weights))
 
 
 # Integration helper for main game
 class CultivationChoiceManager:
     """Manages when to trigger choice encounters vs normal encounters"""
     
-    def __init__(self):
-        self.choice_manager = ChoiceEncounterManager()
+    def __init__(self, rng: Optional[GameRNG] = None):
+        self.rng = rng if rng is not None else default_rng()
+        self.choice_manager = ChoiceEncounterManager(rng=self.rng)
         self.choice_encounter_chance = 0.25  # 25% chance for choice encounter
         self.last_choice_session = 0
         self.sessions_since_choice = 0
@@ -651,28 +359,41 @@ class CultivationChoiceManager:
         """Determine if this session should have a choice encounter"""
         self.sessions_since_choice = current_session - self.last_choice_session
         
+        return self.rng.random() < self._choice_chance(self.sessions_since_choice)
+    
+    def _choice_chance(self, sessions_since_choice: int) -> float:
         # Increase chance if it's been a while since last choice encounter
         adjusted_chance = self.choice_encounter_chance
-        if self.sessions_since_choice > 10:
+        if sessions_since_choice > 10:
             adjusted_chance += 0.1  # +10% after 10 sessions
-        if self.sessions_since_choice > 20:
+        if sessions_since_choice > 20:
             adjusted_chance += 0.15  # +25% total after 20 sessions
+        return adjusted_chance
+    
+    def _choice_chance_run(self, sessions_since_choice: int) -> Tuple[float, Optional[int]]:
+        """Choice chance at this gap and for how many sessions it stays the same"""
+        chance = self._choice_chance(sessions_since_choice)
+        if sessions_since_choice <= 10:
+            return chance, 11 - sessions_since_choice
+        if sessions_since_choice <= 20:
+            return chance, 21 - sessions_since_choice
+        return chance, None
+    
+    def next_choice_session(self, current_session: int) -> int:
+        """
+        Sample the first session from current_session on that triggers a choice encounter
         
-        return random.random() < adjusted_chance
+        Equivalent to calling should_trigger_choice_encounter every session
+        (with no choice processed in between), but drawn in one step from the
+        10/20-session stepped distribution.
+        """
+        self.sessions_since_choice = current_session - self.last_choice_session
+        trials = trials_until_success(self.rng, self._choice_chance_run, self.sessions_since_choice)
+        return current_session + trials - 1
     
     def get_choice_encounter(self, player_realm: str) -> Optional[ChoiceEncounter]:
         """Get appropriate choice encounter for player realm"""
-        # Adjust rarity weights based on realm
-        realm_rarity_weights = {
-            "Body Tempering": {"common": 0.7, "uncommon": 0.2, "rare": 0.1},
-            "Qi Gathering": {"common": 0.6, "uncommon": 0.3, "rare": 0.1},
-            "Foundation Building": {"common": 0.4, "uncommon": 0.4, "rare": 0.2},
-            "Core Formation": {"common": 0.3, "uncommon": 0.4, "rare": 0.25, "very_rare": 0.05},
-            "Nascent Soul": {"common": 0.2, "uncommon": 0.3, "rare": 0.4, "very_rare": 0.1}
-        }
-        
-        weights = realm_rarity_weights.get(player_realm, {"common": 0.5, "uncommon": 0.3, "rare": 0.2})
-        return self.choice_manager.get_random_choice_encounter(weights)
+        return self.choice_manager.get_realm_choice_encounter(player_realm)
     
     def process_player_choice(self, encounter: ChoiceEncounter, choice_index: int, player, current_session: int) -> Dict:
         """Process player choice and update tracking"""
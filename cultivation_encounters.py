@@ -3,9 +3,16 @@ Cultivation Encounters System with Smart Encounter Manager and Reward Generation
 Updated to include the missing generate_encounter_reward function
 """
 
-import random
-from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Any
+from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from encounter_packs import load_pack
+from frozen_data import freeze
+from rng import GameRNG, default_rng
+from sampling import AliasSampler, trials_until_success
 
 class EncounterType(Enum):
     BOTTLENECK = "bottleneck"
@@ -13,312 +20,61 @@ class EncounterType(Enum):
     ANOMALY = "anomaly"
     TECHNIQUE = "technique"
 
-class SmartEncounterManager:
-    """Manages cultivation encounters with smart frequency control and variety enforcement"""
-    
-    def __init__(self):
-        self.last_encounter_session = 0
-        self.sessions_since_encounter = 0
-        self.recent_encounter_types = []
-        self.drought_sessions = 0
-        self.base_chance = 0.06  # 6% base encounter rate
-        
-        # Encounter definitions
-        self.encounters = {
-            EncounterType.BOTTLENECK: self._get_bottleneck_encounters(),
-            EncounterType.INSIGHT: self._get_insight_encounters(),
-            EncounterType.ANOMALY: self._get_anomaly_encounters(),
-            EncounterType.TECHNIQUE: self._get_technique_encounters()
-        }
-    
-    def _get_bottleneck_encounters(self) -> List[Dict]:
-        """Get bottleneck encounter definitions"""
-        return [
-            {
-                "name": "Qi Stagnation",
-                "description": "Your qi flow becomes sluggish and inefficient",
-                "rarity": "common",
-                "ongoing_effect": {
-                    "name": "Qi Stagnation",
-                    "type": "negative",
-                    "description": "Cultivation speed reduced by 15%",
-                    "exp_multiplier": 0.85,
-                    "remaining_duration": None  # Permanent until cured
-                }
-            },
-            {
-                "name": "Meridian Blockage",
-                "description": "Impurities block your meridian pathways",
-                "rarity": "common",
-                "ongoing_effect": {
-                    "name": "Meridian Blockage",
-                    "type": "negative",
-                    "description": "Cultivation efficiency reduced by 20%",
-                    "exp_multiplier": 0.80,
-                    "remaining_duration": None
-                }
-            },
-            {
-                "name": "Foundation Cracks",
-                "description": "Your cultivation foundation develops dangerous fissures",
-                "rarity": "uncommon",
-                "ongoing_effect": {
-                    "name": "Foundation Cracks",
-                    "type": "negative",
-                    "description": "All cultivation progress reduced by 25%",
-                    "exp_multiplier": 0.75,
-                    "remaining_duration": None
-                }
-            },
-            {
-                "name": "Cultivation Deviation",
-                "description": "Your cultivation method goes astray",
-                "rarity": "rare",
-                "ongoing_effect": {
-                    "name": "Cultivation Deviation",
-                    "type": "negative",
-                    "description": "Severe cultivation penalties until corrected",
-                    "exp_multiplier": 0.60,
-                    "remaining_duration": None
-                }
-            },
-            {
-                "name": "Heart Demon",
-                "description": "A powerful heart demon manifests from your doubts",
-                "rarity": "very_rare",
-                "ongoing_effect": {
-                    "name": "Heart Demon",
-                    "type": "negative",
-                    "description": "Major cultivation obstruction affecting all progress",
-                    "exp_multiplier": 0.50,
-                    "remaining_duration": None
-                }
-            }
-        ]
-    
-    def _get_insight_encounters(self) -> List[Dict]:
-        """Get insight encounter definitions"""
-        return [
-            {
-                "name": "Dao Comprehension",
-                "description": "You gain understanding of the universal dao",
-                "rarity": "common",
-                "rewards": {
-                    "experience": 25,
-                    "philosophy": {"wisdom": 2, "balance": 1}
-                }
-            },
-            {
-                "name": "Elemental Resonance",
-                "description": "You feel a deep connection with elemental forces",
-                "rarity": "common",
-                "rewards": {
-                    "experience": 20,
-                    "elemental": self._random_elemental_boost(15, 25)
-                }
-            },
-            {
-                "name": "Foundation Enlightenment",
-                "description": "Your cultivation foundation becomes more stable",
-                "rarity": "uncommon",
-                "rewards": {
-                    "experience": 30,
-                    "foundation": 5,
-                    "philosophy": {"balance": 2}
-                }
-            },
-            {
-                "name": "Heavenly Insight",
-                "description": "The heavens grant you profound understanding",
-                "rarity": "rare",
-                "rewards": {
-                    "experience": 50,
-                    "philosophy": {"wisdom": 5, "balance": 3}
-                },
-                "ongoing_effect": {
-                    "name": "Enlightenment",
-                    "type": "positive",
-                    "description": "Cultivation speed increased by 25% for next 10 sessions",
-                    "exp_multiplier": 1.25,
-                    "remaining_duration": 10
-                }
-            },
-            {
-                "name": "Cosmic Revelation",
-                "description": "You glimpse the true nature of reality",
-                "rarity": "very_rare",
-                "rewards": {
-                    "experience": 100,
-                    "philosophy": {"wisdom": 10, "balance": 5, "nature": 3}
-                },
-                "ongoing_effect": {
-                    "name": "Cosmic Understanding",
-                    "type": "positive",
-                    "description": "Massive cultivation boost for next 15 sessions",
-                    "exp_multiplier": 1.50,
-                    "remaining_duration": 15
-                }
-            }
-        ]
-    
-    def _get_anomaly_encounters(self) -> List[Dict]:
-        """Get anomaly encounter definitions"""
-        return [
-            {
-                "name": "Qi Turbulence",
-                "description": "Chaotic qi energies disrupt your cultivation",
-                "rarity": "common",
-                "ongoing_effect": {
-                    "name": "Chaotic Qi",
-                    "type": "negative",
-                    "description": "Unstable qi causes cultivation fluctuations",
-                    "exp_multiplier": 0.90,
-                    "remaining_duration": 5
-                }
-            },
-            {
-                "name": "Elemental Storm",
-                "description": "Conflicting elemental energies create chaos",
-                "rarity": "uncommon",
-                "ongoing_effect": {
-                    "name": "Elemental Imbalance",
-                    "type": "negative",
-                    "description": "Elemental confusion reduces cultivation efficiency",
-                    "exp_multiplier": 0.85,
-                    "remaining_duration": 8
-                }
-            },
-            {
-                "name": "Spatial Rift",
-                "description": "A tear in space affects local qi flow",
-                "rarity": "rare",
-                "rewards": {
-                    "experience": -20  # Negative experience
-                },
-                "ongoing_effect": {
-                    "name": "Spiritual Corruption",
-                    "type": "negative",
-                    "description": "Corrupted spiritual energy impedes progress",
-                    "exp_multiplier": 0.70,
-                    "remaining_duration": None
-                }
-            },
-            {
-                "name": "Dao Fluctuation",
-                "description": "The fundamental laws of reality shift briefly",
-                "rarity": "very_rare",
-                "ongoing_effect": {
-                    "name": "Dao Confusion",
-                    "type": "negative",
-                    "description": "Reality confusion severely hampers cultivation",
-                    "exp_multiplier": 0.60,
-                    "remaining_duration": None
-                }
-            },
-            {
-                "name": "Void Incursion",
-                "description": "Void energy seeps into reality",
-                "rarity": "legendary",
-                "ongoing_effect": {
-                    "name": "Void Taint",
-                    "type": "negative",
-                    "description": "Void corruption threatens your very existence",
-                    "exp_multiplier": 0.40,
-                    "remaining_duration": None
-                }
-            }
-        ]
-    
-    def _get_technique_encounters(self) -> List[Dict]:
-        """Get technique encounter definitions"""
-        return [
-            {
-                "name": "Ancient Manual",
-                "description": "You discover a fragment of an ancient cultivation manual",
-                "rarity": "common",
-                "rewards": {
-                    "experience": 35,
-                    "philosophy": {"wisdom": 1, "power": 1}
-                }
-            },
-            {
-                "name": "Technique Inspiration",
-                "description": "A flash of inspiration improves your technique",
-                "rarity": "common",
-                "rewards": {
-                    "experience": 30,
-                    "elemental": self._random_elemental_boost(10, 20)
-                }
-            },
-            {
-                "name": "Master's Echo",
-                "description": "You sense the lingering presence of a cultivation master",
-                "rarity": "uncommon",
-                "rewards": {
-                    "experience": 45,
-                    "philosophy": {"wisdom": 3, "balance": 2}
-                },
-                "ongoing_effect": {
-                    "name": "Master's Guidance",
-                    "type": "positive",
-                    "description": "Enhanced learning for next 8 sessions",
-                    "exp_multiplier": 1.20,
-                    "remaining_duration": 8
-                }
-            },
-            {
-                "name": "Technique Breakthrough",
-                "description": "You achieve a major breakthrough in your cultivation technique",
-                "rarity": "rare",
-                "rewards": {
-                    "experience": 60,
-                    "elemental": self._random_elemental_boost(20, 40),
-                    "philosophy": {"power": 3, "wisdom": 2}
-                }
-            },
-            {
-                "name": "Forbidden Technique",
-                "description": "You accidentally practice a dangerous forbidden technique",
-                "rarity": "rare",
-                "rewards": {
-                    "experience": 80,
-                    "philosophy": {"power": 5}
-                },
-                "ongoing_effect": {
-                    "name": "Technique Backlash",
-                    "type": "negative",
-                    "description": "Forbidden technique causes cultivation instability",
-                    "exp_multiplier": 0.95,
-                    "remaining_duration": 12
-                }
-            },
-            {
-                "name": "Legendary Inheritance",
-                "description": "You inherit the technique of a legendary cultivator",
-                "rarity": "legendary",
-                "rewards": {
-                    "experience": 150,
-                    "elemental": self._random_elemental_boost(40, 80),
-                    "philosophy": {"power": 8, "wisdom": 5, "balance": 3}
-                },
-                "ongoing_effect": {
-                    "name": "Legendary Mastery",
-                    "type": "positive",
-                    "description": "Legendary techniques grant permanent cultivation bonus",
-                    "exp_multiplier": 1.15,
-                    "remaining_duration": None
-                }
-            }
-        ]
+ENCOUNTER_TYPES = tuple(EncounterType)
+
+# Relative weight of each encounter type
+ENCOUNTER_TYPE_WEIGHTS = {
+    EncounterType.INSIGHT: 40,
+    EncounterType.TECHNIQUE: 30,
+    EncounterType.BOTTLENECK: 20,
+    EncounterType.ANOMALY: 10
+}
+
+# Rarities that can appear in each realm (other realms use DEFAULT_RARITIES)
+REALM_RARITIES = {
+    "Qi Gathering": ["common", "uncommon"],
+    "Foundation Building": ["common", "uncommon", "rare"],
+    "Core Formation": ["common", "uncommon", "rare", "very_rare"],
+    "Nascent Soul": ["uncommon", "rare", "very_rare", "legendary"],
+    "Soul Transformation": ["rare", "very_rare", "legendary"]
+}
+DEFAULT_RARITIES = ["common", "uncommon"]
+
+# Sessions without an encounter before drought protection starts raising the chance
+DROUGHT_START = 15
+
+# Weight by rarity (rarer = less likely)
+RARITY_WEIGHTS = {
+    "common": 50,
+    "uncommon": 30,
+    "rare": 15,
+    "very_rare": 4,
+    "legendary": 1
+}
+
+
+def _type_mask(encounter_types) -> int:
+    """Bit mask of encounter types (bit i = ENCOUNTER_TYPES[i])"""
+    mask = 0
+    for encounter_type in encounter_types:
+        mask |= 1 << ENCOUNTER_TYPES.index(encounter_type)
+    return mask
+
+
+@dataclass(frozen=True)
+class RandomElementalBoost:
+    """Catalog placeholder for an elemental reward rolled fresh each time it is granted"""
+    min_total: int
+    max_total: int
     
-    def _random_elemental_boost(self, min_total: int, max_total: int) -> Dict[str, int]:
+    def roll(self, rng: GameRNG) -> Dict[str, int]:
         """Generate random elemental affinity boosts"""
         elements = ["fire", "water", "earth", "air", "lightning", "ice", "nature", "light", "shadow"]
-        total_points = random.randint(min_total, max_total)
+        total_points = rng.randint(self.min_total, self.max_total)
         
         # Randomly distribute points among 1-3 elements
-        num_elements = random.randint(1, min(3, len(elements)))
-        chosen_elements = random.sample(elements, num_elements)
+        num_elements = rng.randint(1, min(3, len(elements)))
+        chosen_elements = rng.sample(elements, num_elements)
         
         boost = {}
         remaining_points = total_points
@@ -329,215 +85,438 @@ class SmartEncounterManager:
                 boost[element] = remaining_points
             else:
                 # Distribute points randomly
-                points = random.randint(1, max(1, remaining_points - (len(chosen_elements) - i - 1)))
+                points = rng.randint(1, max(1, remaining_points - (len(chosen_elements) - i - 1)))
                 boost[element] = points
                 remaining_points -= points
         
         return boost
+
+
+ENCOUNTER_PACK = "encounters"
+
+
+def _from_pack(entry: Dict) -> Dict:
+    """Turn pack-only notation (random elemental totals) into catalog values"""
+    rewards = entry.get("rewards")
+    if rewards and isinstance(rewards.get("elemental"), dict) and "random_total" in rewards["elemental"]:
+        min_total, max_total = rewards["elemental"]["random_total"]
+        entry = dict(entry, rewards=dict(rewards, elemental=RandomElementalBoost(min_total, max_total)))
+    return entry
+
+
+@lru_cache(maxsize=None)
+def _encounter_section(encounter_type: EncounterType, rarity: str) -> Tuple[Tuple[int, Mapping], ...]:
+    """Frozen (source position, encounter) pairs of one type and rarity, loaded on first use"""
+    pack = load_pack(ENCOUNTER_PACK)
+    return tuple((position, freeze(_from_pack(entry)))
+                 for position, entry in pack.section(encounter_type.value, rarity))
+
+
+def _load_encounters(encounter_type: EncounterType, rarities=None) -> Tuple[Mapping, ...]:
+    """Encounters of one type (optionally only some rarities) in pack order"""
+    if rarities is None:
+        rarities = load_pack(ENCOUNTER_PACK).rarities(encounter_type.value)
+    positioned = []
+    for rarity in rarities:
+        positioned.extend(_encounter_section(encounter_type, rarity))
+    positioned.sort(key=lambda item: item[0])
+    return tuple(encounter for _, encounter in positioned)
+
+
+@lru_cache(maxsize=None)
+def encounter_catalog() -> Mapping[EncounterType, Tuple[Mapping, ...]]:
+    """Process-wide read-only encounter definitions, built once and shared by every manager"""
+    return MappingProxyType({encounter_type: _load_encounters(encounter_type) for encounter_type in ENCOUNTER_TYPES})
+
+
+@lru_cache(maxsize=None)
+def _type_samplers() -> Tuple[AliasSampler, ...]:
+    """Encounter type samplers indexed by recent-type mask"""
+    # Variety enforcement: the two most recent types are excluded when possible
+    type_samplers = []
+    for mask in range(1 << len(ENCOUNTER_TYPES)):
+        available = [t for i, t in enumerate(ENCOUNTER_TYPES) if not mask & (1 << i)]
+        if not available:
+            available = list(ENCOUNTER_TYPES)
+        type_samplers.append(AliasSampler(available, [ENCOUNTER_TYPE_WEIGHTS[t] for t in available]))
+    return tuple(type_samplers)
+
+
+@lru_cache(maxsize=None)
+def _realm_samplers(realm: Optional[str]) -> Mapping[EncounterType, AliasSampler]:
+    """Encounter samplers per type for one realm (None = realms without a rarity table)"""
+    allowed_rarities = REALM_RARITIES.get(realm, DEFAULT_RARITIES)
+    samplers = {}
+    for encounter_type in ENCOUNTER_TYPES:
+        # Only the rarities this realm can see are loaded from the pack
+        encounters = _load_encounters(encounter_type, allowed_rarities) or _load_encounters(encounter_type)
+        samplers[encounter_type] = AliasSampler(
+            encounters, [RARITY_WEIGHTS.get(e["rarity"], 25) for e in encounters]
+        )
+    return MappingProxyType(samplers)
+
+
+def _samplers_for_realm(player_realm: str) -> Mapping[EncounterType, AliasSampler]:
+    return _realm_samplers(player_realm if player_realm in REALM_RARITIES else None)
+
+
+class SmartEncounterManager:
+    """Manages cultivation encounters with smart frequency control and variety enforcement"""
+    
+    def __init__(self, rng: Optional[GameRNG] = None):
+        self.rng = rng if rng is not None else default_rng()
+        self.last_encounter_session = 0
+        self.sessions_since_encounter = 0
+        self.recent_encounter_types = []
+        self.drought_sessions = 0
+        self.base_chance = 0.06  # 6% base encounter rate
+        
+        # Shared, read-only definitions and samplers; only the counters above are per player
+        self._type_samplers = _type_samplers()
+    
+    @property
+    def encounters(self) -> Mapping[EncounterType, Tuple[Mapping, ...]]:
+        """All encounter definitions (the full shared catalog)"""
+        return encounter_catalog()
     
     def _calculate_encounter_chance(self, current_session: int) -> float:
         """Calculate encounter chance with drought protection"""
+        return self._chance_at(self.sessions_since_encounter)
+    
+    def _chance_at(self, sessions_since_encounter: int) -> float:
         base_chance = self.base_chance
         
         # Drought protection - increase chance if no encounters for a while
-        if self.sessions_since_encounter >= 15:
-            drought_bonus = min(0.3, (self.sessions_since_encounter - 15) * 0.02)
+        if sessions_since_encounter >= DROUGHT_START:
+            drought_bonus = min(0.3, (sessions_since_encounter - DROUGHT_START) * 0.02)
             base_chance += drought_bonus
         
         return min(base_chance, 0.4)  # Cap at 40%
     
-    def _select_encounter_type(self) -> EncounterType:
-        """Select encounter type with variety enforcement"""
-        available_types = list(EncounterType)
+    def _chance_run(self, sessions_since_encounter: int) -> Tuple[float, Optional[int]]:
+        """Encounter chance at this drought length and for how many sessions it stays the same"""
+        chance = self._chance_at(sessions_since_encounter)
+        if sessions_since_encounter <= DROUGHT_START:
+            return chance, DROUGHT_START - sessions_since_encounter + 1
+        if self._chance_at(sessions_since_encounter + 1) == chance:
+            return chance, None  # Drought bonus has reached its cap
+        return chance, 1
+    
+    def sessions_until_encounter(self) -> int:
+        """
+        Sample how many sessions from now the next encounter triggers (1 = the next session)
         
-        # Avoid recent types if possible
+        Draws directly from the drought-adjusted distribution, so batch
+        cultivation can skip_sessions() over the quiet sessions in one step
+        and trigger_encounter() on the session that hits.
+        """
+        return trials_until_success(self.rng, self._chance_run, self.sessions_since_encounter + 1)
+    
+    def skip_sessions(self, count: int) -> None:
+        """Advance tracking over count sessions without an encounter"""
+        self.sessions_since_encounter += count
+        self._session_counter = getattr(self, '_session_counter', 0) + count
+    
+    def trigger_encounter(self, player_realm: str, current_session: int = None) -> Tuple[str, Dict]:
+        """Run a session that has an encounter (as decided by sessions_until_encounter)"""
+        current_session = self._begin_session(current_session)
+        return self._trigger(player_realm, current_session)
+    
+    def _recent_mask(self) -> int:
         if len(self.recent_encounter_types) >= 2:
-            recent_set = set(self.recent_encounter_types[-2:])
-            non_recent = [t for t in available_types if t not in recent_set]
-            if non_recent:
-                available_types = non_recent
-        
-        weights = {
-            EncounterType.INSIGHT: 40,
-            EncounterType.TECHNIQUE: 30,
-            EncounterType.BOTTLENECK: 20,
-            EncounterType.ANOMALY: 10
-        }
-        
-        return random.choices(available_types, 
-                            weights=[weights[t] for t in available_types])[0]
+            return _type_mask(self.recent_encounter_types[-2:])
+        return 0
+    
+    def _select_encounter_type(self) -> EncounterType:
+        """Select encounter type with variety enforcement"""
+        return self._type_samplers[self._recent_mask()].sample(self.rng)
     
     def _select_encounter(self, encounter_type: EncounterType, player_realm: str) -> Dict:
         """Select specific encounter based on type and realm"""
-        encounters = self.encounters[encounter_type]
+        return _samplers_for_realm(player_realm)[encounter_type].sample(self.rng)
+    
+    def _record_encounter(self, encounter_type: EncounterType, current_session: int) -> None:
+        self.last_encounter_session = current_session
+        self.sessions_since_encounter = 0
+        self.recent_encounter_types.append(encounter_type)
+        if len(self.recent_encounter_types) > 5:
+            self.recent_encounter_types.pop(0)
+    
+    def sample_many(self, k: int, player_realm: str) -> List[Tuple[str, Dict]]:
+        """
+        Select k encounters in a row (e.g. for batch cultivation)
         
-        # Filter by rarity based on realm
-        realm_rarities = {
-            "Qi Gathering": ["common", "uncommon"],
-            "Foundation Building": ["common", "uncommon", "rare"],
-            "Core Formation": ["common", "uncommon", "rare", "very_rare"],
-            "Nascent Soul": ["uncommon", "rare", "very_rare", "legendary"],
-            "Soul Transformation": ["rare", "very_rare", "legendary"]
-        }
+        Uniform values are drawn in one bulk pool. Variety enforcement and the
+        recent-type tracking advance exactly as if the encounters had been
+        triggered one at a time.
+        """
+        pool = self.rng.uniform_pool(2 * k)
+        samplers = _samplers_for_realm(player_realm)
+        recent = self.recent_encounter_types
+        selected = []
+        for i in range(k):
+            mask = _type_mask(recent[-2:]) if len(recent) >= 2 else 0
+            encounter_type = self._type_samplers[mask].pick(pool[2 * i])
+            encounter = samplers[encounter_type].pick(pool[2 * i + 1])
+            recent.append(encounter_type)
+            if len(recent) > 5:
+                recent.pop(0)
+            selected.append((encounter_type.value, encounter))
+        return selected
+    
+    def process_encounter(self, player_realm: str, player_level: int, 
+                         ongoing_effects: List[Dict], current_session: int = None,
+                         roll: float = None) -> Optional[Tuple[str, Dict]]:
+        """
+        Process potential encounter for this cultivation session
+        
+        roll may carry a pre-drawn uniform value for the trigger check (batch cultivation)
+        """
+        current_session = self._begin_session(current_session)
         
-        allowed_rarities = realm_rarities.get(player_realm, ["common", "uncommon"])
-        filtered_encounters = [e for e in encounters if e["rarity"] in allowed_rarities]
+        # Calculate encounter chance
+        encounter_chance = self._calculate_encounter_chance(current_session)
         
-        if not filtered_encounters:
-            filtered_encounters = encounters
+        if roll is None:
+            roll = self.rng.random()
         
-        # Weight by rarity (rarer = less likely)
-        rarity_weights = {
-            "common": 50,
-            "uncommon": 30,
-            "rare": 15,
-            "very_rare": 4,
-            "legendary": 1
-        }
+        if roll < encounter_chance:
+            return self._trigger(player_realm, current_session)
         
-        weights = [rarity_weights.get(e["rarity"], 25) for e in filtered_encounters]
-        return random.choices(filtered_encounters, weights=weights)[0]
+        return None
     
-    def process_encounter(self, player_realm: str, player_level: int, 
-                         ongoing_effects: List[Dict], current_session: int = None) -> Optional[Tuple[str, Dict]]:
-        """Process potential encounter for this cultivation session"""
+    def _begin_session(self, current_session: Optional[int]) -> int:
         if current_session is None:
             current_session = getattr(self, '_session_counter', 0)
             self._session_counter = current_session + 1
         
         self.sessions_since_encounter += 1
+        return current_session
+    
+    def _trigger(self, player_realm: str, current_session: int) -> Tuple[str, Dict]:
+        # Select encounter
+        encounter_type = self._select_encounter_type()
+        encounter = self._select_encounter(encounter_type, player_realm)
         
-        # Calculate encounter chance
-        encounter_chance = self._calculate_encounter_chance(current_session)
-        
-        if random.random() < encounter_chance:
-            # Select encounter
-            encounter_type = self._select_encounter_type()
-            encounter = self._select_encounter(encounter_type, player_realm)
-            
-            # Update tracking
-            self.last_encounter_session = current_session
-            self.sessions_since_encounter = 0
-            self.recent_encounter_types.append(encounter_type)
-            if len(self.recent_encounter_types) > 5:
-                self.recent_encounter_types.pop(0)
-            
-            return encounter_type.value, encounter
+        # Update tracking
+        self._record_encounter(encounter_type, current_session)
         
-        return None
+        return encounter_type.value, encounter
+
+
+# Realm multipliers for scaling rewards
+REALM_REWARD_MULTIPLIERS = {
+    "Qi Gathering": 1.0,
+    "Foundation Building": 1.2,
+    "Core Formation": 1.5,
+    "Nascent Soul": 2.0,
+    "Soul Transformation": 2.5,
+    "Void Transcendence": 3.0
+}
+
+# Bonus experience by encounter type (before realm scaling)
+BONUS_EXPERIENCE = {
+    "bottleneck": 5,
+    "insight": 15,
+    "anomaly": 8,
+    "technique": 12
+}
+BONUS_PHILOSOPHY_TYPES = ("balance", "power", "wisdom", "nature")
 
+REWARD_TEMPLATE_CACHE_SIZE = 512
+BONUS_DRAWS = 3  # Uniform values per encounter in generate_encounter_rewards (one per bonus check)
 
-def generate_encounter_reward(encounter_type: str, encounter_data: Dict, player_realm: str) -> Dict[str, Any]:
+
+@dataclass(frozen=True)
+class RewardTemplate:
     """
-    Generate rewards for an encounter
+    Rewards of one encounter at one realm with every deterministic part pre-scaled
     
-    Args:
-        encounter_type: Type of encounter (bottleneck, insight, anomaly, technique)
-        encounter_data: The encounter data dictionary
-        player_realm: Current player realm for scaling
-        
-    Returns:
-        Dictionary of rewards to apply to the player
+    Only random elemental boosts and the random bonus component are left to
+    compute when a reward is generated.
     """
-    rewards = {}
-    
-    # Realm multipliers for scaling rewards
-    realm_multipliers = {
-        "Qi Gathering": 1.0,
-        "Foundation Building": 1.2,
-        "Core Formation": 1.5,
-        "Nascent Soul": 2.0,
-        "Soul Transformation": 2.5,
-        "Void Transcendence": 3.0
-    }
+    rewards: Tuple[Tuple[str, Any], ...]  # Scaled direct rewards in encounter order
+    ongoing_effect: Optional[Mapping]  # With its duration already scaled
+    elemental_multiplier: float
+    bonus_experience: int
+    bonus_philosophy_max: int
+    bonus_foundation_max: Optional[int]  # None when the encounter type never grants foundation
     
-    multiplier = realm_multipliers.get(player_realm, 1.0)
-    
-    # Process direct rewards from encounter data
-    if "rewards" in encounter_data:
-        for reward_type, reward_value in encounter_data["rewards"].items():
-            if reward_type == "experience":
-                # Scale experience with realm
-                scaled_exp = int(reward_value * multiplier)
-                rewards[reward_type] = scaled_exp
+    @classmethod
+    def compile(cls, encounter_type: str, encounter_data: Mapping, player_realm: str) -> "RewardTemplate":
+        multiplier = REALM_REWARD_MULTIPLIERS.get(player_realm, 1.0)
+        # Philosophy gains are less affected by realm, elemental affinities scale moderately
+        philosophy_multiplier = min(multiplier, 1.5)
+        elemental_multiplier = min(multiplier, 2.0)
+        
+        rewards = []
+        for reward_type, reward_value in encounter_data.get("rewards", {}).items():
+            if reward_type in ("experience", "foundation"):
+                # Experience and foundation quality scale with realm
+                reward_value = int(reward_value * multiplier)
             elif reward_type == "philosophy":
-                # Philosophy gains are less affected by realm
-                philosophy_multiplier = min(multiplier, 1.5)
-                scaled_philosophy = {}
-                for phil_type, phil_value in reward_value.items():
-                    scaled_philosophy[phil_type] = int(phil_value * philosophy_multiplier)
-                rewards[reward_type] = scaled_philosophy
-            elif reward_type == "elemental":
-                # Elemental affinities scale moderately with realm
-                elemental_multiplier = min(multiplier, 2.0)
-                scaled_elemental = {}
-                for elem_type, elem_value in reward_value.items():
-                    scaled_elemental[elem_type] = int(elem_value * elemental_multiplier)
-                rewards[reward_type] = scaled_elemental
-            elif reward_type == "foundation":
-                # Foundation quality scales with realm
-                scaled_foundation = int(reward_value * multiplier)
-                rewards[reward_type] = scaled_foundation
-            else:
-                # Other rewards pass through unchanged
-                rewards[reward_type] = reward_value
-    
-    # Process ongoing effects
-    if "ongoing_effect" in encounter_data:
-        effect = encounter_data["ongoing_effect"].copy()
+                reward_value = MappingProxyType({phil_type: int(phil_value * philosophy_multiplier)
+                                                 for phil_type, phil_value in reward_value.items()})
+            elif reward_type == "elemental" and not isinstance(reward_value, RandomElementalBoost):
+                reward_value = MappingProxyType({elem_type: int(elem_value * elemental_multiplier)
+                                                 for elem_type, elem_value in reward_value.items()})
+            # Other rewards pass through unchanged
+            rewards.append((reward_type, reward_value))
         
-        # Scale effect duration based on realm for temporary effects
-        if effect.get("remaining_duration") is not None:
-            duration_multiplier = max(0.5, 1.5 - (multiplier - 1.0) * 0.3)
-            effect["remaining_duration"] = max(1, int(effect["remaining_duration"] * duration_multiplier))
+        effect = None
+        if "ongoing_effect" in encounter_data:
+            effect = dict(encounter_data["ongoing_effect"])
+            # Scale effect duration based on realm for temporary effects
+            if effect.get("remaining_duration") is not None:
+                duration_multiplier = max(0.5, 1.5 - (multiplier - 1.0) * 0.3)
+                effect["remaining_duration"] = max(1, int(effect["remaining_duration"] * duration_multiplier))
+            effect = MappingProxyType(effect)
         
-        rewards["ongoing_effect"] = effect
+        return cls(
+            rewards=tuple(rewards),
+            ongoing_effect=effect,
+            elemental_multiplier=elemental_multiplier,
+            bonus_experience=int(BONUS_EXPERIENCE.get(encounter_type, 10) * multiplier),
+            bonus_philosophy_max=max(1, int(2 * multiplier)),
+            bonus_foundation_max=None if encounter_type == "bottleneck" else max(1, int(3 * multiplier))
+        )
     
-    # Add random bonus rewards based on encounter type and realm
-    bonus_rewards = _generate_bonus_rewards(encounter_type, player_realm, multiplier)
-    for reward_type, reward_value in bonus_rewards.items():
-        if reward_type in rewards:
-            if isinstance(rewards[reward_type], dict) and isinstance(reward_value, dict):
-                # Merge dictionaries (for philosophy/elemental)
-                for key, value in reward_value.items():
-                    rewards[reward_type][key] = rewards[reward_type].get(key, 0) + value
-            elif isinstance(rewards[reward_type], int) and isinstance(reward_value, int):
-                # Add integers (for experience/foundation)
-                rewards[reward_type] += reward_value
-        else:
+    def base_rewards(self, rng: GameRNG) -> Dict[str, Any]:
+        """Fresh reward dict without the random bonus component"""
+        rewards = {}
+        for reward_type, reward_value in self.rewards:
+            if isinstance(reward_value, RandomElementalBoost):
+                multiplier = self.elemental_multiplier
+                reward_value = {elem_type: int(elem_value * multiplier)
+                                for elem_type, elem_value in reward_value.roll(rng).items()}
+            elif isinstance(reward_value, MappingProxyType):
+                reward_value = dict(reward_value)
             rewards[reward_type] = reward_value
+        if self.ongoing_effect is not None:
+            rewards["ongoing_effect"] = dict(self.ongoing_effect)
+        return rewards
     
-    return rewards
+    def generate(self, rng: GameRNG) -> Dict[str, Any]:
+        """Full rewards: the template plus a freshly rolled bonus"""
+        rewards = self.base_rewards(rng)
+        
+        # Small chance for bonus experience
+        if rng.random() < 0.3:
+            _add_bonus(rewards, "experience", self.bonus_experience)
+        
+        # Small chance for philosophy bonus
+        if rng.random() < 0.2:
+            chosen_philosophy = rng.choice(BONUS_PHILOSOPHY_TYPES)
+            _add_bonus(rewards, "philosophy", {chosen_philosophy: rng.randint(1, self.bonus_philosophy_max)})
+        
+        # Very small chance for foundation bonus (except for bottlenecks)
+        if self.bonus_foundation_max is not None and rng.random() < 0.1:
+            _add_bonus(rewards, "foundation", rng.randint(1, self.bonus_foundation_max))
+        
+        return rewards
+    
+    def generate_from_draws(self, rng: GameRNG, experience_roll: float, philosophy_roll: float,
+                            foundation_roll: float) -> Dict[str, Any]:
+        """
+        Like generate(), but the bonus comes from pre-drawn uniform values
+        
+        A roll u that passes a chance check c leaves u / c uniform in [0, 1),
+        which picks the bonus amount without drawing again.
+        """
+        rewards = self.base_rewards(rng)
+        
+        if experience_roll < 0.3:
+            _add_bonus(rewards, "experience", self.bonus_experience)
+        if philosophy_roll < 0.2:
+            scaled = philosophy_roll / 0.2 * len(BONUS_PHILOSOPHY_TYPES)
+            pick = min(int(scaled), len(BONUS_PHILOSOPHY_TYPES) - 1)
+            amount = 1 + _scaled_index(scaled - pick, self.bonus_philosophy_max)
+            _add_bonus(rewards, "philosophy", {BONUS_PHILOSOPHY_TYPES[pick]: amount})
+        if self.bonus_foundation_max is not None and foundation_roll < 0.1:
+            _add_bonus(rewards, "foundation", 1 + _scaled_index(foundation_roll / 0.1, self.bonus_foundation_max))
+        
+        return rewards
 
 
-def _generate_bonus_rewards(encounter_type: str, player_realm: str, multiplier: float) -> Dict[str, Any]:
-    """Generate random bonus rewards based on encounter type"""
-    bonus = {}
-    
-    # Small chance for bonus experience
-    if random.random() < 0.3:
-        base_bonus = {
-            "bottleneck": 5,
-            "insight": 15,
-            "anomaly": 8,
-            "technique": 12
-        }
-        bonus_exp = int(base_bonus.get(encounter_type, 10) * multiplier)
-        bonus["experience"] = bonus_exp
+def _scaled_index(u: float, size: int) -> int:
+    """Uniform value in [0, 1) to an index in range(size)"""
+    return min(int(u * size), size - 1)
+
+
+def _add_bonus(rewards: Dict[str, Any], reward_type: str, reward_value) -> None:
+    if reward_type not in rewards:
+        rewards[reward_type] = reward_value
+    elif isinstance(rewards[reward_type], dict) and isinstance(reward_value, dict):
+        # Merge dictionaries (for philosophy/elemental)
+        merged = rewards[reward_type]
+        for key, value in reward_value.items():
+            merged[key] = merged.get(key, 0) + value
+    elif isinstance(rewards[reward_type], int) and isinstance(reward_value, int):
+        # Add integers (for experience/foundation)
+        rewards[reward_type] += reward_value
+
+
+_reward_templates: "OrderedDict[Tuple[str, int, str], Tuple[Mapping, RewardTemplate]]" = OrderedDict()
+
+
+def reward_template(encounter_type: str, encounter_data: Mapping, player_realm: str) -> RewardTemplate:
+    """Compiled reward template for an (encounter, realm) pair, kept in an LRU cache"""
+    key = (encounter_type, id(encounter_data), player_realm)
+    cached = _reward_templates.get(key)
+    # The cache holds the encounter itself, so its id can't be reused while cached
+    if cached is not None and cached[0] is encounter_data:
+        _reward_templates.move_to_end(key)
+        return cached[1]
     
-    # Small chance for philosophy bonus
-    if random.random() < 0.2:
-        philosophy_types = ["balance", "power", "wisdom", "nature"]
-        chosen_philosophy = random.choice(philosophy_types)
-        philosophy_amount = random.randint(1, max(1, int(2 * multiplier)))
-        bonus["philosophy"] = {chosen_philosophy: philosophy_amount}
+    template = RewardTemplate.compile(encounter_type, encounter_data, player_realm)
+    _reward_templates[key] = (encounter_data, template)
+    if len(_reward_templates) > REWARD_TEMPLATE_CACHE_SIZE:
+        _reward_templates.popitem(last=False)
+    return template
+
+
+def generate_encounter_reward(encounter_type: str, encounter_data: Dict, player_realm: str,
+                              rng: Optional[GameRNG] = None) -> Dict[str, Any]:
+    """
+    Generate rewards for an encounter
     
-    # Very small chance for foundation bonus (except for bottlenecks)
-    if encounter_type != "bottleneck" and random.random() < 0.1:
-        foundation_bonus = random.randint(1, max(1, int(3 * multiplier)))
-        bonus["foundation"] = foundation_bonus
+    Args:
+        encounter_type: Type of encounter (bottleneck, insight, anomaly, technique)
+        encounter_data: The encounter data dictionary
+        player_realm: Current player realm for scaling
+        rng: Random stream to roll bonus rewards with (defaults to the shared stream)
+        
+    Returns:
+        Dictionary of rewards to apply to the player
+    """
+    if rng is None:
+        rng = default_rng()
+    return reward_template(encounter_type, encounter_data, player_realm).generate(rng)
+
+
+def generate_encounter_rewards(encounters: Sequence[Tuple[str, Mapping]], player_realm: str,
+                               rng: Optional[GameRNG] = None) -> List[Dict[str, Any]]:
+    """
+    Generate rewards for many (encounter_type, encounter_data) pairs at once
     
-    return bonus
+    Bonus rolls for the whole batch come from one bulk uniform pool, so the
+    rewards follow the same distribution as generate_encounter_reward but not
+    the same random stream.
+    """
+    if rng is None:
+        rng = default_rng()
+    pool = rng.uniform_pool(BONUS_DRAWS * len(encounters))
+    rolls = iter(pool)
+    templates = {}  # Batches usually repeat encounters; skip the LRU bookkeeping for repeats
+    rewards = []
+    for (encounter_type, encounter_data), experience_roll, philosophy_roll, foundation_roll in zip(
+            encounters, rolls, rolls, rolls):
+        key = (encounter_type, id(encounter_data))
+        template = templates.get(key)
+        if template is None:
+            template = templates[key] = reward_template(encounter_type, encounter_data, player_realm)
+        rewards.append(template.generate_from_draws(rng, experience_roll, philosophy_roll, foundation_roll))
+    return rewards
 
 
 # Example usage and testing
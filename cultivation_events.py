@@ -0,0 +1,126 @@
+"""
+Cultivation Events for Cultivation Game
+Structured results emitted by the cultivation core and rendered to text on demand
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple, Type
+
+from spirit_stones import format_spirit_stone_reward
+
+
+@dataclass(frozen=True, slots=True)
+class CultivationEvent:
+    """Base class for everything a cultivation session can report"""
+
+    def lines(self) -> Tuple[str, ...]:
+        """Message lines for text frontends"""
+        return (self.render(),)
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True, slots=True)
+class ExpGained(CultivationEvent):
+    amount: int
+    cultivation_focus: str
+
+    def render(self) -> str:
+        return f"Cultivated for {self.amount} experience ({self.cultivation_focus} focus)"
+
+
+@dataclass(frozen=True, slots=True)
+class FoundationChanged(CultivationEvent):
+    """Foundation quality change; source is "focus", "balanced", "aggressive", "encounter" or "stage" """
+    amount: int
+    source: str
+
+    def lines(self) -> Tuple[str, ...]:
+        # Small balanced-focus gains only show up in session totals
+        if self.source == "balanced":
+            return ()
+        return (self.render(),)
+
+    def render(self) -> str:
+        if self.source == "focus":
+            return f"🏗️ Foundation-focused cultivation: +{self.amount} foundation quality"
+        if self.source == "aggressive":
+            return f"⚠️ Aggressive cultivation damaged foundation: -{abs(self.amount)}"
+        if self.source == "stage":
+            return f"🏗️ Foundation strengthened! +{self.amount} foundation quality"
+        return f"🏗️ Foundation strengthened: +{self.amount}"
+
+
+@dataclass(frozen=True, slots=True)
+class EncounterTriggered(CultivationEvent):
+    encounter_type: str
+    name: str
+    description: str = ""
+    rarity: str = "common"
+
+    def lines(self) -> Tuple[str, ...]:
+        if self.description:
+            return (self.render(), f"   {self.description}")
+        return (self.render(),)
+
+    def render(self) -> str:
+        return f"💫 {self.encounter_type.title()}: {self.name}"
+
+
+@dataclass(frozen=True, slots=True)
+class StageAdvanced(CultivationEvent):
+    realm: str
+    stage: int
+    title: str
+
+    def render(self) -> str:
+        return f"📈 Advanced to {self.title}"
+
+
+@dataclass(frozen=True, slots=True)
+class BreakthroughReady(CultivationEvent):
+    """Reached Stage 9; ready is False when a requirement (e.g. foundation) still blocks it"""
+    ready: bool
+    message: str = ""
+
+    def render(self) -> str:
+        if self.ready:
+            return f"🌟 Ready for breakthrough to next realm!"
+        return f"⚠️ {self.message}"
+
+
+@dataclass(frozen=True, slots=True)
+class DaoInsight(CultivationEvent):
+    dao_type: str
+    amount: int
+
+    def render(self) -> str:
+        return f"🧠 Dao insight: +{self.amount} {self.dao_type} comprehension"
+
+
+@dataclass(frozen=True, slots=True)
+class ElementalGain(CultivationEvent):
+    element: str
+    amount: int
+
+    def render(self) -> str:
+        return f"🌟 Elemental affinity: +{self.amount} {self.element}"
+
+
+@dataclass(frozen=True, slots=True)
+class SpiritStonesEarned(CultivationEvent):
+    stones: Dict
+
+    def render(self) -> str:
+        return f"🔸 Spirit stones earned: {format_spirit_stone_reward(self.stones)}"
+
+
+def render_events(events: Iterable[CultivationEvent],
+                  only: Tuple[Type[CultivationEvent], ...] = None) -> List[str]:
+    """Render events to message lines, optionally keeping only the given event types"""
+    messages = []
+    for event in events:
+        if only is None or isinstance(event, only):
+            messages.extend(event.lines())
+    return messages
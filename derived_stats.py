@@ -0,0 +1,83 @@
+"""
+Derived Cultivator Stats for Cultivation Game
+Read-only snapshot of values computed from realm, stage, foundation and dao
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from realm_stage_system import CultivationRealm, RealmStageManager
+
+REALM_INDEX = {realm: index for index, realm in enumerate(CultivationRealm)}
+
+
+@dataclass(frozen=True, slots=True)
+class DerivedStats:
+    """
+    Values derived from a cultivator's progression state
+
+    A snapshot is only valid for the inputs it was computed from (the first
+    block of fields); EnhancedPlayer rebuilds it when any of them change.
+    """
+
+    # Inputs
+    realm: CultivationRealm
+    stage: int
+    foundation_quality: float
+    foundation_stability: float
+    total_dao: float
+
+    # Derived values
+    realm_index: int
+    cultivation_title: str
+    stage_exp_requirement: int
+    next_stage_exp_requirement: int
+    base_power: float
+    stage_bonus: float
+    foundation_power: float
+    combat_power: int
+    can_breakthrough: bool
+    breakthrough_message: str
+    breakthrough_success_rate: float  # Without bonus factors, as shown on status screens
+    breakthrough_bonus_factors: Tuple[Tuple[str, float], ...]
+
+    @classmethod
+    def compute(cls, realm_manager: RealmStageManager, realm: CultivationRealm, stage: int,
+                foundation_quality: float, foundation_stability: float, total_dao: float) -> "DerivedStats":
+        # Breakdown of RealmStageManager.calculate_combat_power, from the realm registry's curves
+        base_power, stage_bonus = realm_manager.get_power_breakdown(realm, stage)
+        foundation_power = foundation_quality * 2
+
+        bonus_factors = []
+        if total_dao > 20:
+            bonus_factors.append(('dao_mastery', min(0.15, total_dao * 0.002)))
+        if foundation_stability > 80:
+            bonus_factors.append(('foundation_stability', (foundation_stability - 80) * 0.001))
+
+        can_breakthrough, breakthrough_message = realm_manager.can_breakthrough_realm(
+            realm, stage, foundation_quality
+        )
+
+        return cls(
+            realm=realm,
+            stage=stage,
+            foundation_quality=foundation_quality,
+            foundation_stability=foundation_stability,
+            total_dao=total_dao,
+            realm_index=REALM_INDEX[realm],
+            cultivation_title=realm_manager.get_cultivation_title(realm, stage),
+            stage_exp_requirement=realm_manager.get_stage_exp_requirement(realm, stage),
+            next_stage_exp_requirement=realm_manager.get_stage_exp_requirement(realm, stage + 1) if stage < 9 else 0,
+            base_power=base_power,
+            stage_bonus=stage_bonus,
+            foundation_power=foundation_power,
+            combat_power=realm_manager.calculate_combat_power(realm, stage, foundation_quality),
+            can_breakthrough=can_breakthrough,
+            breakthrough_message=breakthrough_message,
+            breakthrough_success_rate=realm_manager.calculate_breakthrough_success_rate(realm, foundation_quality),
+            breakthrough_bonus_factors=tuple(bonus_factors)
+        )
+
+    def get_bonus_factors(self) -> Dict[str, float]:
+        """Breakthrough bonus factors as a fresh dict"""
+        return dict(self.breakthrough_bonus_factors)
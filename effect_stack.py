@@ -0,0 +1,242 @@
+"""
+Ongoing Effect Stack for Cultivation Game
+Keeps cultivation effects partitioned by polarity and duration with a cached exp modifier
+"""
+
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class _EffectEntry:
+    """Bookkeeping for one effect held by an EffectStack"""
+
+    __slots__ = ("effect", "negative", "expires_at", "active")
+
+    def __init__(self, effect: Dict, negative: bool, expires_at: Optional[int]):
+        self.effect = effect
+        self.negative = negative
+        self.expires_at = expires_at  # Session tick at which the effect is removed, None if permanent
+        self.active = True
+
+
+class EffectStack:
+    """
+    List-compatible container for ongoing effect dicts
+
+    Effects are kept in separate positive/negative and timed/permanent buckets.
+    The combined experience modifier is cached and only recomputed when the
+    set of effects changes, and timed effects expire through a heap ordered by
+    their expiry tick instead of decrementing every effect each session.
+
+    Effects are stored as copies of the dicts passed in, so catalog
+    definitions are never mutated. The remaining_duration field of timed
+    effects is brought up to date whenever the effects are read.
+    """
+
+    __slots__ = ("_entries", "_positive_timed", "_positive_permanent",
+                 "_negative_timed", "_negative_permanent", "_heap", "_tick",
+                 "_synced_tick", "_sequence", "_modifier")
+
+    def __init__(self, effects: Optional[Iterable[Dict]] = None):
+        self._entries: Dict[int, _EffectEntry] = {}  # Insertion ordered, keyed by id(effect)
+        self._positive_timed: Dict[int, _EffectEntry] = {}
+        self._positive_permanent: Dict[int, _EffectEntry] = {}
+        self._negative_timed: Dict[int, _EffectEntry] = {}
+        self._negative_permanent: Dict[int, _EffectEntry] = {}
+        self._heap: List[Tuple[int, int, _EffectEntry]] = []
+        self._tick = 0
+        self._synced_tick = 0
+        self._sequence = 0
+        self._modifier: Optional[Tuple[float, int, int]] = None
+
+        if effects:
+            for effect in effects:
+                self.append(effect)
+
+    # ----- list-compatible interface -----
+
+    def append(self, effect: Dict) -> None:
+        """Add an effect (a copy of the given dict is stored)"""
+        effect = dict(effect)
+        negative = effect.get('type') == 'negative'
+        remaining = effect.get('remaining_duration')
+
+        if remaining is None:
+            expires_at = None
+        else:
+            expires_at = self._tick + 1 + max(0, remaining)
+
+        entry = _EffectEntry(effect, negative, expires_at)
+        key = id(effect)
+        self._entries[key] = entry
+        self._bucket(entry)[key] = entry
+
+        if expires_at is not None:
+            self._sequence += 1
+            heapq.heappush(self._heap, (expires_at, self._sequence, entry))
+
+        self._modifier = None
+
+    def extend(self, effects: Iterable[Dict]) -> None:
+        for effect in effects:
+            self.append(effect)
+
+    def remove(self, effect: Dict) -> None:
+        """Remove an effect, matching by identity first and then by equality"""
+        entry = self._entries.get(id(effect))
+        if entry is None or entry.effect is not effect:
+            self._sync()
+            entry = next((e for e in self._entries.values() if e.effect == effect), None)
+            if entry is None:
+                raise ValueError("EffectStack.remove(x): x not in stack")
+        self._discard(entry)
+
+    def pop(self, index: int = -1) -> Dict:
+        entries = list(self._entries.values())
+        entry = entries[index]
+        self._sync()
+        self._discard(entry)
+        return entry.effect
+
+    def clear(self) -> None:
+        for entry in self._entries.values():
+            entry.active = False
+        for bucket in (self._entries, self._positive_timed, self._positive_permanent,
+                       self._negative_timed, self._negative_permanent):
+            bucket.clear()
+        self._heap.clear()
+        self._modifier = None
+
+    def copy(self) -> List[Dict]:
+        return self.to_list()
+
+    def to_list(self) -> List[Dict]:
+        """Get the effects as a plain list (e.g. for saving)"""
+        self._sync()
+        return [entry.effect for entry in self._entries.values()]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __getitem__(self, index):
+        return self.to_list()[index]
+
+    def __contains__(self, effect) -> bool:
+        entry = self._entries.get(id(effect))
+        if entry is not None and entry.effect is effect:
+            return True
+        return effect in self.to_list()
+
+    def __repr__(self) -> str:
+        return f"EffectStack({self.to_list()!r})"
+
+    # ----- cultivation hot path -----
+
+    def get_exp_modifier(self) -> Tuple[float, int, int]:
+        """Get the cached (multiplier, flat bonus, flat penalty) of all effects"""
+        if self._modifier is None:
+            multiplier = 1.0
+            exp_bonus = 0
+            exp_penalty = 0
+            for entry in self._entries.values():
+                effect = entry.effect
+                if not entry.negative and effect.get('type') != 'positive':
+                    continue
+                if 'exp_multiplier' in effect:
+                    multiplier *= effect['exp_multiplier']
+                elif entry.negative:
+                    exp_penalty += effect.get('exp_penalty', 0)
+                else:
+                    exp_bonus += effect.get('exp_bonus', 0)
+            self._modifier = (multiplier, exp_bonus, exp_penalty)
+        return self._modifier
+
+    def apply_to_exp(self, base_exp: int) -> int:
+        """Apply the combined effect modifier to a session's experience"""
+        if not self._entries:
+            return base_exp
+
+        multiplier, exp_bonus, exp_penalty = self.get_exp_modifier()
+        modified_exp = int(base_exp * multiplier) + exp_bonus
+        if exp_penalty:
+            modified_exp = max(1, modified_exp - exp_penalty)
+        return modified_exp
+
+    def get_negative_effects(self) -> List[Dict]:
+        """Get negative effects in the order they were gained"""
+        if not self._negative_timed:
+            return [entry.effect for entry in self._negative_permanent.values()]
+        self._sync()
+        return [entry.effect for entry in self._entries.values() if entry.negative]
+
+    def has_negative_effects(self) -> bool:
+        return bool(self._negative_timed or self._negative_permanent)
+
+    def find(self, name: str, effect_type: Optional[str] = None) -> Optional[Dict]:
+        """Find the first effect with the given name (and type, if given)"""
+        for entry in self._entries.values():
+            effect = entry.effect
+            if effect.get('name') == name and (effect_type is None or effect.get('type') == effect_type):
+                self._sync()
+                return effect
+        return None
+
+    def advance(self) -> List[Dict]:
+        """Advance one session, removing timed effects whose duration ran out"""
+        self._tick += 1
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] <= self._tick:
+            _, _, entry = heapq.heappop(heap)
+            if entry.active:
+                self._discard(entry, from_heap=True)
+                expired.append(entry.effect)
+        return expired
+
+    def invalidate(self) -> None:
+        """Drop the cached modifier after an effect dict was edited in place"""
+        self._modifier = None
+
+    def get_counts(self) -> Dict[str, int]:
+        """Get the number of effects held in each bucket"""
+        return {
+            "positive_timed": len(self._positive_timed),
+            "positive_permanent": len(self._positive_permanent),
+            "negative_timed": len(self._negative_timed),
+            "negative_permanent": len(self._negative_permanent)
+        }
+
+    # ----- internals -----
+
+    def _bucket(self, entry: _EffectEntry) -> Dict[int, _EffectEntry]:
+        if entry.negative:
+            return self._negative_permanent if entry.expires_at is None else self._negative_timed
+        return self._positive_permanent if entry.expires_at is None else self._positive_timed
+
+    def _discard(self, entry: _EffectEntry, from_heap: bool = False) -> None:
+        key = id(entry.effect)
+        if entry.expires_at is not None:
+            # Leave the effect's final remaining duration on the dict
+            entry.effect['remaining_duration'] = max(0, entry.expires_at - 1 - self._tick)
+        del self._entries[key]
+        del self._bucket(entry)[key]
+        entry.active = False  # Stale heap items are skipped lazily in advance()
+        self._modifier = None
+
+        if not from_heap and not self._entries:
+            self._heap.clear()
+
+    def _sync(self) -> None:
+        """Write the current remaining_duration back onto timed effect dicts"""
+        if self._synced_tick == self._tick:
+            return
+        for bucket in (self._positive_timed, self._negative_timed):
+            for entry in bucket.values():
+                entry.effect['remaining_duration'] = entry.expires_at - 1 - self._tick
+        self._synced_tick = self._tick
@@ -0,0 +1,173 @@
+"""
+Encounter Packs for Cultivation Game
+Compiles JSON encounter definitions to content-hashed binary caches and loads them lazily
+"""
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+PACK_HEADER = struct.Struct("<4sB32sI")  # magic, version, source sha256, index length
+PACK_MAGIC = b"CEP1"
+PACK_VERSION = 1
+SOURCE_VERSION = 1
+
+
+def _section_key(group: str, rarity: str) -> str:
+    return f"{group}/{rarity}"
+
+
+def build_pack(source: bytes) -> bytes:
+    """
+    Compile JSON pack source to the binary pack layout
+
+    Entries are split into one pickled section per (group, rarity) so a
+    loader only decodes the rarities it needs. Each entry keeps its position
+    in the source, letting loaders restore the authored order across sections.
+    """
+    document = json.loads(source.decode("utf-8"))
+    if document.get("version") != SOURCE_VERSION:
+        raise ValueError(f"Unsupported encounter pack version: {document.get('version')}")
+
+    sections: Dict[str, List[Tuple[int, Dict]]] = {}
+    for group, entries in document["groups"].items():
+        for position, entry in enumerate(entries):
+            if "name" not in entry or "rarity" not in entry:
+                raise ValueError(f"Encounter #{position} in group '{group}' needs a name and a rarity")
+            sections.setdefault(_section_key(group, entry["rarity"]), []).append((position, entry))
+
+    body = bytearray()
+    index = {"pack": document.get("pack", ""), "sections": {}}
+    for key, entries in sections.items():
+        blob = pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL)
+        index["sections"][key] = (len(body), len(blob))
+        body += blob
+
+    index_blob = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+    header = PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, hashlib.sha256(source).digest(), len(index_blob))
+    return header + index_blob + bytes(body)
+
+
+def cache_path(source_path: str, digest: str, cache_dir: str = CACHE_DIR) -> str:
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{name}.{digest[:16]}.pack")
+
+
+def compile_pack(source_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """Compile a pack source if its cache is missing or stale; returns the cache path"""
+    with open(source_path, "rb") as f:
+        source = f.read()
+    target = cache_path(source_path, hashlib.sha256(source).hexdigest(), cache_dir)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(build_pack(source))
+    os.replace(temp_path, target)
+
+    # Drop caches compiled from older versions of the same source
+    prefix = os.path.splitext(os.path.basename(source_path))[0] + "."
+    for stale in glob.glob(os.path.join(cache_dir, prefix + "*.pack")):
+        if stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return target
+
+
+class EncounterPack:
+    """
+    Read-only view of a compiled pack
+
+    The pack file is memory-mapped and only the index is decoded up front;
+    each (group, rarity) section is unpickled the first time it is asked for.
+    """
+
+    def __init__(self, buffer, source_hash: str = ""):
+        magic, version, digest, index_length = PACK_HEADER.unpack_from(buffer)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError("Unrecognized encounter pack")
+        if source_hash and digest.hex() != source_hash:
+            raise ValueError("Encounter pack does not match its source")
+        self._buffer = buffer
+        index_start = PACK_HEADER.size
+        self._body_start = index_start + index_length
+        index = pickle.loads(buffer[index_start:self._body_start])
+        self.name: str = index["pack"]
+        self.source_hash = digest.hex()
+        self._sections: Dict[str, Tuple[int, int]] = index["sections"]
+        self._loaded: Dict[str, List[Tuple[int, Dict]]] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "EncounterPack":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    def groups(self) -> List[str]:
+        return list(dict.fromkeys(key.split("/", 1)[0] for key in self._sections))
+
+    def rarities(self, group: str) -> List[str]:
+        return [key.split("/", 1)[1] for key in self._sections if key.startswith(group + "/")]
+
+    def section(self, group: str, rarity: str) -> List[Tuple[int, Dict]]:
+        """(source position, entry) pairs for one group and rarity, decoded on first use"""
+        key = _section_key(group, rarity)
+        entries = self._loaded.get(key)
+        if entries is None:
+            location = self._sections.get(key)
+            if location is None:
+                return []
+            offset, length = location
+            start = self._body_start + offset
+            entries = pickle.loads(self._buffer[start:start + length])
+            self._loaded[key] = entries
+        return entries
+
+    def load(self, group: str, rarities: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Entries of a group (optionally only some rarities) in authored order"""
+        if rarities is None:
+            rarities = self.rarities(group)
+        positioned = []
+        for rarity in rarities:
+            positioned.extend(self.section(group, rarity))
+        positioned.sort(key=lambda item: item[0])
+        return [entry for _, entry in positioned]
+
+
+@lru_cache(maxsize=None)
+def load_pack(name: str, data_dir: str = DATA_DIR) -> EncounterPack:
+    """Load data/<name>.json through its compiled cache, compiling it first if needed"""
+    source_path = os.path.join(data_dir, f"{name}.json")
+    try:
+        return EncounterPack.open(compile_pack(source_path, os.path.join(data_dir, ".cache")))
+    except OSError:
+        # Read-only install: compile in memory instead of caching on disk
+        with open(source_path, "rb") as f:
+            source = f.read()
+        return EncounterPack(build_pack(source), hashlib.sha256(source).hexdigest())
+
+
+if __name__ == "__main__":
+    # Build step: compile every pack under data/
+    for source_path in sorted(glob.glob(os.path.join(DATA_DIR, "*.json"))):
+        with open(source_path, "rb") as f:
+            document = json.load(f)
+        if "groups" not in document:
+            continue
+        target = compile_pack(source_path)
+        pack = EncounterPack.open(target)
+        counts = {group: len(pack.load(group)) for group in pack.groups()}
+        print(f"{os.path.basename(source_path)} -> {os.path.relpath(target, DATA_DIR)} {counts}")
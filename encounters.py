@@ -3,11 +3,13 @@ Cultivation Game - Enhanced Encounter System
 Handles location-specific encounters with dynamic difficulty scaling
 """
 
-import random
 from typing import Dict, List, Optional
+from rng import GameRNG, default_rng
 
 class EncounterManager:
-    def __init__(self):
+    def __init__(self, rng: Optional[GameRNG] = None):
+        self.rng = rng if rng is not None else default_rng()
+        
         # Base encounter chances (modified by location difficulty)
         self.base_encounter_chance = 0.30
         
@@ -33,12 +35,12 @@ class EncounterManager:
         # Adjust encounter chance based on location difficulty
         encounter_chance = self.base_encounter_chance * difficulty_multiplier
         
-        if random.random() > encounter_chance:
+        if self.rng.random() > encounter_chance:
             return None
         
         # Determine encounter type with location-influenced weights
         weights = self._adjust_weights_for_difficulty(difficulty_multiplier)
-        encounter_type = random.choices(
+        encounter_type = self.rng.choices(
             list(weights.keys()),
             weights=list(weights.values())
         )[0]
@@ -48,7 +50,7 @@ class EncounterManager:
         if not encounters_pool:
             return None
         
-        encounter_description = random.choice(encounters_pool)
+        encounter_description = self.rng.choice(encounters_pool)
         
         # Process encounter effects
         encounter_result = {
@@ -101,20 +103,20 @@ class EncounterManager:
     
     def _apply_positive_effects(self, player, difficulty_multiplier: float, encounter_result: Dict):
         """Apply positive encounter effects"""
-        effect_roll = random.random()
+        effect_roll = self.rng.random()
         
         # Scale positive effects with location difficulty (better rewards in dangerous places)
         power_multiplier = max(1.0, difficulty_multiplier * 0.8)
         
         if effect_roll < 0.3:
             # Experience boost
-            exp_bonus = int(random.randint(3, 8) * power_multiplier)
+            exp_bonus = int(self.rng.randint(3, 8) * power_multiplier)
             player.cultivation_experience += exp_bonus
             encounter_result['effect'] = f"+{exp_bonus} cultivation experience"
             
         elif effect_roll < 0.5:
             # Spirit stone bonus
-            stone_bonus = int(random.randint(1, 3) * power_multiplier)
+            stone_bonus = int(self.rng.randint(1, 3) * power_multiplier)
             player.spirit_stones['low'] += stone_bonus
             encounter_result['effect'] = f"+{stone_bonus} Low Spirit Stones"
             
@@ -126,7 +128,7 @@ class EncounterManager:
                 "Harmonious State (+8% next breakthrough chance)",
                 "Enlightened Mind (+12% cultivation insight)"
             ]
-            effect = random.choice(boost_effects)
+            effect = self.rng.choice(boost_effects)
             player.active_effects.append(effect)
             encounter_result['effect'] = f"Gained: {effect}"
             
@@ -135,24 +137,24 @@ class EncounterManager:
             if player.active_effects:
                 negative_effects = [e for e in player.active_effects if any(word in e.lower() for word in ['disrupted', 'blocked', 'impaired', 'unstable'])]
                 if negative_effects:
-                    removed_effect = random.choice(negative_effects)
+                    removed_effect = self.rng.choice(negative_effects)
                     player.active_effects.remove(removed_effect)
                     encounter_result['effect'] = f"Cleansed: {removed_effect}"
                 else:
                     # No negative effects to remove, give experience instead
-                    exp_bonus = int(random.randint(2, 5) * power_multiplier)
+                    exp_bonus = int(self.rng.randint(2, 5) * power_multiplier)
                     player.cultivation_experience += exp_bonus
                     encounter_result['effect'] = f"+{exp_bonus} cultivation experience"
             else:
                 # No effects to remove, give experience
-                exp_bonus = int(random.randint(2, 5) * power_multiplier)
+                exp_bonus = int(self.rng.randint(2, 5) * power_multiplier)
                 player.cultivation_experience += exp_bonus
                 encounter_result['effect'] = f"+{exp_bonus} cultivation experience"
         else:
             # Rare powerful bonus (higher chance in dangerous locations)
-            if difficulty_multiplier >= 1.5 and random.random() < 0.3:
+            if difficulty_multiplier >= 1.5 and self.rng.random() < 0.3:
                 # Chance for higher grade spirit stones in dangerous locations
-                if random.random() < 0.7:
+                if self.rng.random() < 0.7:
                     player.spirit_stones['mid'] += 1
                     encounter_result['effect'] = "+1 Mid Spirit Stone (rare find!)"
                 else:
@@ -165,7 +167,7 @@ class EncounterManager:
                     "Qi Purification (removes all negative effects)",
                     "Spiritual Resonance (+15% cultivation efficiency)"
                 ]
-                effect = random.choice(powerful_effects)
+                effect = self.rng.choice(powerful_effects)
                 
                 if "removes all negative effects" in effect:
                     # Actually remove all negative effects
@@ -178,7 +180,7 @@ class EncounterManager:
     
     def _apply_negative_effects(self, player, difficulty_multiplier: float, encounter_result: Dict):
         """Apply negative encounter effects"""
-        effect_roll = random.random()
+        effect_roll = self.rng.random()
         
         # Scale negative effects with location difficulty
         severity_multiplier = difficulty_multiplier
@@ -201,16 +203,16 @@ class EncounterManager:
                 ]
                 impairments.extend(severe_impairments)
             
-            effect = random.choice(impairments)
+            effect = self.rng.choice(impairments)
             player.active_effects.append(effect)
             encounter_result['effect'] = f"Afflicted: {effect}"
             
         elif effect_roll < 0.6:
             # Experience loss
             if player.cultivation_experience > 0:
-                exp_loss = min(random.randint(2, 6), player.cultivation_experience)
+                exp_loss = min(self.rng.randint(2, 6), player.cultivation_experience)
                 if severity_multiplier >= 1.5:
-                    exp_loss = min(random.randint(4, 10), player.cultivation_experience)
+                    exp_loss = min(self.rng.randint(4, 10), player.cultivation_experience)
                 
                 player.cultivation_experience -= exp_loss
                 encounter_result['effect'] = f"-{exp_loss} cultivation experience"
@@ -225,9 +227,9 @@ class EncounterManager:
             if sum(player.spirit_stones.values()) > 0:
                 # Lose low spirit stones first
                 if player.spirit_stones['low'] > 0:
-                    loss = min(random.randint(1, 2), player.spirit_stones['low'])
+                    loss = min(self.rng.randint(1, 2), player.spirit_stones['low'])
                     if severity_multiplier >= 1.5:
-                        loss = min(random.randint(1, 4), player.spirit_stones['low'])
+                        loss = min(self.rng.randint(1, 4), player.spirit_stones['low'])
                     
                     player.spirit_stones['low'] -= loss
                     encounter_result['effect'] = f"-{loss} Low Spirit Stones"
@@ -244,14 +246,14 @@ class EncounterManager:
         
         else:
             # Severe encounter (more likely in dangerous locations)
-            if severity_multiplier >= 1.8 and random.random() < 0.3:
+            if severity_multiplier >= 1.8 and self.rng.random() < 0.3:
                 # Chance for cultivation session interruption in very dangerous places
                 severe_effects = [
                     "Qi Deviation (cultivation session interrupted!)",
                     "Spiritual Backlash (cultivation session interrupted!)",
                     "Environmental Hazard (cultivation session interrupted!)"
                 ]
-                effect = random.choice(severe_effects)
+                effect = self.rng.choice(severe_effects)
                 player.active_effects.append(effect.split(" (")[0])  # Add the effect without the interruption note
                 encounter_result['effect'] = f"Critical: {effect}"
                 encounter_result['interrupts'] = True
@@ -262,13 +264,13 @@ class EncounterManager:
                     "Spiritual Contamination (-8% cultivation purity)",
                     "Foundation Damage (-12% next breakthrough chance)"
                 ]
-                effect = random.choice(severe_effects)
+                effect = self.rng.choice(severe_effects)
                 player.active_effects.append(effect)
                 encounter_result['effect'] = f"Severe: {effect}"
     
     def _apply_neutral_effects(self, player, difficulty_multiplier: float, encounter_result: Dict):
         """Apply neutral encounter effects (usually informational or minor temporary)"""
-        effect_roll = random.random()
+        effect_roll = self.rng.random()
         
         if effect_roll < 0.5:
             # Informational encounters - no mechanical effect
@@ -279,7 +281,7 @@ class EncounterManager:
                 "Ancient wisdom becomes clearer to you",
                 "The connection between mind and spirit deepens"
             ]
-            encounter_result['effect'] = random.choice(insights)
+            encounter_result['effect'] = self.rng.choice(insights)
             
         elif effect_roll < 0.8:
             # Minor temporary effects (neutral)
@@ -289,7 +291,7 @@ class EncounterManager:
                 "Energy Circulation (temporary qi balance)",
                 "Mindful State (temporary emotional stability)"
             ]
-            effect = random.choice(temp_effects)
+            effect = self.rng.choice(temp_effects)
             encounter_result['effect'] = f"Temporary: {effect}"
             # Note: These don't go into active_effects as they're very temporary
             
@@ -302,7 +304,7 @@ class EncounterManager:
                 "The local qi formations reveal optimization opportunities",
                 "You notice signs of legendary cultivators' passage"
             ]
-            encounter_result['effect'] = random.choice(discoveries)
+            encounter_result['effect'] = self.rng.choice(discoveries)
     
     def _display_encounter(self, encounter_result: Dict):
         """Display encounter to player with improved formatting"""
@@ -0,0 +1,33 @@
+"""
+Immutable Shared Data for Cultivation Game
+Freezes catalog definitions into read-only structures that every player can share
+"""
+
+import sys
+from types import MappingProxyType
+from typing import Any
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively convert dicts to read-only mappings and lists to tuples
+
+    Strings are interned so identical names and descriptions are stored once.
+    Anything else (numbers, None, frozen dataclasses) is returned unchanged.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({freeze(key): freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Deep mutable copy of frozen data (e.g. an ongoing effect handed to a player)"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
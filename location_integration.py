@@ -66,7 +66,7 @@ class LocationIntegrationHelper:
         for grade, amount in base_reward.items():
             bonus_amount = max(1, int(amount * sessions * bonus_multiplier))
             if bonus_amount > 0:
-                player.spirit_stones.add_stones(grade, bonus_amount)
+                player.spirit_stones.add_stones(grade, bonus_amount, source="location_bonus")
                 bonus_stones[grade] = bonus_amount
         
         return bonus_stones if bonus_stones else None
@@ -88,6 +88,8 @@ class LocationIntegrationHelper:
             # Append location flavor to existing description
             flavor = location_flavors[encounter_type] if encounter_type in location_flavors else location_flavors.get('default', '')
             if flavor:
+                # Encounter definitions are shared and read-only, so flavor a copy
+                encounter_data = dict(encounter_data)
                 encounter_data['description'] += f" {flavor}"
         
         return encounter_type, encounter_data
@@ -4,10 +4,10 @@ Handles different cultivation areas with unique encounters and rewards
 Compatible with existing SmartEncounterManager and SpiritStoneManager
 """
 
-import random
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
+from rng import GameRNG, default_rng
 
 class LocationType(Enum):
     PEACEFUL = "peaceful"
@@ -29,7 +29,8 @@ class LocationInfo:
     elemental_affinities: List[str]  # Elements that are enhanced here
 
 class LocationManager:
-    def __init__(self):
+    def __init__(self, rng: Optional[GameRNG] = None):
+        self.rng = rng if rng is not None else default_rng()
         self.locations = self._initialize_locations()
         self.current_location = LocationType.PEACEFUL
         
@@ -131,25 +132,36 @@ class LocationManager:
     
     def get_cultivation_bonuses(self, location_type: LocationType, player) -> Dict[str, float]:
         """Get cultivation bonuses for the player at this location"""
+        dao_bonuses, elemental_bonuses = self.get_cultivation_bonus_vectors(location_type, player)
+        bonuses = {f"{philosophy}_dao": bonus for philosophy, bonus in dao_bonuses.items()}
+        bonuses.update({f"{element}_element": bonus for element, bonus in elemental_bonuses.items()})
+        return bonuses
+    
+    def get_cultivation_bonus_vectors(self, location_type: LocationType, player) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Get cultivation bonuses split into (dao bonuses, elemental bonuses) keyed by dao/element"""
         location_info = self.locations[location_type]
-        bonuses = {}
         
-        # Philosophy bonuses (now using dao_comprehension instead of philosophy)
+        # Philosophy bonuses scale with existing dao comprehension
+        dao_bonuses = {}
         for philosophy, bonus in location_info.philosophy_bonuses.items():
-            # Use dao_comprehension instead of philosophy
             current_dao = player.dao_comprehension.get(philosophy, 0)
-            # Bonus scales with existing dao comprehension
-            actual_bonus = bonus * (1 + current_dao * 0.1)
-            bonuses[f"{philosophy}_dao"] = actual_bonus
+            dao_bonuses[philosophy] = bonus * (1 + current_dao * 0.1)
         
-        # Elemental affinity bonuses
+        # Small elemental bonus for cultivating in an aligned environment
+        elemental_bonuses = {}
         for element in location_info.elemental_affinities:
             current_affinity = player.elemental_affinities.get(element, 0)
-            # Small bonus for cultivating in aligned environment
             if current_affinity > 0:
-                bonuses[f"{element}_element"] = 0.02 * current_affinity
+                elemental_bonuses[element] = 0.02 * current_affinity
         
-        return bonuses
+        return dao_bonuses, elemental_bonuses
+    
+    def apply_cultivation_bonuses(self, location_type: LocationType, player,
+                                  dao_scale: float = 1.0, element_scale: float = 0.5) -> None:
+        """Apply this location's dao and elemental bonuses to the player"""
+        dao_bonuses, elemental_bonuses = self.get_cultivation_bonus_vectors(location_type, player)
+        player.dao_comprehension.add_known({k: v for k, v in dao_bonuses.items() if v > 0}, dao_scale)
+        player.elemental_affinities.add_known(elemental_bonuses, element_scale)
     
     def modify_encounter_for_location(self, location_type: LocationType, encounter_result):
         """Modify encounter based on location characteristics"""
@@ -187,7 +199,7 @@ class LocationManager:
         }
         
         if location_type in location_flavors:
-            flavor = random.choice(location_flavors[location_type])
+            flavor = self.rng.choice(location_flavors[location_type])
             if 'description' in modified_data:
                 modified_data['description'] += f" {flavor}"
             else:
@@ -200,7 +212,7 @@ class LocationManager:
                 rarities = ['common', 'uncommon', 'rare', 'epic', 'legendary']
                 current_index = rarities.index(modified_data['rarity'])
                 # Small chance to upgrade rarity in dangerous locations
-                if random.random() < (location_info.encounter_difficulty - 1.0) * 0.3:
+                if self.rng.random() < (location_info.encounter_difficulty - 1.0) * 0.3:
                     new_index = min(current_index + 1, len(rarities) - 1)
                     modified_data['rarity'] = rarities[new_index]
         
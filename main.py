@@ -6,7 +6,6 @@ Combines all systems: Realm/Stage, Foundation, Choice Encounters, and Locations
 import os
 import sys
 import time
-import random
 from typing import Optional, Dict, List
 
 # Import all the enhanced systems
@@ -19,22 +18,33 @@ try:
     from save_system import SaveSystem
     from locations import LocationManager, LocationType
     from spirit_stones import generate_spirit_stone_reward, format_spirit_stone_reward
+    from rng import GameRNG
+    from cultivation_events import (
+        EncounterTriggered, FoundationChanged, StageAdvanced, BreakthroughReady,
+        SpiritStonesEarned, render_events
+    )
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("🔧 Please make sure all required modules are in the same directory")
     input("Press Enter to exit...")
     sys.exit(1)
 
+# Events worth showing for each session of a multi-session run
+BATCH_EVENT_TYPES = (StageAdvanced, BreakthroughReady, FoundationChanged, SpiritStonesEarned)
+
+
 class EnhancedCultivationGame:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # One random stream per game session (a fixed seed replays the same session)
+        self.rng = GameRNG(seed)
         self.player: Optional[EnhancedPlayer] = None
-        self.realm_manager = RealmStageManager()
-        self.choice_manager = CultivationChoiceManager()
+        self.realm_manager = RealmStageManager(rng=self.rng)
+        self.choice_manager = CultivationChoiceManager(rng=self.rng)
         self.background_system = BackgroundSystem()
         self.intro_story = IntroStory()
         self.story_display = StoryDisplay()
         self.save_system = SaveSystem()
-        self.location_manager = LocationManager()
+        self.location_manager = LocationManager(rng=self.rng)
         self.unlocked_locations_this_session = []
         self.game_running = True
         self.current_session = 0
@@ -134,7 +144,8 @@ class EnhancedCultivationGame:
                 print("Please enter a valid number.")
         
         # Create enhanced player
-        self.player = EnhancedPlayer(name)
+        self.player = EnhancedPlayer(name, rng=self.rng)
+        self.save_system.attach_stone_journal(self.player)
         
         # Apply background bonuses
         self.background_system.apply_background_to_player(self.player, background_type)
@@ -169,17 +180,18 @@ class EnhancedCultivationGame:
         if save_data:
             try:
                 # Try to load as enhanced player
-                self.player = EnhancedPlayer.from_save_data(save_data)
+                self.player = EnhancedPlayer.from_save_data(save_data, rng=self.rng)
             except:
                 try:
                     # Try to load as old player and migrate
                     from player import Player as OldPlayer
                     old_player = self.save_system.dict_to_player(save_data)
-                    self.player = migrate_old_player_to_enhanced(old_player)
+                    self.player = migrate_old_player_to_enhanced(old_player, rng=self.rng)
                     print("🔄 Migrated old save to new enhanced system!")
                 except:
                     print("❌ Could not load save data. Starting new game...")
                     return self.start_new_game()
+            self.save_system.attach_stone_journal(self.player)
             
             print(f"✨ Welcome back, {self.player.name}!")
             current_location = self.location_manager.get_current_location()
@@ -261,22 +273,19 @@ class EnhancedCultivationGame:
         print(f"🧘 **{self.player.name}** - Cultivation Status")
         print("="*70)
         
-        # Cultivation progress
-        cultivation_title = self.realm_manager.get_cultivation_title(self.player.realm, self.player.stage)
-        next_stage_exp = self.player.get_next_stage_exp_requirement()
+        # Cultivation progress (derived values come from the player's cached snapshot)
+        stats = self.player.stats
+        next_stage_exp = stats.next_stage_exp_requirement
         
-        print(f"⚡ Cultivation: {cultivation_title}")
-        print(f"📊 Progress: {self.player.experience}/{self.player.get_current_stage_exp_requirement()} experience")
+        print(f"⚡ Cultivation: {stats.cultivation_title}")
+        print(f"📊 Progress: {self.player.experience}/{stats.stage_exp_requirement} experience")
         if next_stage_exp > 0:
             print(f"🎯 Next Stage: {next_stage_exp} experience required")
         
         print(f"🏗️ Foundation: {self.player.foundation_quality} quality")
         
         # Combat power
-        combat_power = self.realm_manager.calculate_combat_power(
-            self.player.realm, self.player.stage, self.player.foundation_quality
-        )
-        print(f"⚔️ Combat Power: {combat_power:,}")
+        print(f"⚔️ Combat Power: {stats.combat_power:,}")
         
         # Location info
         print(f"\n📍 Location: {location_info.name}")
@@ -309,16 +318,10 @@ class EnhancedCultivationGame:
         
         # Breakthrough status
         if self.player.stage == 9:
-            can_breakthrough, msg = self.realm_manager.can_breakthrough_realm(
-                self.player.realm, self.player.stage, self.player.foundation_quality
-            )
-            if can_breakthrough:
-                success_rate = self.realm_manager.calculate_breakthrough_success_rate(
-                    self.player.realm, self.player.foundation_quality
-                )
-                print(f"🌟 Ready for breakthrough! Success rate: {success_rate:.1%}")
+            if stats.can_breakthrough:
+                print(f"🌟 Ready for breakthrough! Success rate: {stats.breakthrough_success_rate:.1%}")
             else:
-                print(f"⚠️ {msg}")
+                print(f"⚠️ {stats.breakthrough_message}")
         elif self.player.recovery_time > 0:
             print(f"🩹 Recovering from failed breakthrough ({self.player.recovery_time} sessions)")
         
@@ -444,18 +447,7 @@ class EnhancedCultivationGame:
                 time.sleep(2)
         
         # Apply location bonuses
-        bonuses = self.location_manager.get_cultivation_bonuses(current_location, self.player)
-        if bonuses:
-            for bonus_name, bonus_value in bonuses.items():
-                if bonus_value > 0:
-                    if 'dao' in bonus_name or 'philosophy' in bonus_name:
-                        dao_type = bonus_name.split('_')[0]
-                        if dao_type in self.player.dao_comprehension:
-                            self.player.dao_comprehension[dao_type] += bonus_value
-                    elif 'element' in bonus_name:
-                        elem_type = bonus_name.split('_')[0]
-                        if elem_type in self.player.elemental_affinities:
-                            self.player.elemental_affinities[elem_type] += bonus_value * 0.5
+        self.location_manager.apply_cultivation_bonuses(current_location, self.player)
         
         # Perform cultivation
         messages = self.player.cultivate_with_choice(focus)
@@ -467,11 +459,11 @@ class EnhancedCultivationGame:
         # Location spirit stone bonus
         stone_multiplier = self.location_manager.get_spirit_stone_multiplier(current_location)
         if stone_multiplier > 1.0:
-            bonus_stones = generate_spirit_stone_reward(self.player.realm.value)
+            bonus_stones = generate_spirit_stone_reward(self.player.realm.value, rng=self.rng)
             if bonus_stones:
                 for grade, amount in bonus_stones.items():
                     bonus_amount = max(1, int(amount * (stone_multiplier - 1.0)))
-                    self.player.spirit_stones.add_stones(grade, bonus_amount)
+                    self.player.spirit_stones.add_stones(grade, bonus_amount, source="location_bonus")
                 
                 bonus_display = format_spirit_stone_reward(bonus_stones)
                 print(f"   🌟 Location bonus: {bonus_display}")
@@ -525,12 +517,15 @@ class EnhancedCultivationGame:
         choice_encounters = 0
         breakthrough_attempts = 0
         
+        # Sample the next interrupting choice encounter instead of rolling every session
+        next_choice_session = self.choice_manager.next_choice_session(self.current_session + 1)
+        
         for i in range(sessions):
             self.current_session += 1
             print(f"\n--- Session {i+1} ---")
             
             # Check for choice encounter interruption
-            if self.choice_manager.should_trigger_choice_encounter(self.current_session):
+            if self.current_session == next_choice_session:
                 choice_encounter = self.choice_manager.get_choice_encounter(self.player.realm.value)
                 if choice_encounter:
                     choice_encounters += 1
@@ -555,36 +550,28 @@ class EnhancedCultivationGame:
                         if result.get('outcomes'):
                             for outcome in result['outcomes']:
                                 print(f"   • {outcome}")
+                
+                # A processed choice resets the gap, so sample after it
+                next_choice_session = self.choice_manager.next_choice_session(self.current_session + 1)
             
             # Apply location bonuses (reduced for batch)
-            bonuses = self.location_manager.get_cultivation_bonuses(current_location, self.player)
-            for bonus_name, bonus_value in bonuses.items():
-                if bonus_value > 0:
-                    if 'dao' in bonus_name:
-                        dao_type = bonus_name.split('_')[0]
-                        if dao_type in self.player.dao_comprehension:
-                            self.player.dao_comprehension[dao_type] += bonus_value * 0.3
-                    elif 'element' in bonus_name:
-                        elem_type = bonus_name.split('_')[0]
-                        if elem_type in self.player.elemental_affinities:
-                            self.player.elemental_affinities[elem_type] += bonus_value * 0.15
+            self.location_manager.apply_cultivation_bonuses(current_location, self.player,
+                                                            dao_scale=0.3, element_scale=0.15)
             
             # Cultivate
-            session_details = self.player.last_session_details
-            messages = self.player.cultivate_with_choice(focus)
+            events = self.player.cultivate_events(focus)
             
             # Track progress
-            if session_details and 'foundation_gained' in session_details:
-                total_foundation_gained += session_details['foundation_gained']
-            
-            if session_details and session_details.get('encounter'):
-                total_encounters += 1
+            for event in events:
+                # Gains from cultivation and encounters; stage milestone bonuses aren't counted
+                if isinstance(event, FoundationChanged) and event.amount > 0 and event.source != "stage":
+                    total_foundation_gained += event.amount
+                elif isinstance(event, EncounterTriggered):
+                    total_encounters += 1
             
             # Show key results
-            for message in messages:
-                if any(keyword in message.lower() for keyword in 
-                      ['advanced', 'breakthrough', 'foundation', 'spirit stones']):
-                    print(f"   {message}")
+            for message in render_events(events, only=BATCH_EVENT_TYPES):
+                print(f"   {message}")
             
             # Check for realm breakthrough opportunity
             if self.player.stage == 9 and self.player.recovery_time == 0:
@@ -606,11 +593,11 @@ class EnhancedCultivationGame:
         # Apply batch location bonus
         stone_multiplier = self.location_manager.get_spirit_stone_multiplier(current_location)
         if stone_multiplier > 1.0:
-            bonus_stones = generate_spirit_stone_reward(self.player.realm.value)
+            bonus_stones = generate_spirit_stone_reward(self.player.realm.value, rng=self.rng)
             if bonus_stones:
                 for grade, amount in bonus_stones.items():
                     bonus_amount = max(1, int(amount * sessions * (stone_multiplier - 1.0) * 0.3))
-                    self.player.spirit_stones.add_stones(grade, bonus_amount)
+                    self.player.spirit_stones.add_stones(grade, bonus_amount, source="location_bonus")
         
         # Display summary
         final_stage = self.player.stage
@@ -646,14 +633,14 @@ class EnhancedCultivationGame:
             # Offer meditation for foundation/dao benefits
             meditate = input("\nMeditate for spiritual growth? (y/n): ").lower().strip()
             if meditate == 'y':
-                foundation_gain = random.randint(1, 3)
-                dao_gain = random.randint(1, 2)
+                foundation_gain = self.rng.randint(1, 3)
+                dao_gain = self.rng.randint(1, 2)
                 
                 self.player.foundation_quality += foundation_gain
                 # Random dao insight
                 available_dao = [dao for dao, value in self.player.dao_comprehension.items() if value < 50]
                 if available_dao:
-                    chosen_dao = random.choice(available_dao)
+                    chosen_dao = self.rng.choice(available_dao)
                     self.player.dao_comprehension[chosen_dao] += dao_gain
                     print(f"🧘 Peaceful meditation grants +{foundation_gain} foundation and +{dao_gain} {chosen_dao} dao")
                 else:
@@ -674,7 +661,7 @@ class EnhancedCultivationGame:
         
         if success:
             # Additional benefits from successful meditation
-            foundation_bonus = random.randint(1, 2)
+            foundation_bonus = self.rng.randint(1, 2)
             self.player.foundation_quality += foundation_bonus
             print(f"🏗️ Meditation also strengthened your foundation: +{foundation_bonus}")
         
@@ -706,9 +693,7 @@ class EnhancedCultivationGame:
             return
         
         # Show breakthrough information
-        success_rate = self.realm_manager.calculate_breakthrough_success_rate(
-            self.player.realm, self.player.foundation_quality
-        )
+        success_rate = self.player.stats.breakthrough_success_rate
         next_realm = self.realm_manager.get_next_realm(self.player.realm)
         
         print(f"📊 **Breakthrough Analysis:**")
@@ -830,8 +815,19 @@ class EnhancedCultivationGame:
             if effect.get('description'):
                 print(f"   {effect['description']}")
         
+        plan = self.player.plan_cures()
+        if len(plan["effects"]) > 1:
+            print(f"\n💡 A: cure the best affordable set ({len(plan['effects'])} effects, "
+                  f"{plan['total_cost']:,} 🔸 equivalent, experience x{plan['exp_multiplier_recovered']:.2f})")
+        
         try:
-            choice = int(input(f"\nWhich effect to cure? (1-{len(negative_effects)}, 0 to cancel): "))
+            answer = input(f"\nWhich effect to cure? (1-{len(negative_effects)}, 0 to cancel): ").strip()
+            if answer.lower() == "a" and len(plan["effects"]) > 1:
+                success, message = self.player.cure_best()
+                print(f"\n{message}")
+                self.wait_for_enter()
+                return
+            choice = int(answer)
             if choice == 0:
                 return
             elif 1 <= choice <= len(negative_effects):
@@ -997,10 +993,7 @@ class EnhancedCultivationGame:
         print(f"   Foundation: {self.player.foundation_quality} quality")
         
         # Combat analysis
-        combat_power = self.realm_manager.calculate_combat_power(
-            self.player.realm, self.player.stage, self.player.foundation_quality
-        )
-        print(f"   Combat Power: {combat_power:,}")
+        print(f"   Combat Power: {self.player.stats.combat_power:,}")
         
         # Background information
         if hasattr(self.player, 'background'):
@@ -1058,16 +1051,11 @@ class EnhancedCultivationGame:
         # Breakthrough status
         if self.player.stage == 9:
             print(f"\n🌟 **Breakthrough Status:**")
-            can_breakthrough, msg = self.realm_manager.can_breakthrough_realm(
-                self.player.realm, self.player.stage, self.player.foundation_quality
-            )
-            if can_breakthrough:
-                success_rate = self.realm_manager.calculate_breakthrough_success_rate(
-                    self.player.realm, self.player.foundation_quality
-                )
-                print(f"   Ready for breakthrough! Success rate: {success_rate:.1%}")
+            stats = self.player.stats
+            if stats.can_breakthrough:
+                print(f"   Ready for breakthrough! Success rate: {stats.breakthrough_success_rate:.1%}")
             else:
-                print(f"   {msg}")
+                print(f"   {stats.breakthrough_message}")
         
         print("="*60)
         self.wait_for_enter()
@@ -1080,7 +1068,7 @@ class EnhancedCultivationGame:
         
         # Dao comprehension
         print("\n🧠 **Dao Comprehension:**")
-        total_dao = sum(self.player.dao_comprehension.values())
+        total_dao = self.player.dao_comprehension.total()
         if total_dao == 0:
             print("   No dao insights yet. Gain comprehension through encounters and cultivation.")
         else:
@@ -1181,17 +1169,15 @@ class EnhancedCultivationGame:
         print("="*60)
         
         # Current combat power
-        combat_power = self.realm_manager.calculate_combat_power(
-            self.player.realm, self.player.stage, self.player.foundation_quality
-        )
+        stats = self.player.stats
+        combat_power = stats.combat_power
         
         print(f"\n🔥 **Your Combat Power: {combat_power:,}**")
         
         # Power breakdown
-        realm_info = self.realm_manager.get_realm_info(self.player.realm)
-        base_power = realm_info.power_multiplier * 100
-        stage_bonus = base_power * (self.player.stage - 1) * 0.2
-        foundation_bonus = self.player.foundation_quality * 2
+        base_power = stats.base_power
+        stage_bonus = stats.stage_bonus
+        foundation_bonus = stats.foundation_power
         
         print(f"\n📊 **Power Breakdown:**")
         print(f"   Realm Base: {base_power:,.0f}")
@@ -1219,7 +1205,7 @@ class EnhancedCultivationGame:
         # Cross-realm comparisons
         print(f"\nVs Other Realms:")
         realm_list = list(CultivationRealm)
-        current_index = realm_list.index(self.player.realm)
+        current_index = self.player.realm_index
         
         # Lower realm
         if current_index > 0:
@@ -1288,18 +1274,15 @@ class EnhancedCultivationGame:
         print(f"🏗️ Foundation Quality: {self.player.foundation_quality}")
         
         # Combat and spiritual development
-        combat_power = self.realm_manager.calculate_combat_power(
-            self.player.realm, self.player.stage, self.player.foundation_quality
-        )
-        print(f"⚔️ Combat Power: {combat_power:,}")
+        print(f"⚔️ Combat Power: {self.player.stats.combat_power:,}")
         
         # Spirit stone wealth
         total_value = self.player.spirit_stones.get_total_value_in_low_grade()
         print(f"🔸 Spirit Stone Wealth: {total_value:,} total value")
         
         # Dao and elemental development
-        total_dao = sum(self.player.dao_comprehension.values())
-        total_elements = sum(self.player.elemental_affinities.values())
+        total_dao = self.player.dao_comprehension.total()
+        total_elements = self.player.elemental_affinities.total()
         if total_dao > 0:
             print(f"🧠 Dao Comprehension: {total_dao:.1f} total insights")
         if self.player.primary_element:
@@ -1337,6 +1320,7 @@ class EnhancedCultivationGame:
             print("✅ Progress saved successfully.")
         else:
             print("⚠️ Could not save progress.")
+        self.save_system.close_stone_journal()
         
         self.game_running = False
 
@@ -1353,7 +1337,7 @@ def main():
         print("   🧠 Dao Comprehension")
         print("   🌟 Elemental Mastery")
         
-        game = EnhancedCultivationGame()
+        game = EnhancedCultivationGame(seed=os.environ.get("CULTIVATION_SEED"))
         game.start_game()
         
     except KeyboardInterrupt:
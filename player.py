@@ -3,59 +3,59 @@ Enhanced Player class with authentic cultivation realm system
 Integrates with existing spirit stone and encounter systems
 """
 
-from typing import Dict, List, Optional, Tuple
-import random
+from typing import Callable, Dict, List, Optional, Tuple
+from rng import GameRNG
 from cultivation_encounters import SmartEncounterManager, generate_encounter_reward
-from spirit_stones import SpiritStoneManager, EffectResolutionSystem, generate_spirit_stone_reward, format_spirit_stone_reward
+from spirit_stones import SpiritStoneGrade, SpiritStoneManager, EffectResolutionSystem, generate_spirit_stone_reward, generate_spirit_stone_rewards, format_spirit_stone_reward
 from realm_stage_system import RealmStageManager, CultivationRealm, convert_old_level_to_realm_stage
+from effect_stack import EffectStack
+from affinities import DaoComprehension, ElementalAffinities
+from session_history import SessionHistory, DEFAULT_HISTORY_DEPTH
+from derived_stats import DerivedStats, REALM_INDEX
+from cultivation_events import (
+    CultivationEvent, ExpGained, FoundationChanged, EncounterTriggered, StageAdvanced,
+    BreakthroughReady, DaoInsight, ElementalGain, SpiritStonesEarned, render_events
+)
+
+# Base experience range per session for each cultivation focus
+FOCUS_EXP_RANGES = {
+    "foundation": (3, 8),    # Lower exp
+    "aggressive": (12, 20),  # Higher exp
+    "balanced": (8, 15)
+}
+
+STONE_GRADES = tuple(SpiritStoneGrade)
+STONE_REWARD_CHUNK = 32  # Encounter stone rewards drawn at a time during batch cultivation
 
 class EnhancedPlayer:
-    def __init__(self, name: str = "Cultivator"):
+    def __init__(self, name: str = "Cultivator", rng: Optional[GameRNG] = None,
+                 history_depth: int = DEFAULT_HISTORY_DEPTH):
         self.name = name
         
+        # Every random roll for this cultivator comes from one injectable stream
+        self.rng = rng if rng is not None else GameRNG()
+        self._stats: Optional[DerivedStats] = None  # Rebuilt lazily after progression changes
+        
         # New realm/stage system
         self.realm = CultivationRealm.BODY_TEMPERING
         self.stage = 1
         self.experience = 0
-        self.realm_manager = RealmStageManager()
+        self.realm_manager = RealmStageManager(rng=self.rng)
         
         # Enhanced foundation system
         self.foundation_quality = 10  # Start with basic foundation
         self.foundation_stability = 100  # Affects breakthrough success
         
         # Philosophy and Elements (converted to Dao system)
-        self.dao_comprehension = {
-            "sword": 0,
-            "fire": 0,
-            "water": 0,
-            "earth": 0,
-            "wind": 0,
-            "lightning": 0,
-            "ice": 0,
-            "nature": 0,
-            "light": 0,
-            "shadow": 0,
-            "balance": 0,
-            "destruction": 0
-        }
+        self.dao_comprehension = DaoComprehension()
         
         # Elemental affinities (awakened during breakthrough)
-        self.elemental_affinities = {
-            "fire": 0,
-            "water": 0,
-            "earth": 0,
-            "air": 0,
-            "lightning": 0,
-            "ice": 0,
-            "nature": 0,
-            "light": 0,
-            "shadow": 0
-        }
+        self.elemental_affinities = ElementalAffinities()
         self.primary_element = None  # Awakened at Foundation Building
         self.secondary_elements = []  # Additional elements gained later
         
         # Encounter and Effect Systems (existing)
-        self.encounter_manager = SmartEncounterManager()
+        self.encounter_manager = SmartEncounterManager(rng=self.rng)
         self.ongoing_effects = []
         
         # Spirit Stone System (existing)
@@ -74,55 +74,165 @@ class EnhancedPlayer:
         self.total_breakthroughs = 0
         self.foundation_sessions = 0
         
-        # Cultivation History (existing)
-        self.cultivation_history = []
-        self.last_session_details = None
+        # Cultivation History (compact ring buffer of recent sessions)
+        self.session_history = SessionHistory(history_depth)
+    
+    @property
+    def ongoing_effects(self) -> EffectStack:
+        """Active cultivation effects (assigning a plain list wraps it in an EffectStack)"""
+        return self._effects
+    
+    @ongoing_effects.setter
+    def ongoing_effects(self, effects) -> None:
+        self._effects = effects if isinstance(effects, EffectStack) else EffectStack(effects)
+    
+    @property
+    def dao_comprehension(self) -> DaoComprehension:
+        """Dao comprehension per path (assigning a dict copies its known keys)"""
+        return self._dao
+    
+    @dao_comprehension.setter
+    def dao_comprehension(self, values) -> None:
+        self._dao = DaoComprehension.from_mapping(values)
+    
+    @property
+    def elemental_affinities(self) -> ElementalAffinities:
+        """Elemental affinity per element (assigning a dict copies its known keys)"""
+        return self._elements
+    
+    @elemental_affinities.setter
+    def elemental_affinities(self, values) -> None:
+        self._elements = ElementalAffinities.from_mapping(values)
+    
+    @property
+    def cultivation_history(self) -> List[Dict]:
+        """Recent session details, oldest first (decoded from the session history)"""
+        return self.session_history.to_list()
+    
+    @cultivation_history.setter
+    def cultivation_history(self, sessions: List[Dict]) -> None:
+        self.session_history = SessionHistory.from_sessions(sessions or [], self.session_history.capacity)
+    
+    @property
+    def last_session_details(self) -> Optional[Dict]:
+        """Details of the most recent session, or None"""
+        return self.session_history.last()
+    
+    @last_session_details.setter
+    def last_session_details(self, session_details: Optional[Dict]) -> None:
+        # Old saves store the last session separately; it replaces the newest history entry
+        if session_details:
+            self.session_history.replace_last(session_details)
+    
+    # Progression state - every write invalidates the derived stats snapshot
+    
+    @property
+    def realm(self) -> CultivationRealm:
+        return self._realm
+    
+    @realm.setter
+    def realm(self, realm: CultivationRealm) -> None:
+        self._realm = realm
+        self._stats = None
+    
+    @property
+    def stage(self) -> int:
+        return self._stage
+    
+    @stage.setter
+    def stage(self, stage: int) -> None:
+        self._stage = stage
+        self._stats = None
+    
+    @property
+    def foundation_quality(self):
+        return self._foundation_quality
+    
+    @foundation_quality.setter
+    def foundation_quality(self, value) -> None:
+        self._foundation_quality = value
+        self._stats = None
+    
+    @property
+    def foundation_stability(self):
+        return self._foundation_stability
+    
+    @foundation_stability.setter
+    def foundation_stability(self, value) -> None:
+        self._foundation_stability = value
+        self._stats = None
+    
+    @property
+    def realm_index(self) -> int:
+        """Position of the current realm in the progression order"""
+        return REALM_INDEX[self._realm]
+    
+    @property
+    def stats(self) -> DerivedStats:
+        """Read-only snapshot of derived stats, recomputed only after its inputs change"""
+        stats = self._stats
+        total_dao = self._dao.total()
+        if stats is None or stats.total_dao != total_dao:
+            stats = self._stats = DerivedStats.compute(
+                self.realm_manager, self._realm, self._stage, self._foundation_quality,
+                self._foundation_stability, total_dao
+            )
+        return stats
     
     def get_current_stage_exp_requirement(self) -> int:
         """Get experience requirement for current stage"""
-        return self.realm_manager.get_stage_exp_requirement(self.realm, self.stage)
+        return self.stats.stage_exp_requirement
     
     def get_next_stage_exp_requirement(self) -> int:
         """Get experience requirement for next stage"""
-        if self.stage < 9:
-            return self.realm_manager.get_stage_exp_requirement(self.realm, self.stage + 1)
-        return 0
+        return self.stats.next_stage_exp_requirement
+    
+    def get_combat_power(self) -> int:
+        """Get current combat power"""
+        return self.stats.combat_power
     
     def add_experience(self, amount: int) -> Tuple[bool, List[str]]:
         """Add experience and handle stage ups. Returns (advanced, messages)"""
+        events = []
+        advanced = self._advance_stages(amount, events)
+        return advanced, render_events(events)
+    
+    def _advance_stages(self, amount: int, events: Optional[List[CultivationEvent]]) -> bool:
+        """Add experience and handle stage ups, reporting them as events. Returns True if advanced."""
         self.experience += amount
-        messages = []
-        advanced = False
-        
-        # Check for stage advancement
-        while self.stage < 9:
-            required_exp = self.get_current_stage_exp_requirement()
-            if self.experience >= required_exp:
-                self.experience -= required_exp
-                self.stage += 1
-                advanced = True
-                
-                # Foundation bonus for key stages
-                foundation_bonus = self.realm_manager.get_foundation_stage_bonus(self.stage)
-                if foundation_bonus > 0:
-                    self.foundation_quality += foundation_bonus
-                    messages.append(f"🏗️ Foundation strengthened! +{foundation_bonus} foundation quality")
-                
-                messages.append(f"📈 Advanced to {self.realm_manager.get_cultivation_title(self.realm, self.stage)}")
-                
-                # Check if ready for realm breakthrough
-                if self.stage == 9:
-                    can_breakthrough, breakthrough_msg = self.realm_manager.can_breakthrough_realm(
-                        self.realm, self.stage, self.foundation_quality
-                    )
-                    if can_breakthrough:
-                        messages.append(f"🌟 Ready for breakthrough to next realm!")
-                    else:
-                        messages.append(f"⚠️ {breakthrough_msg}")
-            else:
-                break
         
-        return advanced, messages
+        # Fast-forward through every stage this experience pays for
+        start_stage = self.stage
+        new_stage, remaining_exp = self.realm_manager.fast_forward_stages(
+            self.realm, start_stage, self.experience
+        )
+        if new_stage == start_stage:
+            return False
+        
+        self.stage = new_stage
+        self.experience = remaining_exp
+        
+        for stage in range(start_stage + 1, new_stage + 1):
+            # Foundation bonus for key stages
+            foundation_bonus = self.realm_manager.get_foundation_stage_bonus(stage)
+            if foundation_bonus > 0:
+                self.foundation_quality += foundation_bonus
+                if events is not None:
+                    events.append(FoundationChanged(foundation_bonus, "stage"))
+            
+            if events is not None:
+                events.append(StageAdvanced(
+                    self.realm.value, stage, self.realm_manager.get_cultivation_title(self.realm, stage)
+                ))
+            
+            # Check if ready for realm breakthrough
+            if stage == 9 and events is not None:
+                can_breakthrough, breakthrough_msg = self.realm_manager.can_breakthrough_realm(
+                    self.realm, stage, self.foundation_quality
+                )
+                events.append(BreakthroughReady(can_breakthrough, breakthrough_msg))
+        
+        return True
     
     def attempt_realm_breakthrough(self) -> Tuple[bool, str, Dict]:
         """Attempt to breakthrough to next realm"""
@@ -136,17 +246,8 @@ class EnhancedPlayer:
         if not can_attempt:
             return False, reason, {}
         
-        # Calculate bonus factors
-        bonus_factors = {}
-        
-        # Dao comprehension bonuses
-        total_dao = sum(self.dao_comprehension.values())
-        if total_dao > 20:
-            bonus_factors['dao_mastery'] = min(0.15, total_dao * 0.002)
-        
-        # Foundation stability bonus
-        if self.foundation_stability > 80:
-            bonus_factors['foundation_stability'] = (self.foundation_stability - 80) * 0.001
+        # Bonus factors from dao comprehension and foundation stability
+        bonus_factors = self.stats.get_bonus_factors()
         
         # Attempt breakthrough
         success, message, result_data = self.realm_manager.attempt_breakthrough(
@@ -205,42 +306,46 @@ class EnhancedPlayer:
         if self.realm == CultivationRealm.FOUNDATION_BUILDING and not self.primary_element:
             # First elemental awakening - random primary element
             elements = list(self.elemental_affinities.keys())
-            self.primary_element = random.choice(elements)
-            self.elemental_affinities[self.primary_element] = random.randint(15, 30)
+            self.primary_element = self.rng.choice(elements)
+            self.elemental_affinities[self.primary_element] = self.rng.randint(15, 30)
             
         elif self.realm in [CultivationRealm.CORE_FORMATION, CultivationRealm.NASCENT_SOUL]:
             # Chance for secondary element or strengthen existing
-            if random.random() < 0.6:  # 60% chance
+            if self.rng.random() < 0.6:  # 60% chance
                 if len(self.secondary_elements) < 2:
                     # Gain new secondary element
                     available = [e for e in self.elemental_affinities.keys() 
                                if e != self.primary_element and e not in self.secondary_elements]
                     if available:
-                        new_element = random.choice(available)
+                        new_element = self.rng.choice(available)
                         self.secondary_elements.append(new_element)
-                        self.elemental_affinities[new_element] = random.randint(8, 20)
+                        self.elemental_affinities[new_element] = self.rng.randint(8, 20)
                 else:
                     # Strengthen existing elements
                     if self.primary_element:
-                        self.elemental_affinities[self.primary_element] += random.randint(5, 15)
+                        self.elemental_affinities[self.primary_element] += self.rng.randint(5, 15)
                     for elem in self.secondary_elements:
-                        if random.random() < 0.5:
-                            self.elemental_affinities[elem] += random.randint(3, 10)
+                        if self.rng.random() < 0.5:
+                            self.elemental_affinities[elem] += self.rng.randint(3, 10)
     
     def _clear_breakthrough_effects(self):
         """Clear some negative effects on successful breakthrough"""
-        negative_effects = [e for e in self.ongoing_effects if e.get('type') == 'negative']
+        negative_effects = self.ongoing_effects.get_negative_effects()
         effects_to_remove = min(2, len(negative_effects))  # Remove up to 2 negative effects
         
         for _ in range(effects_to_remove):
             if negative_effects:
-                effect_to_remove = random.choice(negative_effects)
+                effect_to_remove = self.rng.choice(negative_effects)
                 self.ongoing_effects.remove(effect_to_remove)
                 negative_effects.remove(effect_to_remove)
     
     def cultivate_with_choice(self, cultivation_focus: str = "balanced") -> List[str]:
         """Enhanced cultivation with player choice"""
-        messages = []
+        return render_events(self.cultivate_events(cultivation_focus))
+    
+    def cultivate_events(self, cultivation_focus: str = "balanced") -> List[CultivationEvent]:
+        """Run one cultivation session and report what happened as events (rendered on demand)"""
+        events = []
         session_details = {
             "base_exp": 0,
             "final_exp": 0,
@@ -260,28 +365,10 @@ class EnhancedPlayer:
             self.recovery_time -= 1
         
         # Apply cultivation focus
-        if cultivation_focus == "foundation":
-            base_exp = random.randint(3, 8)  # Lower exp
-            foundation_gain = random.randint(3, 8)  # Higher foundation
-            self.foundation_quality += foundation_gain
-            self.foundation_sessions += 1
-            session_details["foundation_gained"] = foundation_gain
-            messages.append(f"🏗️ Foundation-focused cultivation: +{foundation_gain} foundation quality")
-            
-        elif cultivation_focus == "aggressive":
-            base_exp = random.randint(12, 20)  # Higher exp
-            foundation_risk = random.random()
-            if foundation_risk < 0.3:  # 30% chance of foundation damage
-                foundation_loss = random.randint(1, 3)
-                self.foundation_quality = max(10, self.foundation_quality - foundation_loss)
-                messages.append(f"⚠️ Aggressive cultivation damaged foundation: -{foundation_loss}")
-            
-        else:  # balanced
-            base_exp = random.randint(8, 15)
-            if random.random() < 0.2:  # 20% chance for foundation gain
-                foundation_gain = random.randint(1, 3)
-                self.foundation_quality += foundation_gain
-                session_details["foundation_gained"] = foundation_gain
+        low, high = FOCUS_EXP_RANGES.get(cultivation_focus, FOCUS_EXP_RANGES["balanced"])
+        base_exp = self.rng.randint(low, high)
+        chance_roll = self.rng.random() if cultivation_focus != "foundation" else 0.0
+        self._apply_cultivation_focus(cultivation_focus, chance_roll, session_details, events)
         
         session_details["base_exp"] = base_exp
         
@@ -295,119 +382,342 @@ class EnhancedPlayer:
         )
         
         if encounter_result:
-            self.total_encounters += 1
-            encounter_type, encounter_data = encounter_result
-            
+            modified_exp = self._resolve_encounter(encounter_result, modified_exp, session_details, events)
+        
+        # Add experience and handle stage advancement
+        advancement_events = []
+        if self._advance_stages(modified_exp, advancement_events):
+            session_details["level_ups"] = render_events(advancement_events)
+            events.extend(advancement_events)
+        
+        # Base cultivation event
+        events.insert(0, ExpGained(modified_exp, cultivation_focus))
+        
+        # Natural effect recovery
+        self._process_natural_recovery()
+        
+        # Clean up expired effects
+        self._cleanup_expired_effects()
+        session_details["effects_after"] = len(self.ongoing_effects)
+        
+        # Store session details
+        self._record_session(session_details)
+        
+        return events
+    
+    def _apply_cultivation_focus(self, cultivation_focus: str, chance_roll: float,
+                                 session_details: Optional[Dict], events: Optional[List[CultivationEvent]]) -> int:
+        """Apply the foundation side of a cultivation focus. Returns the foundation change."""
+        if cultivation_focus == "foundation":
+            foundation_gain = self.rng.randint(3, 8)  # Higher foundation
+            self.foundation_quality += foundation_gain
+            self.foundation_sessions += 1
+            if session_details is not None:
+                session_details["foundation_gained"] = foundation_gain
+            if events is not None:
+                events.append(FoundationChanged(foundation_gain, "focus"))
+            return foundation_gain
+        
+        if cultivation_focus == "aggressive":
+            if chance_roll < 0.3:  # 30% chance of foundation damage
+                foundation_loss = self.rng.randint(1, 3)
+                before = self.foundation_quality
+                self.foundation_quality = max(10, self.foundation_quality - foundation_loss)
+                if events is not None:
+                    events.append(FoundationChanged(-foundation_loss, "aggressive"))
+                return self.foundation_quality - before
+            return 0
+        
+        # balanced
+        if chance_roll < 0.2:  # 20% chance for foundation gain
+            foundation_gain = self.rng.randint(1, 3)
+            self.foundation_quality += foundation_gain
+            if session_details is not None:
+                session_details["foundation_gained"] = foundation_gain
+            if events is not None:
+                events.append(FoundationChanged(foundation_gain, "balanced"))
+            return foundation_gain
+        return 0
+    
+    def _resolve_encounter(self, encounter_result: Tuple[str, Dict], modified_exp: int,
+                           session_details: Optional[Dict], events: Optional[List[CultivationEvent]],
+                           stone_credits: Optional[Dict[SpiritStoneGrade, int]] = None,
+                           spirit_reward: Optional[Dict[SpiritStoneGrade, int]] = None) -> int:
+        """
+        Apply an encounter's rewards and spirit stones. Returns the updated session experience.
+        With stone_credits, spirit stones are collected there for the caller to settle instead.
+        A pre-drawn spirit_reward is used instead of rolling one.
+        """
+        self.total_encounters += 1
+        encounter_type, encounter_data = encounter_result
+        
+        if session_details is not None:
             session_details["encounter"] = {
                 "type": encounter_type,
                 "name": encounter_data["name"],
                 "description": encounter_data.get("description", ""),
                 "rarity": encounter_data.get("rarity", "common")
             }
-            
-            # Process encounter rewards
-            rewards = generate_encounter_reward(encounter_type, encounter_data, self.realm.value)
-            
-            # Apply rewards with enhanced messaging
-            for reward_type, reward_value in rewards.items():
-                if reward_type == "experience":
-                    modified_exp += reward_value
+        
+        # Process encounter rewards
+        rewards = generate_encounter_reward(encounter_type, encounter_data, self.realm.value, rng=self.rng)
+        
+        # Apply rewards with enhanced messaging
+        for reward_type, reward_value in rewards.items():
+            if reward_type == "experience":
+                modified_exp += reward_value
+                if session_details is not None:
                     session_details["final_exp"] = modified_exp
-                elif reward_type == "philosophy":
-                    # Convert philosophy to dao comprehension
-                    for phil_type, phil_value in reward_value.items():
-                        if phil_type in self.dao_comprehension:
-                            self.dao_comprehension[phil_type] += phil_value
+            elif reward_type == "philosophy":
+                # Convert philosophy to dao comprehension
+                for phil_type, phil_value in reward_value.items():
+                    if phil_type in self.dao_comprehension:
+                        self.dao_comprehension[phil_type] += phil_value
+                        if session_details is not None:
                             session_details["dao_gains"][phil_type] = phil_value
-                            messages.append(f"🧠 Dao insight: +{phil_value} {phil_type} comprehension")
-                elif reward_type == "foundation":
-                    self.foundation_quality += reward_value
+                        if events is not None:
+                            events.append(DaoInsight(phil_type, phil_value))
+            elif reward_type == "foundation":
+                self.foundation_quality += reward_value
+                if session_details is not None:
                     session_details["foundation_gained"] += reward_value
-                    messages.append(f"🏗️ Foundation strengthened: +{reward_value}")
-                elif reward_type == "elemental":
-                    for elem_type, elem_value in reward_value.items():
-                        if elem_type in self.elemental_affinities:
-                            self.elemental_affinities[elem_type] += elem_value
+                if events is not None:
+                    events.append(FoundationChanged(reward_value, "encounter"))
+            elif reward_type == "elemental":
+                for elem_type, elem_value in reward_value.items():
+                    if elem_type in self.elemental_affinities:
+                        self.elemental_affinities[elem_type] += elem_value
+                        if session_details is not None:
                             session_details["elemental_gains"][elem_type] = elem_value
-                            messages.append(f"🌟 Elemental affinity: +{elem_value} {elem_type}")
-                elif reward_type == "ongoing_effect":
-                    self.ongoing_effects.append(reward_value)
-            
-            # Generate spirit stone rewards for encounters
-            spirit_reward = generate_spirit_stone_reward(self.realm.value)
-            if spirit_reward:
+                        if events is not None:
+                            events.append(ElementalGain(elem_type, elem_value))
+            elif reward_type == "ongoing_effect":
+                self.ongoing_effects.append(reward_value)
+        
+        # Generate spirit stone rewards for encounters
+        if spirit_reward is None:
+            spirit_reward = generate_spirit_stone_reward(self.realm.value, rng=self.rng)
+        if spirit_reward:
+            if session_details is not None:
                 session_details["spirit_stones"] = spirit_reward
-                for grade, amount in spirit_reward.items():
-                    self.spirit_stones.add_stones(grade, amount)
-                    self.spirit_stones_earned += amount
-                
-                messages.append(f"🔸 Spirit stones earned: {format_spirit_stone_reward(spirit_reward)}")
+            for grade, amount in spirit_reward.items():
+                if stone_credits is None:
+                    self.spirit_stones.add_stones(grade, amount, source="encounter")
+                else:
+                    stone_credits[grade] = stone_credits.get(grade, 0) + amount
+                self.spirit_stones_earned += amount
             
-            # Add encounter message
-            messages.append(f"💫 {encounter_type.title()}: {encounter_data['name']}")
-            if encounter_data.get('description'):
-                messages.append(f"   {encounter_data['description']}")
+            if events is not None:
+                events.append(SpiritStonesEarned(spirit_reward))
         
-        # Add experience and handle stage advancement
-        advanced, advancement_messages = self.add_experience(modified_exp)
-        session_details["level_ups"] = advancement_messages
-        messages.extend(advancement_messages)
+        # Add encounter event
+        if events is not None:
+            events.append(EncounterTriggered(
+                encounter_type, encounter_data['name'],
+                encounter_data.get('description', ""), encounter_data.get('rarity', "common")
+            ))
         
-        # Base cultivation message
-        messages.insert(0, f"Cultivated for {modified_exp} experience ({cultivation_focus} focus)")
+        return modified_exp
+    
+    def _record_session(self, session_details: Dict) -> None:
+        """Store session details in the bounded cultivation history"""
+        self.session_history.append(session_details)
+    
+    def cultivate_batch(self, sessions: int, cultivation_focus: str = "balanced",
+                        record_details: bool = False,
+                        until: Optional[Callable[["EnhancedPlayer"], bool]] = None,
+                        skip_ahead: bool = True) -> Dict:
+        """
+        Run many headless cultivation sessions ("closed-door cultivation")
+        
+        Base experience, foundation and encounter trigger rolls are drawn up front
+        for the whole batch and no events or messages are built. Per-session detail records
+        are only materialized when record_details is True. The optional until
+        callback is checked after every session and ends the batch early.
+        Spirit stones earned during the batch are settled into the wallet in
+        one transaction at the end.
+        With skip_ahead, the session of the next encounter is sampled directly
+        and the encounter manager jumps over the quiet sessions in between
+        instead of rolling every session.
+        
+        Returns an aggregate summary of the batch.
+        """
+        low, high = FOCUS_EXP_RANGES.get(cultivation_focus, FOCUS_EXP_RANGES["balanced"])
+        base_rolls = self.rng.randint_pool(low, high, sessions)
+        if cultivation_focus == "foundation":
+            chance_rolls = [0.0] * sessions
+        else:
+            chance_rolls = self.rng.uniform_pool(sessions)
+        encounter_manager = self.encounter_manager
+        if skip_ahead:
+            sessions_to_encounter = encounter_manager.sessions_until_encounter()
+            quiet_sessions = 0
+        else:
+            encounter_rolls = self.rng.uniform_pool(sessions)
         
-        # Natural effect recovery
-        self._process_natural_recovery()
+        summary = {
+            "sessions": 0,
+            "cultivation_focus": cultivation_focus,
+            "start_realm": self.realm.value,
+            "start_stage": self.stage,
+            "end_realm": self.realm.value,
+            "end_stage": self.stage,
+            "total_exp": 0,
+            "foundation_gained": 0,
+            "foundation_lost": 0,
+            "encounters": 0,
+            "encounter_types": {},
+            "spirit_stones": {},
+            "stages_advanced": 0,
+            "details": [] if record_details else None
+        }
+        encounter_types = summary["encounter_types"]
+        stone_credits: Dict[SpiritStoneGrade, int] = {}
+        stone_rewards: List[List[int]] = []  # Pre-drawn spirit stone rewards, refilled in chunks
+        earned_before = self.spirit_stones_earned
+        required_exp = self.get_current_stage_exp_requirement()
+        
+        for i in range(sessions):
+            session_details = None
+            if record_details:
+                session_details = {
+                    "base_exp": base_rolls[i],
+                    "final_exp": 0,
+                    "encounter": None,
+                    "spirit_stones": {},
+                    "level_ups": [],
+                    "effects_before": len(self.ongoing_effects),
+                    "effects_after": 0,
+                    "cultivation_focus": cultivation_focus,
+                    "foundation_gained": 0,
+                    "elemental_gains": {},
+                    "dao_gains": {}
+                }
+            
+            if self.recovery_time > 0:
+                self.recovery_time -= 1
+            
+            foundation_change = self._apply_cultivation_focus(
+                cultivation_focus, chance_rolls[i], session_details, None
+            )
+            if foundation_change >= 0:
+                summary["foundation_gained"] += foundation_change
+            else:
+                summary["foundation_lost"] -= foundation_change
+            
+            modified_exp = self._apply_ongoing_effects(base_rolls[i])
+            
+            if not skip_ahead:
+                encounter_result = encounter_manager.process_encounter(
+                    self.realm.value, self.stage, self.ongoing_effects, roll=encounter_rolls[i]
+                )
+            elif sessions_to_encounter > 1:
+                sessions_to_encounter -= 1
+                quiet_sessions += 1
+                encounter_result = None
+            else:
+                encounter_manager.skip_sessions(quiet_sessions)
+                quiet_sessions = 0
+                encounter_result = encounter_manager.trigger_encounter(self.realm.value)
+                sessions_to_encounter = encounter_manager.sessions_until_encounter()
+            if encounter_result:
+                foundation_before = self.foundation_quality
+                if not stone_rewards:
+                    # Never draw more rewards than the batch has sessions left for
+                    stone_rewards = generate_spirit_stone_rewards(
+                        self.realm.value, min(STONE_REWARD_CHUNK, sessions - i), rng=self.rng
+                    )
+                row = stone_rewards.pop()
+                spirit_reward = {grade: count for grade, count in zip(STONE_GRADES, row) if count}
+                modified_exp = self._resolve_encounter(encounter_result, modified_exp, session_details, None,
+                                                       stone_credits, spirit_reward)
+                summary["foundation_gained"] += self.foundation_quality - foundation_before
+                summary["encounters"] += 1
+                encounter_type = encounter_result[0]
+                encounter_types[encounter_type] = encounter_types.get(encounter_type, 0) + 1
+            
+            summary["total_exp"] += modified_exp
+            
+            # Only walk the stage table when this session can actually advance a stage
+            if self.stage < 9 and self.experience + modified_exp >= required_exp:
+                stage_before = self.stage
+                foundation_before = self.foundation_quality
+                advancement_events = [] if session_details is not None else None
+                self._advance_stages(modified_exp, advancement_events)
+                summary["stages_advanced"] += self.stage - stage_before
+                # Stage 3/6/9 foundation bonuses
+                summary["foundation_gained"] += self.foundation_quality - foundation_before
+                required_exp = self.get_current_stage_exp_requirement()
+                if session_details is not None:
+                    session_details["level_ups"] = render_events(advancement_events)
+            else:
+                self.experience += modified_exp
+            
+            if self.ongoing_effects:
+                self._process_natural_recovery()
+                self._cleanup_expired_effects()
+            
+            summary["sessions"] += 1
+            if session_details is not None:
+                session_details["final_exp"] = modified_exp
+                session_details["effects_after"] = len(self.ongoing_effects)
+                summary["details"].append(session_details)
+                self._record_session(session_details)
+            
+            if until is not None and until(self):
+                break
         
-        # Clean up expired effects
-        self._cleanup_expired_effects()
-        session_details["effects_after"] = len(self.ongoing_effects)
+        if skip_ahead:
+            encounter_manager.skip_sessions(quiet_sessions)
         
-        # Store session details
-        self.last_session_details = session_details
-        self.cultivation_history.append(session_details)
-        if len(self.cultivation_history) > 10:
-            self.cultivation_history.pop(0)
+        summary["end_realm"] = self.realm.value
+        summary["end_stage"] = self.stage
+        summary["spirit_stones_earned"] = self.spirit_stones_earned - earned_before
+        self.spirit_stones.settle(credits=stone_credits, source="encounter")
+        for grade in SpiritStoneGrade:
+            if stone_credits.get(grade):
+                summary["spirit_stones"][grade] = stone_credits[grade]
         
-        return messages
+        return summary
     
     def _process_natural_recovery(self):
         """Process natural recovery from negative effects"""
-        negative_effects = [e for e in self.ongoing_effects if e.get('type') == 'negative']
+        if not self.ongoing_effects.has_negative_effects():
+            return
         
-        for effect in negative_effects[:]:  # Copy list to avoid modification during iteration
-            # Foundation quality affects recovery rate
-            recovery_chance = 0.10 + (self.foundation_quality / 1000)  # Base 10% + foundation bonus
-            
-            # Higher realm cultivators recover faster
-            realm_bonus = list(CultivationRealm).index(self.realm) * 0.02
-            recovery_chance += realm_bonus
-            
-            if random.random() < recovery_chance:
+        # Foundation quality affects recovery rate: base 10% + foundation bonus
+        recovery_chance = 0.10 + (self.foundation_quality / 1000)
+        
+        # Higher realm cultivators recover faster
+        realm_bonus = self.realm_index * 0.02
+        recovery_chance += realm_bonus
+        
+        for effect in self.ongoing_effects.get_negative_effects():
+            if self.rng.random() < recovery_chance:
                 self.ongoing_effects.remove(effect)
                 # Note: We don't add a message here to avoid spam, but it happens silently
     
     def meditate_for_recovery(self) -> Tuple[bool, str]:
         """Dedicated meditation to cure negative effects (no spirit stone cost)"""
-        negative_effects = [e for e in self.ongoing_effects if e.get('type') == 'negative']
+        negative_effects = self.ongoing_effects.get_negative_effects()
         
         if not negative_effects:
             return False, "✨ You have no negative effects to cleanse through meditation."
         
         # Meditation success rate based on foundation and dao comprehension
         base_rate = 0.6 + (self.foundation_quality / 500)  # 60% base + foundation bonus
-        dao_bonus = min(0.2, sum(self.dao_comprehension.values()) / 500)  # Up to 20% from dao
+        dao_bonus = min(0.2, self.dao_comprehension.total() / 500)  # Up to 20% from dao
         
         success_rate = min(0.9, base_rate + dao_bonus)
         
-        if random.random() < success_rate:
+        if self.rng.random() < success_rate:
             # Successfully cure 1-2 effects
             effects_to_cure = min(2, len(negative_effects))
             cured_effects = []
             
             for _ in range(effects_to_cure):
                 if negative_effects:
-                    effect = random.choice(negative_effects)
+                    effect = self.rng.choice(negative_effects)
                     self.ongoing_effects.remove(effect)
                     negative_effects.remove(effect)
                     cured_effects.append(effect['name'])
@@ -417,50 +727,20 @@ class EnhancedPlayer:
             return False, f"🧘 Meditation helped but couldn't fully cleanse the effects. Try again later."
     
     def _apply_ongoing_effects(self, base_exp: int) -> int:
-        """Apply ongoing effects to cultivation (existing functionality)"""
-        modified_exp = base_exp
-        
-        for effect in self.ongoing_effects:
-            if effect['type'] == 'positive':
-                if 'exp_multiplier' in effect:
-                    modified_exp = int(modified_exp * effect['exp_multiplier'])
-                elif 'exp_bonus' in effect:
-                    modified_exp += effect['exp_bonus']
-            elif effect['type'] == 'negative':
-                if 'exp_multiplier' in effect:
-                    modified_exp = int(modified_exp * effect['exp_multiplier'])
-                elif 'exp_penalty' in effect:
-                    modified_exp = max(1, modified_exp - effect['exp_penalty'])
-        
-        return modified_exp
+        """Apply ongoing effects to cultivation using the stack's cached modifier"""
+        return self.ongoing_effects.apply_to_exp(base_exp)
     
     def _cleanup_expired_effects(self) -> None:
-        """Remove expired effects (existing functionality)"""
-        active_effects = []
-        for effect in self.ongoing_effects:
-            remaining = effect.get('remaining_duration')
-            if remaining is None:
-                active_effects.append(effect)
-            elif remaining > 0:
-                effect['remaining_duration'] = remaining - 1
-                active_effects.append(effect)
-        
-        self.ongoing_effects = active_effects
+        """Remove expired effects"""
+        self.ongoing_effects.advance()
     
     def get_negative_effects(self) -> List[Dict]:
         """Get list of negative effects that can be cured (existing functionality)"""
-        return [e for e in self.ongoing_effects if e.get('type') == 'negative']
+        return self.ongoing_effects.get_negative_effects()
     
     def cure_effect(self, effect_name: str) -> Tuple[bool, str]:
         """Attempt to cure a negative effect using spirit stones (existing functionality)"""
-        effect_to_cure = None
-        effect_index = -1
-        
-        for i, effect in enumerate(self.ongoing_effects):
-            if effect['name'] == effect_name and effect.get('type') == 'negative':
-                effect_to_cure = effect
-                effect_index = i
-                break
+        effect_to_cure = self.ongoing_effects.find(effect_name, 'negative')
         
         if not effect_to_cure:
             return False, "Effect not found or not negative"
@@ -474,12 +754,55 @@ class EnhancedPlayer:
                 return False, "This effect cannot be cured with spirit stones"
         
         if self.effect_resolution.cure_effect(effect_name):
-            self.ongoing_effects.pop(effect_index)
+            self.ongoing_effects.remove(effect_to_cure)
             self.effects_cured += 1
             return True, f"✓ {effect_name} cured successfully!"
         else:
             return False, "Failed to cure effect"
     
+    def cure_effects(self, effect_names: List[str]) -> Tuple[bool, str]:
+        """Cure several negative effects, paying for all of them in one transaction"""
+        # Match each name to a distinct effect, so stacked copies can be cured together
+        remaining = list(self.ongoing_effects.get_negative_effects())
+        effects_to_cure = []
+        for effect_name in effect_names:
+            effect = next((e for e in remaining if e['name'] == effect_name), None)
+            if effect is None:
+                return False, "Effect not found or not negative"
+            remaining.remove(effect)
+            effects_to_cure.append(effect)
+        if not effects_to_cure:
+            return False, "Effect not found or not negative"
+        
+        if not self.effect_resolution.cure_effects(effect_names):
+            return False, "Cannot afford to cure all of these effects"
+        
+        self._remove_cured(effects_to_cure)
+        return True, f"✓ Cured {len(effects_to_cure)} effects: {', '.join(effect_names)}"
+    
+    def plan_cures(self, budget: Optional[int] = None, objective: str = "multiplier") -> Dict:
+        """Best set of negative effects to cure within a budget (see EffectResolutionSystem.plan_cures)"""
+        return self.effect_resolution.plan_cures(self.ongoing_effects.get_negative_effects(), budget, objective)
+    
+    def cure_best(self, budget: Optional[int] = None, objective: str = "multiplier") -> Tuple[bool, str]:
+        """Plan the best set of cures and pay for all of them in one transaction"""
+        plan = self.plan_cures(budget, objective)
+        if not plan["effects"]:
+            return False, "No affordable cures improve your cultivation"
+        
+        if not self.effect_resolution.execute_cure_plan(plan):
+            return False, "Failed to cure effects"
+        
+        self._remove_cured(plan["effects"])
+        names = ", ".join(effect['name'] for effect in plan["effects"])
+        return True, (f"✓ Cured {len(plan['effects'])} effects ({names}) for "
+                      f"{plan['total_cost']:,} 🔸 equivalent; experience x{plan['exp_multiplier_recovered']:.2f}")
+    
+    def _remove_cured(self, effects: List[Dict]) -> None:
+        for effect in effects:
+            self.ongoing_effects.remove(effect)
+        self.effects_cured += len(effects)
+    
     def get_cultivation_choices(self) -> List[Tuple[str, str]]:
         """Get available cultivation focus choices"""
         choices = [
@@ -492,17 +815,17 @@ class EnhancedPlayer:
     
     def get_status(self) -> str:
         """Get comprehensive player status with new realm system"""
+        stats = self.stats
         status_lines = [
             f"=== {self.name} ===",
-            f"Cultivation: {self.realm_manager.get_cultivation_title(self.realm, self.stage)}",
-            f"Experience: {self.experience}/{self.get_current_stage_exp_requirement()}",
+            f"Cultivation: {stats.cultivation_title}",
+            f"Experience: {self.experience}/{stats.stage_exp_requirement}",
             f"Foundation Quality: {self.foundation_quality}",
             ""
         ]
         
         # Combat power
-        combat_power = self.realm_manager.calculate_combat_power(self.realm, self.stage, self.foundation_quality)
-        status_lines.append(f"Combat Power: {combat_power:,}")
+        status_lines.append(f"Combat Power: {stats.combat_power:,}")
         
         # Spirit stones
         status_lines.append(f"Spirit Stones: {self.spirit_stones.get_display_string()}")
@@ -539,16 +862,10 @@ class EnhancedPlayer:
         
         # Breakthrough status
         if self.stage == 9:
-            can_breakthrough, msg = self.realm_manager.can_breakthrough_realm(
-                self.realm, self.stage, self.foundation_quality
-            )
-            if can_breakthrough:
-                success_rate = self.realm_manager.calculate_breakthrough_success_rate(
-                    self.realm, self.foundation_quality
-                )
-                status_lines.append(f"\n🌟 Ready for breakthrough! Success rate: {success_rate:.1%}")
+            if stats.can_breakthrough:
+                status_lines.append(f"\n🌟 Ready for breakthrough! Success rate: {stats.breakthrough_success_rate:.1%}")
             else:
-                status_lines.append(f"\n⚠️ {msg}")
+                status_lines.append(f"\n⚠️ {stats.breakthrough_message}")
         elif self.recovery_time > 0:
             status_lines.append(f"\n🩹 Recovering from failed breakthrough ({self.recovery_time} sessions remaining)")
         
@@ -574,10 +891,10 @@ class EnhancedPlayer:
     
     def get_last_session_summary(self) -> str:
         """Get detailed summary of the last cultivation session"""
-        if not self.last_session_details:
+        details = self.session_history.last()
+        if not details:
             return "No cultivation session recorded yet."
         
-        details = self.last_session_details
         lines = []
         
         lines.append("=== Last Cultivation Session ===")
@@ -624,13 +941,13 @@ class EnhancedPlayer:
     
     def get_cultivation_history(self) -> str:
         """Get history of recent cultivation sessions"""
-        if not self.cultivation_history:
+        if not self.session_history:
             return "No cultivation history available."
         
         lines = []
         lines.append("=== Recent Cultivation History ===")
         
-        for i, session in enumerate(reversed(self.cultivation_history[-5:]), 1):
+        for i, session in enumerate(self.session_history.recent(5), 1):
             lines.append(f"\nSession {i} ago:")
             lines.append(f"  Focus: {session['cultivation_focus'].title()}")
             lines.append(f"  Experience: {session['final_exp']} XP")
@@ -661,11 +978,11 @@ class EnhancedPlayer:
             'experience': self.experience,
             'foundation_quality': self.foundation_quality,
             'foundation_stability': self.foundation_stability,
-            'dao_comprehension': self.dao_comprehension,
-            'elemental_affinities': self.elemental_affinities,
+            'dao_comprehension': self.dao_comprehension.to_dict(),
+            'elemental_affinities': self.elemental_affinities.to_dict(),
             'primary_element': self.primary_element,
             'secondary_elements': self.secondary_elements,
-            'ongoing_effects': self.ongoing_effects,
+            'ongoing_effects': self.ongoing_effects.to_list(),
             'spirit_stones': {grade.value: amount for grade, amount in self.spirit_stones.inventory.items()},
             'cultivation_method': self.cultivation_method,
             'breakthrough_failures': self.breakthrough_failures,
@@ -675,14 +992,13 @@ class EnhancedPlayer:
             'spirit_stones_earned': self.spirit_stones_earned,
             'total_breakthroughs': self.total_breakthroughs,
             'foundation_sessions': self.foundation_sessions,
-            'cultivation_history': self.cultivation_history,
-            'last_session_details': self.last_session_details
+            'session_history': self.session_history.to_blob()
         }
     
     @classmethod
-    def from_save_data(cls, save_data: Dict):
+    def from_save_data(cls, save_data: Dict, rng: Optional[GameRNG] = None):
         """Create player from save data"""
-        player = cls(save_data['name'])
+        player = cls(save_data['name'], rng=rng)
         
         # Load realm/stage data
         try:
@@ -714,27 +1030,31 @@ class EnhancedPlayer:
         player.total_breakthroughs = save_data.get('total_breakthroughs', 0)
         player.foundation_sessions = save_data.get('foundation_sessions', 0)
         
-        # Load history
-        player.cultivation_history = save_data.get('cultivation_history', [])
-        player.last_session_details = save_data.get('last_session_details', None)
+        # Load history (the blob keeps its own capacity)
+        if 'session_history' in save_data:
+            player.session_history = SessionHistory.from_blob(save_data['session_history'])
+        else:
+            player.cultivation_history = save_data.get('cultivation_history', [])
+            player.last_session_details = save_data.get('last_session_details', None)
         
         # Load spirit stones
         if 'spirit_stones' in save_data:
             from spirit_stones import SpiritStoneGrade
+            counts = {}
             for grade_name, amount in save_data['spirit_stones'].items():
                 try:
-                    grade = SpiritStoneGrade(grade_name)
-                    player.spirit_stones.inventory[grade] = amount
+                    counts[SpiritStoneGrade(grade_name)] = amount
                 except ValueError:
                     continue
+            player.spirit_stones.restore_inventory(counts, label="load")
         
         return player
 
 
 # Example usage and migration helper
-def migrate_old_player_to_enhanced(old_player) -> EnhancedPlayer:
+def migrate_old_player_to_enhanced(old_player, rng: Optional[GameRNG] = None) -> EnhancedPlayer:
     """Migrate existing player to enhanced system"""
-    enhanced = EnhancedPlayer(old_player.name)
+    enhanced = EnhancedPlayer(old_player.name, rng=rng)
     
     # Convert old level/realm to new system
     if hasattr(old_player, 'level'):
@@ -760,7 +1080,7 @@ def migrate_old_player_to_enhanced(old_player) -> EnhancedPlayer:
                 enhanced.primary_element = primary[0]
     
     if hasattr(old_player, 'ongoing_effects'):
-        enhanced.ongoing_effects = old_player.ongoing_effects.copy()
+        enhanced.ongoing_effects = list(old_player.ongoing_effects)
     
     if hasattr(old_player, 'spirit_stones'):
         enhanced.spirit_stones = old_player.spirit_stones
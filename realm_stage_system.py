@@ -3,10 +3,19 @@ Realm and Stage System for Cultivation Game
 Implements authentic cultivation progression with stages 1-9 per realm
 """
 
+import json
+import os
 from enum import Enum
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-import random
+from bisect import bisect_right
+from itertools import accumulate
+from rng import GameRNG, default_rng
+
+REALM_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "realms.json")
+REALM_TABLE_VERSION = 1
+STAGES_PER_REALM = 9
 
 class CultivationRealm(Enum):
     BODY_TEMPERING = "Body Tempering"
@@ -31,125 +40,86 @@ class RealmInfo:
     power_multiplier: float  # Combat power multiplier for this realm
     foundation_requirement: int  # Minimum foundation quality for breakthrough
 
-class RealmStageManager:
-    """Manages cultivation realm and stage progression"""
+class RealmRegistry:
+    """
+    Realm definitions from the realm table plus progression curves derived from them
     
-    def __init__(self):
-        self.realms = self._initialize_realms()
-        self.realm_order = list(CultivationRealm)
+    Everything that depends only on (realm, stage) is computed once at load
+    time into flat lists indexed by realm_index * STAGES_PER_REALM + stage - 1,
+    so progression queries are a dict lookup and a list index.
+    """
     
-    def _initialize_realms(self) -> Dict[CultivationRealm, RealmInfo]:
-        return {
-            CultivationRealm.BODY_TEMPERING: RealmInfo(
-                name="Body Tempering",
-                description="Strengthening the mortal body to handle spiritual energy",
-                stage_exp_base=50,
-                stage_exp_multiplier=1.2,
-                breakthrough_difficulty=0.8,
-                lifespan_years=100,
-                power_multiplier=1.0,
-                foundation_requirement=20
-            ),
-            
-            CultivationRealm.QI_GATHERING: RealmInfo(
-                name="Qi Gathering",
-                description="Learning to sense and gather spiritual energy",
-                stage_exp_base=80,
-                stage_exp_multiplier=1.25,
-                breakthrough_difficulty=1.0,
-                lifespan_years=150,
-                power_multiplier=2.0,
-                foundation_requirement=40
-            ),
-            
-            CultivationRealm.FOUNDATION_BUILDING: RealmInfo(
-                name="Foundation Building",
-                description="Building a solid foundation for future cultivation",
-                stage_exp_base=120,
-                stage_exp_multiplier=1.3,
-                breakthrough_difficulty=1.2,
-                lifespan_years=300,
-                power_multiplier=5.0,
-                foundation_requirement=80
-            ),
-            
-            CultivationRealm.CORE_FORMATION: RealmInfo(
-                name="Core Formation",
-                description="Forming a spiritual core to contain vast amounts of qi",
-                stage_exp_base=200,
-                stage_exp_multiplier=1.4,
-                breakthrough_difficulty=1.5,
-                lifespan_years=500,
-                power_multiplier=12.0,
-                foundation_requirement=150
-            ),
-            
-            CultivationRealm.NASCENT_SOUL: RealmInfo(
-                name="Nascent Soul",
-                description="Birth of the spiritual infant, beginning of true immortality",
-                stage_exp_base=350,
-                stage_exp_multiplier=1.5,
-                breakthrough_difficulty=2.0,
-                lifespan_years=1000,
-                power_multiplier=30.0,
-                foundation_requirement=250
-            ),
-            
-            CultivationRealm.SOUL_TRANSFORMATION: RealmInfo(
-                name="Soul Transformation",
-                description="Transforming the nascent soul into true spiritual form",
-                stage_exp_base=600,
-                stage_exp_multiplier=1.6,
-                breakthrough_difficulty=2.5,
-                lifespan_years=2000,
-                power_multiplier=75.0,
-                foundation_requirement=400
-            ),
-            
-            CultivationRealm.VOID_REFINEMENT: RealmInfo(
-                name="Void Refinement",
-                description="Refining the soul through understanding of the void",
-                stage_exp_base=1000,
-                stage_exp_multiplier=1.7,
-                breakthrough_difficulty=3.0,
-                lifespan_years=5000,
-                power_multiplier=180.0,
-                foundation_requirement=600
-            ),
-            
-            CultivationRealm.BODY_INTEGRATION: RealmInfo(
-                name="Body Integration",
-                description="Integrating body and soul into perfect unity",
-                stage_exp_base=1800,
-                stage_exp_multiplier=1.8,
-                breakthrough_difficulty=4.0,
-                lifespan_years=10000,
-                power_multiplier=400.0,
-                foundation_requirement=900
-            ),
+    def __init__(self, document: Dict):
+        if document.get("version") != REALM_TABLE_VERSION:
+            raise ValueError(f"Unsupported realm table version: {document.get('version')}")
+        stage_names = document["stage_names"]
+        if len(stage_names) != STAGES_PER_REALM:
+            raise ValueError(f"Realm table must name {STAGES_PER_REALM} stages")
+        
+        self.realms: Dict[CultivationRealm, RealmInfo] = {}
+        for entry in document["realms"]:
+            entry = dict(entry)
+            realm = CultivationRealm[entry.pop("key")]
+            if entry["name"] != realm.value:
+                raise ValueError(f"Realm table names {realm.name} '{entry['name']}', expected '{realm.value}'")
+            self.realms[realm] = RealmInfo(**entry)
+        if list(self.realms) != list(CultivationRealm):
+            raise ValueError("Realm table must define every CultivationRealm, in order")
+        
+        self.realm_order = list(self.realms)
+        self.realm_index = {realm: index for index, realm in enumerate(self.realm_order)}
+        
+        # Per (realm, stage), flattened
+        self.stage_exp: List[int] = []
+        self.cumulative_exp: List[int] = []  # Exp needed from Stage 1 of the realm to reach the stage
+        self.stage_bonus_power: List[float] = []
+        self.stage_power: List[float] = []   # Combat power before the foundation bonus
+        self.titles: List[str] = []
+        # Per realm
+        self.base_power: List[float] = []
+        self.foundation_requirements: List[int] = []
+        self.difficulty_penalties: List[float] = []
+        
+        for realm, realm_info in self.realms.items():
+            requirements = [
+                int(realm_info.stage_exp_base * (realm_info.stage_exp_multiplier ** (stage - 1)))
+                for stage in range(1, STAGES_PER_REALM + 1)
+            ]
+            self.stage_exp.extend(requirements)
+            self.cumulative_exp.extend(accumulate(requirements[:-1], initial=0))
             
-            CultivationRealm.MAHAYANA: RealmInfo(
-                name="Mahayana",
-                description="The great vehicle towards true enlightenment",
-                stage_exp_base=3000,
-                stage_exp_multiplier=2.0,
-                breakthrough_difficulty=5.0,
-                lifespan_years=25000,
-                power_multiplier=1000.0,
-                foundation_requirement=1400
-            ),
+            # Stage bonus: each stage adds 20% to the realm's base power
+            base_power = realm_info.power_multiplier * 100
+            stage_bonuses = [base_power * (stage - 1) * 0.2 for stage in range(1, STAGES_PER_REALM + 1)]
+            self.base_power.append(base_power)
+            self.stage_bonus_power.extend(stage_bonuses)
+            self.stage_power.extend(base_power + bonus for bonus in stage_bonuses)
+            self.titles.extend(f"{stage_name} {realm.value}" for stage_name in stage_names)
             
-            CultivationRealm.HEAVENLY_IMMORTAL: RealmInfo(
-                name="Heavenly Immortal",
-                description="Transcendence beyond mortal comprehension",
-                stage_exp_base=5000,
-                stage_exp_multiplier=2.2,
-                breakthrough_difficulty=7.0,
-                lifespan_years=100000,
-                power_multiplier=2500.0,
-                foundation_requirement=2000
-            )
-        }
+            self.foundation_requirements.append(realm_info.foundation_requirement)
+            self.difficulty_penalties.append((realm_info.breakthrough_difficulty - 1.0) * 0.1)
+    
+    @classmethod
+    def load(cls, path: str = REALM_TABLE) -> "RealmRegistry":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def realm_registry(path: str = REALM_TABLE) -> RealmRegistry:
+    """The realm registry shared by every RealmStageManager"""
+    return RealmRegistry.load(path)
+
+
+class RealmStageManager:
+    """Manages cultivation realm and stage progression"""
+    
+    def __init__(self, rng: Optional[GameRNG] = None, registry: Optional[RealmRegistry] = None):
+        self.rng = rng if rng is not None else default_rng()
+        self.registry = registry if registry is not None else realm_registry()
+        self.realms = self.registry.realms
+        self.realm_order = self.registry.realm_order
+        self._realm_index = self.registry.realm_index
     
     def get_realm_info(self, realm: CultivationRealm) -> RealmInfo:
         """Get information about a cultivation realm"""
@@ -157,34 +127,45 @@ class RealmStageManager:
     
     def get_stage_exp_requirement(self, realm: CultivationRealm, stage: int) -> int:
         """Get experience requirement for a specific stage"""
-        if stage < 1 or stage > 9:
+        if stage < 1 or stage > STAGES_PER_REALM:
             return 0
         
-        realm_info = self.realms[realm]
-        base_exp = realm_info.stage_exp_base
-        multiplier = realm_info.stage_exp_multiplier
+        # Each stage requires more exp than the last (precomputed by the registry)
+        return self.registry.stage_exp[self._realm_index[realm] * STAGES_PER_REALM + stage - 1]
+    
+    def fast_forward_stages(self, realm: CultivationRealm, stage: int, experience: int) -> Tuple[int, int]:
+        """
+        Apply accumulated experience to a stage in O(log stages)
+        
+        Returns (new_stage, remaining_experience). Advancement stops at Stage 9,
+        where any surplus experience is kept for the realm breakthrough.
+        """
+        if stage >= STAGES_PER_REALM:
+            return stage, experience
         
-        # Each stage requires more exp than the last
-        return int(base_exp * (multiplier ** (stage - 1)))
+        cumulative = self.registry.cumulative_exp
+        first = self._realm_index[realm] * STAGES_PER_REALM
+        total_exp = cumulative[first + stage - 1] + experience
+        new_stage = bisect_right(cumulative, total_exp, first + stage, first + STAGES_PER_REALM) - first
+        if new_stage == stage:
+            return stage, experience
+        return new_stage, total_exp - cumulative[first + new_stage - 1]
     
     def get_next_realm(self, current_realm: CultivationRealm) -> Optional[CultivationRealm]:
         """Get the next realm in progression"""
-        try:
-            current_index = self.realm_order.index(current_realm)
-            if current_index + 1 < len(self.realm_order):
-                return self.realm_order[current_index + 1]
-            return None
-        except ValueError:
-            return None
+        current_index = self._realm_index.get(current_realm)
+        if current_index is not None and current_index + 1 < len(self.realm_order):
+            return self.realm_order[current_index + 1]
+        return None
     
     def can_breakthrough_realm(self, realm: CultivationRealm, stage: int, foundation_quality: int) -> Tuple[bool, str]:
         """Check if player can attempt realm breakthrough"""
         if stage != 9:
             return False, f"Must reach Stage 9 before attempting breakthrough (currently Stage {stage})"
         
-        realm_info = self.realms[realm]
-        if foundation_quality < realm_info.foundation_requirement:
-            needed = realm_info.foundation_requirement - foundation_quality
+        foundation_requirement = self.registry.foundation_requirements[self._realm_index[realm]]
+        if foundation_quality < foundation_requirement:
+            needed = foundation_requirement - foundation_quality
             return False, f"Foundation too weak! Need {needed} more foundation quality"
         
         return True, "Ready for breakthrough attempt"
@@ -192,14 +173,14 @@ class RealmStageManager:
     def calculate_breakthrough_success_rate(self, realm: CultivationRealm, foundation_quality: int, 
                                          bonus_factors: Dict[str, float] = None) -> float:
         """Calculate success rate for realm breakthrough"""
-        realm_info = self.realms[realm]
+        index = self._realm_index[realm]
         
         # Base success rate depends on foundation quality vs requirement
-        foundation_ratio = foundation_quality / realm_info.foundation_requirement
+        foundation_ratio = foundation_quality / self.registry.foundation_requirements[index]
         base_rate = min(0.95, 0.3 + (foundation_ratio - 1.0) * 0.4)  # 30% minimum, up to 95%
         
         # Apply difficulty modifier
-        difficulty_penalty = (realm_info.breakthrough_difficulty - 1.0) * 0.1
+        difficulty_penalty = self.registry.difficulty_penalties[index]
         final_rate = max(0.05, base_rate - difficulty_penalty)
         
         # Apply bonus factors (pills, techniques, etc.)
@@ -214,7 +195,7 @@ class RealmStageManager:
         """Attempt realm breakthrough"""
         success_rate = self.calculate_breakthrough_success_rate(realm, foundation_quality, bonus_factors)
         
-        success = random.random() < success_rate
+        success = self.rng.random() < success_rate
         result_data = {
             'success_rate': success_rate,
             'foundation_used': foundation_quality,
@@ -226,46 +207,48 @@ class RealmStageManager:
             if next_realm:
                 message = f"🌟 Breakthrough Success! Advanced from {realm.value} to {next_realm.value}!"
                 result_data['new_realm'] = next_realm
-                result_data['foundation_bonus'] = random.randint(5, 15)  # Breakthrough strengthens foundation
+                result_data['foundation_bonus'] = self.rng.randint(5, 15)  # Breakthrough strengthens foundation
                 return True, message, result_data
             else:
                 return False, "Already at the pinnacle of cultivation!", result_data
         else:
             # Breakthrough failure
-            foundation_damage = random.randint(2, 8)
-            exp_loss_percent = random.randint(10, 30)
+            foundation_damage = self.rng.randint(2, 8)
+            exp_loss_percent = self.rng.randint(10, 30)
             
             message = f"💥 Breakthrough Failed! Lost {foundation_damage} foundation quality and {exp_loss_percent}% experience."
             result_data['foundation_damage'] = foundation_damage
             result_data['exp_loss_percent'] = exp_loss_percent
-            result_data['recovery_time'] = random.randint(3, 7)  # Sessions before next attempt
+            result_data['recovery_time'] = self.rng.randint(3, 7)  # Sessions before next attempt
             
             return False, message, result_data
     
     def get_cultivation_title(self, realm: CultivationRealm, stage: int) -> str:
         """Get full cultivation title"""
-        stage_names = {
-            1: "Initial", 2: "Early", 3: "Mid", 4: "Late", 5: "Peak Early",
-            6: "Peak Mid", 7: "Peak Late", 8: "Half-Step", 9: "Peak"
-        }
-        
-        stage_name = stage_names.get(stage, f"Stage {stage}")
-        return f"{stage_name} {realm.value}"
+        if 1 <= stage <= STAGES_PER_REALM:
+            return self.registry.titles[self._realm_index[realm] * STAGES_PER_REALM + stage - 1]
+        return f"Stage {stage} {realm.value}"
+    
+    def get_power_breakdown(self, realm: CultivationRealm, stage: int) -> Tuple[float, float]:
+        """Realm base power and stage bonus that calculate_combat_power adds up"""
+        base_power = self.registry.base_power[self._realm_index[realm]]
+        if 1 <= stage <= STAGES_PER_REALM:
+            return base_power, self.registry.stage_bonus_power[self._realm_index[realm] * STAGES_PER_REALM + stage - 1]
+        return base_power, base_power * (stage - 1) * 0.2
     
     def calculate_combat_power(self, realm: CultivationRealm, stage: int, foundation_quality: int) -> int:
         """Calculate relative combat power"""
-        realm_info = self.realms[realm]
-        
-        # Base power from realm
-        base_power = realm_info.power_multiplier * 100
-        
-        # Stage bonus (each stage adds 20% to base power)
-        stage_bonus = base_power * (stage - 1) * 0.2
+        # Realm base power plus stage bonus (precomputed by the registry)
+        if 1 <= stage <= STAGES_PER_REALM:
+            stage_power = self.registry.stage_power[self._realm_index[realm] * STAGES_PER_REALM + stage - 1]
+        else:
+            base_power, stage_bonus = self.get_power_breakdown(realm, stage)
+            stage_power = base_power + stage_bonus
         
         # Foundation bonus (significant impact)
         foundation_bonus = foundation_quality * 2
         
-        total_power = int(base_power + stage_bonus + foundation_bonus)
+        total_power = int(stage_power + foundation_bonus)
         return total_power
     
     def compare_combat_power(self, player_realm: CultivationRealm, player_stage: int, player_foundation: int,
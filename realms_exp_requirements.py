@@ -1,45 +1,17 @@
-REALMS = []
-
-realm_names = [
-    "Body Tempering",
-    "Qi Condensation",
-    "Foundation Establishment",
-    "Core Formation",
-    "Nascent Soul",
-    "Soul Transformation",
-    "Spirit Severing",
-    "Void Refinement",
-    "Immortal Ascension",
-    "Heavenly Immortal",
-    "Golden Immortal",
-    "Empyrean Immortal",
-    "True God",
-    "Heavenly Dao Lord",
-]
+from realm_stage_system import STAGES_PER_REALM, realm_registry
 
-stage_names = [
-    "1st Stage",
-    "2nd Stage",
-    "3rd Stage",
-    "4th Stage",
-    "5th Stage",
-    "6th Stage",
-    "7th Stage",
-    "8th Stage",
-    "9th Stage (Peak)",
-]
+REALMS = []
 
-base_exp = 10
-scaling_factor = 1.6
+_registry = realm_registry()
 
-for i, realm in enumerate(realm_names):
-    for j, stage in enumerate(stage_names):
-        name = f"{realm} - {stage}"
-        exp_required = int(base_exp * ((i + 1) ** 2) * ((j + 1) ** scaling_factor))
-        REALMS.append({"name": name, "exp_required": exp_required})
+# One entry per (realm, stage), in progression order, taken from the realm table
+for i, realm in enumerate(_registry.realm_order):
+    for j in range(STAGES_PER_REALM):
+        index = i * STAGES_PER_REALM + j
+        REALMS.append({"name": _registry.titles[index], "exp_required": _registry.stage_exp[index]})
 
 def get_realm_info(stage):
     """Get realm information for a given stage"""
     if stage >= len(REALMS):
         return REALMS[-1]  # Return max realm if beyond limit
-    return REALMS[stage]
\ No newline at end of file
+    return REALMS[stage]
@@ -0,0 +1,129 @@
+"""
+Random Number Service for Cultivation Game
+Seedable, injectable random streams shared by all gameplay systems
+"""
+
+import hashlib
+import random
+from typing import Any, List, Optional, Sequence
+
+
+def derive_seed(seed: Any, key: Any) -> int:
+    """Derive a child seed from a parent seed and a key (stable across processes and platforms)"""
+    digest = hashlib.sha256(f"{seed!r}/{key!r}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class GameRNG(random.Random):
+    """
+    random.Random stream used by a player or manager
+
+    Adds child-stream derivation for parallel simulation and bulk pre-drawn
+    pools for hot loops. Two GameRNGs built from the same seed produce
+    identical outcomes in any process.
+    """
+
+    def __init__(self, seed: Any = None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed_value = seed
+        super().__init__(seed)
+
+    def spawn(self, key: Any) -> "GameRNG":
+        """Create an independent child stream, e.g. one per worker or per player"""
+        return GameRNG(derive_seed(self.seed_value, key))
+
+    def uniform_pool(self, count: int) -> List[float]:
+        """Pre-draw count uniform values in [0, 1)"""
+        draw = self.random
+        return [draw() for _ in range(count)]
+
+    def randint_pool(self, low: int, high: int, count: int) -> List[int]:
+        """Pre-draw count integers in [low, high]"""
+        draw = self.randint
+        return [draw(low, high) for _ in range(count)]
+
+
+class NumpyRNG:
+    """
+    GameRNG-compatible adapter over a NumPy Generator (optional backend)
+
+    Pools are drawn as NumPy arrays and handed out as lists. NumPy is only
+    imported when this backend is requested.
+    """
+
+    def __init__(self, seed: Any = None):
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("The numpy RNG backend requires numpy to be installed") from e
+
+        if seed is not None and not isinstance(seed, int):
+            seed = derive_seed(seed, "numpy")
+        self.seed_value = seed
+        self._numpy = numpy
+        self.generator = numpy.random.default_rng(seed)
+
+    def spawn(self, key: Any) -> "NumpyRNG":
+        seed = derive_seed(self.seed_value, key) if self.seed_value is not None else None
+        return NumpyRNG(seed)
+
+    def random(self) -> float:
+        return float(self.generator.random())
+
+    def randint(self, low: int, high: int) -> int:
+        return int(self.generator.integers(low, high + 1))
+
+    def uniform(self, low: float, high: float) -> float:
+        return float(self.generator.uniform(low, high))
+
+    def choice(self, seq: Sequence):
+        return seq[int(self.generator.integers(len(seq)))]
+
+    def choices(self, population: Sequence, weights: Optional[Sequence[float]] = None, k: int = 1) -> List:
+        if weights is None:
+            indices = self.generator.integers(len(population), size=k)
+        else:
+            probabilities = self._numpy.asarray(weights, dtype=float)
+            indices = self.generator.choice(len(population), size=k, p=probabilities / probabilities.sum())
+        return [population[int(i)] for i in indices]
+
+    def sample(self, population: Sequence, k: int) -> List:
+        indices = self.generator.choice(len(population), size=k, replace=False)
+        return [population[int(i)] for i in indices]
+
+    def shuffle(self, values: List) -> None:
+        order = self.generator.permutation(len(values))
+        values[:] = [values[int(i)] for i in order]
+
+    def uniform_pool(self, count: int) -> List[float]:
+        return self.generator.random(count).tolist()
+
+    def randint_pool(self, low: int, high: int, count: int) -> List[int]:
+        return self.generator.integers(low, high + 1, size=count).tolist()
+
+
+def create_rng(seed: Any = None, backend: str = "python"):
+    """Create a random stream ("python" = GameRNG, "numpy" = NumpyRNG)"""
+    if backend == "python":
+        return GameRNG(seed)
+    if backend == "numpy":
+        return NumpyRNG(seed)
+    raise ValueError(f"Unknown RNG backend: {backend}")
+
+
+_default_rng: Optional[GameRNG] = None
+
+
+def default_rng() -> GameRNG:
+    """Process-wide stream used when no RNG is injected"""
+    global _default_rng
+    if _default_rng is None:
+        _default_rng = GameRNG()
+    return _default_rng
+
+
+def set_default_rng(rng) -> None:
+    """Replace the process-wide stream (e.g. to seed a whole game session)"""
+    global _default_rng
+    _default_rng = rng
@@ -0,0 +1,112 @@
+"""
+Weighted Sampling for Cultivation Game
+Alias-method samplers for O(1) weighted selection from fixed tables
+"""
+
+import math
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    Weighted sampler built once with Vose's alias method
+
+    Each draw costs a single uniform random value and two list lookups,
+    regardless of how many items there are, and returns the stored item
+    without allocating.
+    """
+
+    __slots__ = ("items", "_probability", "_alias", "_size")
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if not items or len(items) != len(weights):
+            raise ValueError("AliasSampler needs one weight per item and at least one item")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("AliasSampler weights must sum to a positive value")
+
+        size = len(items)
+        self.items: Tuple[T, ...] = tuple(items)
+        self._size = size
+        probability = [0.0] * size
+        alias = list(range(size))
+
+        scaled = [weight * size / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Leftovers are 1.0 up to rounding error
+        for i in large + small:
+            probability[i] = 1.0
+
+        self._probability = probability
+        self._alias = alias
+
+    def __len__(self) -> int:
+        return self._size
+
+    def pick(self, u: float) -> T:
+        """Map one uniform value in [0, 1) to an item"""
+        scaled = u * self._size
+        column = int(scaled)
+        if column == self._size:  # u * size can round up to size for u just below 1
+            column -= 1
+        if scaled - column < self._probability[column]:
+            return self.items[column]
+        return self.items[self._alias[column]]
+
+    def sample(self, rng) -> T:
+        """Draw one item using rng.random()"""
+        return self.pick(rng.random())
+
+    def sample_many(self, k: int, rng) -> List[T]:
+        """Draw k items from one bulk pool of uniform values"""
+        pick = self.pick
+        pool = rng.uniform_pool(k) if hasattr(rng, "uniform_pool") else [rng.random() for _ in range(k)]
+        return [pick(u) for u in pool]
+
+    def probabilities(self) -> List[float]:
+        """Effective selection probability of each item (for checks and tuning)"""
+        result = [0.0] * self._size
+        share = 1.0 / self._size
+        for column in range(self._size):
+            result[column] += self._probability[column] * share
+            result[self._alias[column]] += (1.0 - self._probability[column]) * share
+        return result
+
+
+def trials_until_success(rng, chance_run: Callable[[int], Tuple[float, Optional[int]]], start: int) -> int:
+    """
+    Sample how many trials it takes to get the first success (1 = the first trial)
+
+    Trial x (counting from start) succeeds with a chance that is piecewise
+    constant: chance_run(x) returns (chance, run), where the same chance holds
+    for run trials starting at x (None = for every later trial). Each
+    constant run is skipped with one geometric draw instead of one roll per
+    trial.
+    """
+    x = start
+    elapsed = 0
+    while True:
+        chance, run = chance_run(x)
+        if chance >= 1.0:
+            return elapsed + 1
+        if chance > 0.0:
+            u = 1.0 - rng.random()  # (0, 1] so the log is finite
+            trials = 1 + int(math.log(u) / math.log1p(-chance))
+            if run is None or trials <= run:
+                return elapsed + trials
+        elif run is None:
+            raise ValueError("Success chance stays at zero forever")
+        elapsed += run
+        x += run
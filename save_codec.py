@@ -0,0 +1,268 @@
+"""
+Binary Save Codec for Cultivation Game
+Compact msgpack-style encoding of save data behind a versioned header, with streaming encoder/decoder
+"""
+
+import io
+import struct
+from typing import Any, BinaryIO, Iterator, Tuple
+
+HEADER = struct.Struct("<4sBH")  # magic, codec version, save schema version
+MAGIC = b"CSAV"
+CODEC_VERSION = 1
+
+# Type tags (single byte). Small values carry their size in the tag itself.
+FIXINT_MAX = 0x7f      # 0x00-0x7f: non-negative int 0..127
+FIXMAP = 0x80          # 0x80-0x8f: map with 0..15 entries
+FIXLIST = 0x90         # 0x90-0x9f: list with 0..15 items
+FIXSTR = 0xa0          # 0xa0-0xbf: str of 0..31 UTF-8 bytes
+NIL = 0xc0
+FALSE = 0xc2
+TRUE = 0xc3
+BIN = 0xc6             # u32 length + bytes
+FLOAT = 0xcb           # f64
+INT = 0xd3             # i64
+BIGINT = 0xd4          # u32 length + decimal text (ints outside i64)
+STR = 0xdb             # u32 length + UTF-8
+LIST = 0xdd            # u32 count + items
+MAP = 0xdf             # u32 count + key/value pairs
+
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_I64_MIN = -(1 << 63)
+_I64_MAX = (1 << 63) - 1
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Encoded:
+    """Already-encoded value bytes, written through as-is (e.g. a cached save section)"""
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class Encoder:
+    """
+    Streaming encoder
+
+    Values are encoded into an internal buffer that is handed to the stream
+    whenever it grows past CHUNK_SIZE, so large saves never need to exist as
+    one bytes object.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._buffer = bytearray()
+
+    def write(self, value: Any) -> None:
+        self._encode(value)
+        if len(self._buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def write_map_header(self, count: int) -> None:
+        """Start a map whose count key/value pairs follow as separate write() calls"""
+        self._container_header(count, FIXMAP, MAP)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._stream.write(self._buffer)
+            self._buffer = bytearray()
+
+    def _container_header(self, count: int, fixed: int, tag: int) -> None:
+        if count < 16:
+            self._buffer.append(fixed | count)
+        else:
+            self._buffer.append(tag)
+            self._buffer += _U32.pack(count)
+
+    def _encode(self, value: Any) -> None:
+        buffer = self._buffer
+        if value is None:
+            buffer.append(NIL)
+        elif value is True:
+            buffer.append(TRUE)
+        elif value is False:
+            buffer.append(FALSE)
+        elif isinstance(value, int):
+            if 0 <= value <= FIXINT_MAX:
+                buffer.append(value)
+            elif _I64_MIN <= value <= _I64_MAX:
+                buffer.append(INT)
+                buffer += _I64.pack(value)
+            else:
+                text = str(value).encode("ascii")
+                buffer.append(BIGINT)
+                buffer += _U32.pack(len(text))
+                buffer += text
+        elif isinstance(value, float):
+            buffer.append(FLOAT)
+            buffer += _F64.pack(value)
+        elif isinstance(value, str):
+            data = value.encode("utf-8")
+            if len(data) < 32:
+                buffer.append(FIXSTR | len(data))
+            else:
+                buffer.append(STR)
+                buffer += _U32.pack(len(data))
+            buffer += data
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            buffer.append(BIN)
+            buffer += _U32.pack(len(value))
+            buffer += value
+        elif isinstance(value, Encoded):
+            buffer += value.data
+        elif isinstance(value, (list, tuple)):
+            self._container_header(len(value), FIXLIST, LIST)
+            for item in value:
+                self._encode(item)
+        elif hasattr(value, "items"):
+            items = list(value.items())
+            self._container_header(len(items), FIXMAP, MAP)
+            for key, item in items:
+                self._encode(key)
+                self._encode(item)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__} in a save")
+
+
+class Decoder:
+    """Streaming decoder reading values from a binary stream in CHUNK_SIZE pieces"""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._buffer = b""
+        self._position = 0
+
+    def _take(self, size: int) -> bytes:
+        end = self._position + size
+        if end > len(self._buffer):
+            self._refill(size)
+            end = self._position + size
+        data = self._buffer[self._position:end]
+        self._position = end
+        return data
+
+    def _refill(self, size: int) -> None:
+        remaining = self._buffer[self._position:]
+        chunks = [remaining]
+        available = len(remaining)
+        while available < size:
+            chunk = self._stream.read(max(CHUNK_SIZE, size - available))
+            if not chunk:
+                raise EOFError("Save data ended unexpectedly")
+            chunks.append(chunk)
+            available += len(chunk)
+        self._buffer = b"".join(chunks)
+        self._position = 0
+
+    def at_end(self) -> bool:
+        if self._position < len(self._buffer):
+            return False
+        self._buffer = self._stream.read(CHUNK_SIZE)
+        self._position = 0
+        return not self._buffer
+
+    def read(self) -> Any:
+        tag = self._take(1)[0]
+        if tag <= FIXINT_MAX:
+            return tag
+        if FIXSTR <= tag <= FIXSTR | 0x1f:
+            return self._take(tag & 0x1f).decode("utf-8")
+        if FIXMAP <= tag <= FIXMAP | 0x0f:
+            return self._read_map(tag & 0x0f)
+        if FIXLIST <= tag <= FIXLIST | 0x0f:
+            return [self.read() for _ in range(tag & 0x0f)]
+        if tag == NIL:
+            return None
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        if tag == INT:
+            return _I64.unpack(self._take(8))[0]
+        if tag == FLOAT:
+            return _F64.unpack(self._take(8))[0]
+        if tag == STR:
+            return self._take(self._length()).decode("utf-8")
+        if tag == BIN:
+            return self._take(self._length())
+        if tag == LIST:
+            return [self.read() for _ in range(self._length())]
+        if tag == MAP:
+            return self._read_map(self._length())
+        if tag == BIGINT:
+            return int(self._take(self._length()).decode("ascii"))
+        raise ValueError(f"Unknown save codec tag 0x{tag:02x}")
+
+    def _length(self) -> int:
+        return _U32.unpack(self._take(4))[0]
+
+    def _read_map(self, count: int) -> dict:
+        result = {}
+        for _ in range(count):
+            key = self.read()
+            result[key] = self.read()
+        return result
+
+    def __iter__(self) -> Iterator[Any]:
+        """Decode consecutive values until the stream ends"""
+        while not self.at_end():
+            yield self.read()
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode one value without a header (e.g. to cache a save section)"""
+    stream = io.BytesIO()
+    encoder = Encoder(stream)
+    encoder.write(value)
+    encoder.flush()
+    return stream.getvalue()
+
+
+def dump(data: Any, stream: BinaryIO, schema_version: int) -> None:
+    """Write a header and one value to a binary stream"""
+    stream.write(HEADER.pack(MAGIC, CODEC_VERSION, schema_version))
+    encoder = Encoder(stream)
+    encoder.write(data)
+    encoder.flush()
+
+
+def dumps(data: Any, schema_version: int) -> bytes:
+    stream = io.BytesIO()
+    dump(data, stream, schema_version)
+    return stream.getvalue()
+
+
+def read_header(stream: BinaryIO) -> int:
+    """Check the header and return the save schema version it declares"""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Save file is too short to be a binary save")
+    magic, codec_version, schema_version = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a binary save file")
+    if codec_version != CODEC_VERSION:
+        raise ValueError(f"Unsupported save codec version {codec_version}")
+    return schema_version
+
+
+def load(stream: BinaryIO) -> Tuple[Any, int]:
+    """Read a header and one value; returns (value, schema version)"""
+    schema_version = read_header(stream)
+    return Decoder(stream).read(), schema_version
+
+
+def loads(data: bytes) -> Tuple[Any, int]:
+    return load(io.BytesIO(data))
+
+
+if __name__ == "__main__":
+    sample = {"name": "Lin Feng", "stage": 3, "experience": -12, "foundation_quality": 12.5,
+              "effects": [{"name": "Qi Stagnation", "remaining_duration": None}],
+              "history": bytes(range(8)), "huge": 1 << 70}
+    encoded = dumps(sample, schema_version=3)
+    decoded, version = loads(encoded)
+    print(f"{len(encoded)} bytes, schema {version}, round trip ok: {decoded == sample}")
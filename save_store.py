@@ -0,0 +1,256 @@
+"""
+Multi-Character Save Store for Cultivation Game
+Keeps one save per character in a SQLite database with indexed metadata columns
+"""
+
+import io
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from derived_stats import REALM_INDEX
+from save_system import SAVE_SCHEMA_VERSION, SaveSystem
+
+DEFAULT_DATABASE = os.path.join("saves", "cultivation_saves.db")
+DEFAULT_POOL_SIZE = 4
+STATEMENT_CACHE_SIZE = 32
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS saves (
+        name TEXT PRIMARY KEY,
+        realm TEXT NOT NULL,
+        realm_index INTEGER NOT NULL,
+        stage INTEGER NOT NULL,
+        total_encounters INTEGER NOT NULL,
+        save_format TEXT NOT NULL,
+        schema_version INTEGER NOT NULL,
+        saved_at TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        data BLOB NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS saves_by_progress ON saves (realm_index, stage)",
+    "CREATE INDEX IF NOT EXISTS saves_by_time ON saves (saved_at)",
+)
+
+# Statements are kept as constants so each pooled connection prepares them once
+# and reuses them from its statement cache
+METADATA_COLUMNS = "name, realm, realm_index, stage, total_encounters, save_format, schema_version, saved_at, size"
+UPSERT_SAVE = (f"INSERT OR REPLACE INTO saves ({METADATA_COLUMNS}, data) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+SELECT_DATA = "SELECT data FROM saves WHERE name = ?"
+SELECT_INFO = f"SELECT {METADATA_COLUMNS} FROM saves WHERE name = ?"
+DELETE_SAVE = "DELETE FROM saves WHERE name = ?"
+COUNT_SAVES = "SELECT COUNT(*) FROM saves"
+
+LIST_ORDERS = {
+    "saved_at": "saved_at DESC",
+    "progress": "realm_index DESC, stage DESC",
+    "name": "name",
+}
+
+
+class SaveStore:
+    """
+    Saves for many characters in one SQLite database, one row per character
+
+    Metadata (realm, stage, timestamp, ...) lives in indexed columns, so
+    listing saves never touches the save data itself; loading reads only the
+    requested character's blob. The database runs in WAL mode, so readers
+    don't wait for a save being written. Connections come from a small pool
+    and can be used from any thread.
+    """
+
+    def __init__(self, database: str = DEFAULT_DATABASE, save_format: str = "binary",
+                 pool_size: int = DEFAULT_POOL_SIZE):
+        directory = os.path.dirname(database) or "."
+        self.database = database
+        self.save_format = save_format
+        # Encoding, decoding and schema upgrades are shared with the file saves
+        self._codec = SaveSystem(directory, save_format)
+        self._encode_lock = threading.Lock()
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections: List[sqlite3.Connection] = []
+        for _ in range(max(1, pool_size)):
+            connection = self._connect()
+            self._connections.append(connection)
+            self._pool.put(connection)
+
+        with self._connection() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.database, check_same_thread=False, isolation_level=None,
+                                     cached_statements=STATEMENT_CACHE_SIZE)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")  # Durable across crashes of the game in WAL mode
+        connection.execute("PRAGMA busy_timeout=5000")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for the duration of the block"""
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+
+    def __enter__(self) -> "SaveStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ----- saving -----
+
+    def save_player(self, player) -> bool:
+        """
+        Save a character, replacing its previous save
+        Returns True if successful, False otherwise
+        """
+        try:
+            # The codec reuses cached sections between saves, which isn't thread-safe
+            with self._encode_lock:
+                data = self._codec._encode_save(player)
+            row = (
+                player.name,
+                player.realm.value,
+                REALM_INDEX[player.realm],
+                player.stage,
+                player.total_encounters,
+                self.save_format,
+                SAVE_SCHEMA_VERSION,
+                datetime.now().isoformat(),
+                len(data),
+                data,
+            )
+            with self._connection() as connection:
+                connection.execute(UPSERT_SAVE, row)
+            return True
+        except Exception as e:
+            print(f"Error saving game: {e}")
+            return False
+
+    def delete_save(self, name: str) -> bool:
+        """Delete a character's save; False if there was none"""
+        with self._connection() as connection:
+            return connection.execute(DELETE_SAVE, (name,)).rowcount > 0
+
+    # ----- loading -----
+
+    def load_player(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load one character's save data
+        Returns player data dict if successful, None otherwise
+        """
+        with self._connection() as connection:
+            row = connection.execute(SELECT_DATA, (name,)).fetchone()
+        if row is None:
+            return None
+
+        try:
+            data = self._codec.decode_save(io.BytesIO(row[0]))
+        except Exception as e:
+            print(f"Error loading save for {name}: {e}")
+            return None
+        if not self._codec._validate_enhanced_save_data(data):
+            print(f"Invalid save data for {name}")
+            return None
+        return data
+
+    def load_enhanced_player(self, name: str, rng=None):
+        """Load a character straight into an EnhancedPlayer (None if there is no valid save)"""
+        data = self.load_player(name)
+        return self._codec.dict_to_enhanced_player(data, rng=rng) if data else None
+
+    # ----- metadata -----
+
+    def get_save_info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one character's save, without reading the save itself"""
+        with self._connection() as connection:
+            cursor = connection.execute(SELECT_INFO, (name,))
+            row = cursor.fetchone()
+            return self._info(cursor, row) if row else None
+
+    def list_saves(self, realm: Optional[str] = None, min_stage: Optional[int] = None,
+                   order_by: str = "saved_at", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Metadata of stored saves, newest first by default
+        order_by is one of LIST_ORDERS ("saved_at", "progress" or "name")
+        """
+        if order_by not in LIST_ORDERS:
+            raise ValueError(f"Unknown save ordering: {order_by}")
+
+        conditions, parameters = [], []
+        if realm is not None:
+            conditions.append("realm = ?")
+            parameters.append(realm)
+        if min_stage is not None:
+            conditions.append("stage >= ?")
+            parameters.append(min_stage)
+
+        query = f"SELECT {METADATA_COLUMNS} FROM saves"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {LIST_ORDERS[order_by]}"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._connection() as connection:
+            cursor = connection.execute(query, parameters)
+            return [self._info(cursor, row) for row in cursor.fetchall()]
+
+    def save_exists(self, name: Optional[str] = None) -> bool:
+        """Check if a character (or, without a name, any character) has a save"""
+        if name is not None:
+            return self.get_save_info(name) is not None
+        with self._connection() as connection:
+            return connection.execute(COUNT_SAVES).fetchone()[0] > 0
+
+    @staticmethod
+    def _info(cursor: sqlite3.Cursor, row) -> Dict[str, Any]:
+        return {column[0]: value for column, value in zip(cursor.description, row)}
+
+    # ----- migration -----
+
+    def import_save_system(self, save_system: SaveSystem) -> Optional[str]:
+        """Copy the single-slot save of a SaveSystem into the store; returns the character name"""
+        data = save_system.load_player()
+        if not data:
+            return None
+        player = save_system.dict_to_enhanced_player(data)
+        return player.name if self.save_player(player) else None
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    from player import EnhancedPlayer
+    from rng import GameRNG
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SaveStore(os.path.join(directory, "cultivation_saves.db")) as store:
+            for seed, name in enumerate(["Lin Feng", "Mei Ling", "Zhao Yun"]):
+                player = EnhancedPlayer(name, rng=GameRNG(seed))
+                player.cultivate_batch(200 * (seed + 1), "balanced")
+                store.save_player(player)
+
+            print("=== Saved Characters ===")
+            for info in store.list_saves(order_by="progress"):
+                print(f"{info['name']:<10} {info['realm']:<20} stage {info['stage']}  ({info['size']} bytes)")
+
+            loaded = store.load_enhanced_player("Mei Ling")
+            print(f"\nLoaded {loaded.name}: {loaded.realm.value} stage {loaded.stage}")
@@ -4,19 +4,116 @@ Handles automatic saving and loading of player progress
 Updated for Enhanced Player System
 """
 
+import atexit
+import itertools
 import json
 import os
-from typing import Dict, Any, Optional
+import threading
+from typing import BinaryIO, Callable, Dict, Any, Optional
 from datetime import datetime
 import traceback
 
+import save_codec
+from stone_journal import INDEX_SUFFIX, StoneJournal
+
+# Save data schema. 1 = level/philosophy saves, 2 = realm/stage saves with a
+# cultivation_history list, 3 = session history stored as one blob
+SAVE_SCHEMA_VERSION = 3
+
+# File names (save, backup) for each on-disk format
+SAVE_FILES = {
+    "json": ("cultivation_save.json", "cultivation_save_backup.json"),
+    "binary": ("cultivation_save.sav", "cultivation_save_backup.sav"),
+}
+
+# Spirit stone journal kept next to the save (see stone_journal.py)
+STONE_JOURNAL_FILE = "spirit_stones.journal"
+
+# Sections that rarely change between saves; their serialized JSON is reused until they do
+CACHED_SECTIONS = ("session_history", "background")
+
+
+def _dumps(value: Any) -> str:
+    """Compact JSON text"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class CoalescingWriter:
+    """
+    Background thread that writes queued saves, latest state wins
+    
+    Submitting while an older save is still waiting replaces it, so a burst
+    of saves costs at most one write in flight plus one pending.
+    """
+    
+    def __init__(self, write: Callable[..., None]):
+        self._write = write
+        self._condition = threading.Condition()
+        self._pending: Optional[tuple] = None  # Arguments of the waiting write
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+        self.coalesced = 0  # Saves dropped because a newer one replaced them
+        self.last_error: Optional[Exception] = None
+    
+    def submit(self, *args) -> None:
+        """Queue write(*args), replacing any write still waiting"""
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = args
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            self._condition.notify_all()
+    
+    def discard_pending(self) -> None:
+        """Drop the waiting save (a newer one is being written directly)"""
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+                self._pending = None
+                self._condition.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted save is on disk; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                args, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._write(*args)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                print(f"Error saving game: {e}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+
 class SaveSystem:
     """Handles saving and loading game state"""
     
-    def __init__(self, save_directory: str = "saves"):
+    def __init__(self, save_directory: str = "saves", save_format: str = "json"):
+        if save_format not in SAVE_FILES:
+            raise ValueError(f"Unknown save format: {save_format}")
         self.save_directory = save_directory
-        self.save_file = "cultivation_save.json"
-        self.backup_file = "cultivation_save_backup.json"
+        self.save_format = save_format
+        self.save_file, self.backup_file = SAVE_FILES[save_format]
+        self._write_lock = threading.Lock()
+        # Saves are numbered as they are serialized; a write never replaces a newer save
+        self._save_sequence = itertools.count(1)
+        self._written_sequence = 0
+        self._writer = CoalescingWriter(self._write_save)
+        self._fragments: Dict[str, tuple] = {}  # section -> (source, version, encoded section)
+        self.stone_journal: Optional[StoneJournal] = None
         
         # Create saves directory if it doesn't exist
         if not os.path.exists(save_directory):
@@ -26,61 +123,169 @@ class SaveSystem:
         """Get full path for save file"""
         return os.path.join(self.save_directory, filename)
     
-    def save_player(self, player) -> bool:
+    def attach_stone_journal(self, player) -> StoneJournal:
+        """
+        Journal the player's spirit stone movements next to the save
+        The journal is reconciled with the wallet first, so it starts from the stones the player has now.
+        """
+        self.close_stone_journal()
+        self.stone_journal = StoneJournal(self.get_save_path(STONE_JOURNAL_FILE))
+        player.spirit_stones.attach_journal(self.stone_journal)
+        return self.stone_journal
+    
+    def close_stone_journal(self) -> None:
+        if self.stone_journal is not None:
+            self.stone_journal.close()
+            self.stone_journal = None
+    
+    def save_player(self, player, wait: bool = True) -> bool:
         """
         Save player data to file
+        
+        The player is serialized on the calling thread. With wait=False the
+        write is handed to the background writer and this returns as soon as
+        it is queued; call flush() to wait for it.
         Returns True if successful, False otherwise
         """
         try:
-            # Create backup of existing save
-            save_path = self.get_save_path(self.save_file)
-            backup_path = self.get_save_path(self.backup_file)
-            
-            if os.path.exists(save_path):
-                if os.path.exists(backup_path):
-                    os.remove(backup_path)
-                os.rename(save_path, backup_path)
-            
-            # Convert player to saveable format
-            save_data = self._enhanced_player_to_dict(player)
-            
-            # Add save metadata
-            save_data["_save_info"] = {
-                "version": "2.0",
-                "timestamp": datetime.now().isoformat(),
-                "game_phase": "Enhanced Cultivation System"
-            }
-            
-            # Save to file
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2, ensure_ascii=False)
-            
+            data = self._encode_save(player)
+            sequence = next(self._save_sequence)
+            if self.stone_journal is not None:
+                # Stone movements up to this save reach the disk with it
+                self.stone_journal.flush()
+        except Exception as e:
+            print(f"Error saving game: {e}")
+            traceback.print_exc()
+            return False
+        
+        if not wait:
+            self._writer.submit(data, sequence)
+            return True
+        
+        try:
+            # Anything still queued is older than this save. A background write
+            # already in progress finishes first or is dropped by _write_save.
+            self._writer.discard_pending()
+            self._write_save(data, sequence)
             return True
-            
         except Exception as e:
             print(f"Error saving game: {e}")
             traceback.print_exc()
             return False
     
-    def load_player(self) -> Optional[Dict[str, Any]]:
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued background saves to reach the disk"""
+        return self._writer.flush(timeout)
+    
+    def _encode_save(self, player) -> bytes:
+        """Serialize a player in the save format, reusing unchanged cached sections"""
+        save_data = self._enhanced_player_to_dict(player, include_cached_sections=False)
+        
+        # Add save metadata
+        save_data["_save_info"] = {
+            "version": "2.0",
+            "schema_version": SAVE_SCHEMA_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "game_phase": "Enhanced Cultivation System"
+        }
+        
+        binary = self.save_format == "binary"
+        encode = save_codec.encode_value if binary else _dumps
+        history = player.session_history
+        background = getattr(player, 'background', None)
+        sections = {
+            # Binary saves keep the history blob as raw bytes instead of base64
+            "session_history": self._section_fragment(
+                "session_history", history, history.version,
+                history.to_bytes if binary else history.to_blob, encode),
+            "background": self._section_fragment(
+                "background", background, None, lambda: self._serialize_background(background), encode),
+        }
+        
+        if binary:
+            for name, fragment in sections.items():
+                save_data[name] = save_codec.Encoded(fragment)
+            return save_codec.dumps(save_data, SAVE_SCHEMA_VERSION)
+        
+        parts = [f"{_dumps(key)}:{_dumps(value)}" for key, value in save_data.items()]
+        parts.extend(f"{_dumps(name)}:{fragment}" for name, fragment in sections.items())
+        return ("{" + ",".join(parts) + "}").encode("utf-8")
+    
+    def _section_fragment(self, name: str, source, version, build: Callable[[], Any],
+                          encode: Callable[[Any], Any]):
+        """Encoded section, rebuilt only when its source object or version changed"""
+        cached = self._fragments.get(name)
+        if cached is not None and cached[0] is source and cached[1] == version:
+            return cached[2]
+        fragment = encode(build())
+        # Keeping the source referenced means its id can't be reused by another object
+        self._fragments[name] = (source, version, fragment)
+        return fragment
+    
+    def _write_save(self, data: bytes, sequence: Optional[int] = None) -> None:
         """
-        Load player data from file
-        Returns player data dict if successful, None otherwise
+        Atomically replace the save file, keeping the previous one as the backup
+        A save numbered older than the one last written is skipped.
         """
         save_path = self.get_save_path(self.save_file)
         backup_path = self.get_save_path(self.backup_file)
+        temp_path = f"{save_path}.tmp"
         
-        # Try to load main save file
-        player_data = self._try_load_file(save_path)
-        if player_data:
-            return player_data
-        
-        # If main file failed, try backup
-        print("Main save file corrupted or missing, trying backup...")
-        player_data = self._try_load_file(backup_path)
-        if player_data:
-            print("Loaded from backup save file.")
-            return player_data
+        with self._write_lock:
+            if sequence is not None and sequence <= self._written_sequence:
+                return
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # The new save is complete on disk before the old one is touched;
+            # between these two renames load_player falls back to the backup
+            if os.path.exists(save_path):
+                os.replace(save_path, backup_path)
+            os.replace(temp_path, save_path)
+            self._fsync_directory()
+            if sequence is not None:
+                self._written_sequence = sequence
+    
+    def _fsync_directory(self) -> None:
+        """Persist the renames (not supported on every platform)"""
+        try:
+            fd = os.open(self.save_directory, os.O_RDONLY)
+        except (OSError, AttributeError):
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def load_player(self) -> Optional[Dict[str, Any]]:
+        """
+        Load player data from file
+        Saves in the other format are picked up too, so switching formats
+        keeps existing progress. Older schemas are upgraded on load.
+        Returns player data dict if successful, None otherwise
+        """
+        other_formats = [files for save_format, files in SAVE_FILES.items() if save_format != self.save_format]
+        for save_file, backup_file in [(self.save_file, self.backup_file)] + other_formats:
+            save_path = self.get_save_path(save_file)
+            backup_path = self.get_save_path(backup_file)
+            if not os.path.exists(save_path) and not os.path.exists(backup_path):
+                continue
+            
+            # Try to load main save file
+            player_data = self._try_load_file(save_path)
+            if player_data:
+                return player_data
+            
+            # If main file failed, try backup
+            print("Main save file corrupted or missing, trying backup...")
+            player_data = self._try_load_file(backup_path)
+            if player_data:
+                print("Loaded from backup save file.")
+                return player_data
         
         return None
     
@@ -90,8 +295,8 @@ class SaveSystem:
             if not os.path.exists(file_path):
                 return None
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = self.decode_save(f)
             
             # Validate save data
             if self._validate_enhanced_save_data(data):
@@ -104,6 +309,17 @@ class SaveSystem:
             print(f"Error loading {file_path}: {e}")
             return None
     
+    def decode_save(self, stream: BinaryIO) -> Dict[str, Any]:
+        """Decode a JSON or binary save (told apart by the header) and upgrade it to the current schema"""
+        if stream.read(len(save_codec.MAGIC)) == save_codec.MAGIC:
+            stream.seek(0)
+            data, schema_version = save_codec.load(stream)
+        else:
+            stream.seek(0)
+            data = json.loads(stream.read().decode('utf-8'))
+            schema_version = detect_schema_version(data)
+        return upgrade_save(data, schema_version)
+    
     def _validate_enhanced_save_data(self, data: Dict[str, Any]) -> bool:
         """Validate that save data has required fields for enhanced system"""
         required_fields = [
@@ -119,8 +335,8 @@ class SaveSystem:
         
         return True
     
-    def _enhanced_player_to_dict(self, player) -> Dict[str, Any]:
-        """Convert enhanced player object to dictionary for saving"""
+    def _enhanced_player_to_dict(self, player, include_cached_sections: bool = True) -> Dict[str, Any]:
+        """Convert enhanced player object to dictionary for saving (optionally without CACHED_SECTIONS)"""
         from spirit_stones import SpiritStoneGrade
         
         # Convert spirit stone inventory to saveable format
@@ -128,35 +344,7 @@ class SaveSystem:
         for grade in SpiritStoneGrade:
             spirit_stones_data[grade.value] = player.spirit_stones.inventory[grade]
         
-        # Convert cultivation history to saveable format
-        cultivation_history = []
-        for session in player.cultivation_history:
-            session_data = session.copy()
-            # Convert spirit stones in history
-            if "spirit_stones" in session_data and session_data["spirit_stones"]:
-                stones_dict = {}
-                for grade, amount in session_data["spirit_stones"].items():
-                    if hasattr(grade, 'value'):
-                        stones_dict[grade.value] = amount
-                    else:
-                        stones_dict[str(grade)] = amount
-                session_data["spirit_stones"] = stones_dict
-            cultivation_history.append(session_data)
-        
-        # Convert last session details
-        last_session = None
-        if player.last_session_details:
-            last_session = player.last_session_details.copy()
-            if "spirit_stones" in last_session and last_session["spirit_stones"]:
-                stones_dict = {}
-                for grade, amount in last_session["spirit_stones"].items():
-                    if hasattr(grade, 'value'):
-                        stones_dict[grade.value] = amount
-                    else:
-                        stones_dict[str(grade)] = amount
-                last_session["spirit_stones"] = stones_dict
-        
-        return {
+        data = {
             # Basic info - UPDATED FOR ENHANCED SYSTEM
             "name": player.name,
             "realm": player.realm.value,  # Save realm as string
@@ -166,8 +354,8 @@ class SaveSystem:
             "foundation_stability": getattr(player, 'foundation_stability', 100),
             
             # Enhanced systems - NEW
-            "dao_comprehension": player.dao_comprehension,
-            "elemental_affinities": player.elemental_affinities,
+            "dao_comprehension": dict(player.dao_comprehension),
+            "elemental_affinities": dict(player.elemental_affinities),
             "primary_element": player.primary_element,
             "secondary_elements": getattr(player, 'secondary_elements', []),
             
@@ -177,7 +365,7 @@ class SaveSystem:
             "recovery_time": getattr(player, 'recovery_time', 0),
             
             # Effects
-            "ongoing_effects": player.ongoing_effects,
+            "ongoing_effects": list(player.ongoing_effects),
             
             # Spirit Stones
             "spirit_stones": spirit_stones_data,
@@ -189,12 +377,7 @@ class SaveSystem:
             "total_breakthroughs": getattr(player, 'total_breakthroughs', 0),
             "foundation_sessions": getattr(player, 'foundation_sessions', 0),
             
-            # History
-            "cultivation_history": cultivation_history,
-            "last_session_details": last_session,
-            
-            # Background info (if exists) - Convert to serializable format
-            "background": self._serialize_background(getattr(player, 'background', None)),
+            # History and background info are added below (see CACHED_SECTIONS)
             "motivation": getattr(player, 'motivation', None),
             
             # Encounter manager state
@@ -205,16 +388,22 @@ class SaveSystem:
                 "drought_sessions": player.encounter_manager.drought_sessions
             }
         }
+        
+        if include_cached_sections:
+            data["session_history"] = player.session_history.to_blob()
+            data["background"] = self._serialize_background(getattr(player, 'background', None))
+        return data
     
-    def dict_to_enhanced_player(self, data: Dict[str, Any]):
+    def dict_to_enhanced_player(self, data: Dict[str, Any], rng=None):
         """Convert dictionary back to enhanced player object"""
         from player import EnhancedPlayer
         from spirit_stones import SpiritStoneGrade
         from cultivation_encounters import EncounterType
         from realm_stage_system import CultivationRealm
+        from session_history import SessionHistory
         
         # Create new enhanced player
-        player = EnhancedPlayer(data["name"])
+        player = EnhancedPlayer(data["name"], rng=rng)
         
         # Restore basic info
         try:
@@ -242,12 +431,13 @@ class SaveSystem:
         player.ongoing_effects = data.get("ongoing_effects", [])
         
         # Restore spirit stones
+        counts = {}
         for grade_name, amount in data.get("spirit_stones", {}).items():
             try:
-                grade = SpiritStoneGrade(grade_name)
-                player.spirit_stones.inventory[grade] = amount
+                counts[SpiritStoneGrade(grade_name)] = amount
             except ValueError:
                 continue
+        player.spirit_stones.restore_inventory(counts, label="load")
         
         # Restore statistics
         player.total_encounters = data.get("total_encounters", 0)
@@ -264,35 +454,14 @@ class SaveSystem:
             player.background = None
         player.motivation = data.get("motivation", None)
         
-        # Restore cultivation history
-        if "cultivation_history" in data:
-            cultivation_history = []
-            for session_data in data["cultivation_history"]:
-                session = session_data.copy()
-                # Convert spirit stones back
-                if "spirit_stones" in session and session["spirit_stones"]:
-                    stones_dict = {}
-                    for grade_name, amount in session["spirit_stones"].items():
-                        try:
-                            stones_dict[SpiritStoneGrade(grade_name)] = amount
-                        except ValueError:
-                            continue
-                    session["spirit_stones"] = stones_dict
-                cultivation_history.append(session)
-            player.cultivation_history = cultivation_history
-        
-        # Restore last session details
-        if "last_session_details" in data and data["last_session_details"]:
-            last_session = data["last_session_details"].copy()
-            if "spirit_stones" in last_session and last_session["spirit_stones"]:
-                stones_dict = {}
-                for grade_name, amount in last_session["spirit_stones"].items():
-                    try:
-                        stones_dict[SpiritStoneGrade(grade_name)] = amount
-                    except ValueError:
-                        continue
-                last_session["spirit_stones"] = stones_dict
-            player.last_session_details = last_session
+        # Restore cultivation history (compact blob, or the old list format); the blob keeps its capacity
+        if "session_history" in data:
+            player.session_history = SessionHistory.from_blob(data["session_history"])
+        else:
+            if "cultivation_history" in data:
+                player.cultivation_history = data["cultivation_history"]
+            if data.get("last_session_details"):
+                player.last_session_details = data["last_session_details"]
         
         # Restore encounter manager state
         if "encounter_manager_state" in data:
@@ -381,10 +550,9 @@ class SaveSystem:
             return None
 
     def save_exists(self) -> bool:
-        """Check if a save file exists"""
-        save_path = self.get_save_path(self.save_file)
-        backup_path = self.get_save_path(self.backup_file)
-        return os.path.exists(save_path) or os.path.exists(backup_path)
+        """Check if a save file exists (in any format)"""
+        return any(os.path.exists(self.get_save_path(filename))
+                   for files in SAVE_FILES.values() for filename in files)
     
     def get_save_info(self) -> Optional[Dict[str, Any]]:
         """Get information about the save file"""
@@ -396,13 +564,22 @@ class SaveSystem:
     def delete_save(self) -> bool:
         """Delete save files"""
         try:
-            save_path = self.get_save_path(self.save_file)
-            backup_path = self.get_save_path(self.backup_file)
+            self.close_stone_journal()
+            journal_path = self.get_save_path(STONE_JOURNAL_FILE)
+            for path in (journal_path, journal_path + INDEX_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
             
-            if os.path.exists(save_path):
-                os.remove(save_path)
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
+            for save_file, backup_file in SAVE_FILES.values():
+                save_path = self.get_save_path(save_file)
+                backup_path = self.get_save_path(backup_file)
+                
+                if os.path.exists(save_path):
+                    os.remove(save_path)
+                if os.path.exists(backup_path):
+                    os.remove(backup_path)
+                if os.path.exists(f"{save_path}.tmp"):
+                    os.remove(f"{save_path}.tmp")
             
             return True
         except Exception as e:
@@ -458,6 +635,48 @@ def migrate_old_save_to_enhanced(old_data: Dict[str, Any]) -> Dict[str, Any]:
     return enhanced_data
 
 
+def migrate_history_to_blob(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Migrate a cultivation_history list (schema 2) to a session history blob (schema 3)"""
+    from session_history import SessionHistory, DEFAULT_HISTORY_DEPTH
+    
+    upgraded = data.copy()
+    sessions = upgraded.pop("cultivation_history", None) or []
+    last_session = upgraded.pop("last_session_details", None)
+    history = SessionHistory.from_sessions(sessions, max(DEFAULT_HISTORY_DEPTH, len(sessions)))
+    if last_session:
+        # The old format kept the newest session's full details separately
+        history.replace_last(last_session)
+    upgraded["session_history"] = history.to_blob()
+    return upgraded
+
+
+# Upgraders from each schema version to the next
+SCHEMA_UPGRADES: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    1: migrate_old_save_to_enhanced,
+    2: migrate_history_to_blob,
+}
+
+
+def detect_schema_version(data: Dict[str, Any]) -> int:
+    """Schema version of JSON save data (older saves don't record one)"""
+    schema_version = data.get("_save_info", {}).get("schema_version")
+    if schema_version is not None:
+        return schema_version
+    if "realm" not in data or "dao_comprehension" not in data:
+        return 1
+    return 3 if "session_history" in data else 2
+
+
+def upgrade_save(data: Dict[str, Any], schema_version: int) -> Dict[str, Any]:
+    """Run save data through the upgrader chain up to SAVE_SCHEMA_VERSION"""
+    if schema_version > SAVE_SCHEMA_VERSION:
+        raise ValueError(f"Save schema {schema_version} is newer than this game supports")
+    while schema_version < SAVE_SCHEMA_VERSION:
+        data = SCHEMA_UPGRADES[schema_version](data)
+        schema_version += 1
+    return data
+
+
 # Example usage
 if __name__ == "__main__":
     # Test the save system
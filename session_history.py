@@ -0,0 +1,264 @@
+"""
+Cultivation Session History for Cultivation Game
+Fixed-capacity ring buffer of compact session records with a single-blob save format
+"""
+
+import base64
+import json
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from spirit_stones import SpiritStoneGrade
+
+STONE_GRADES = list(SpiritStoneGrade)
+GRADE_INDEX = {grade: i for i, grade in enumerate(STONE_GRADES)}
+
+# focus id, base exp, final exp, foundation gained, effects before/after, encounter id, stones per grade
+RECORD = struct.Struct("<Hiid HHi" + "I" * len(STONE_GRADES))
+BLOB_HEADER = struct.Struct("<4sBHHI")  # magic, version, capacity, record count, tail length
+BLOB_MAGIC = b"CSH1"
+BLOB_VERSION = 1
+NO_ENCOUNTER = -1
+
+DEFAULT_HISTORY_DEPTH = 10
+
+
+def _number(value: float):
+    return int(value) if value.is_integer() else value
+
+
+class SessionHistory:
+    """
+    Ring buffer holding the most recent cultivation sessions
+
+    Numeric fields of each session are packed into one preallocated
+    bytearray; focus names and encounters are interned and stored by id. The
+    rarely-present parts of a session (advancement messages, dao and
+    elemental gains) are kept per slot only when non-empty. Session dicts in
+    the old session_details shape are only built when they are read.
+    """
+
+    __slots__ = ("capacity", "version", "_records", "_extras", "_start", "_count",
+                 "_strings", "_string_ids", "_encounters", "_encounter_ids")
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_DEPTH):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self.version = 0  # Bumped on every change (lets savers reuse an unchanged blob)
+        self._records = bytearray(RECORD.size * capacity)
+        self._extras: List[Optional[Tuple]] = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._encounters: List[Tuple[int, int, int, int]] = []
+        self._encounter_ids: Dict[Tuple[int, int, int, int], int] = {}
+
+    # ----- interning -----
+
+    def _intern_string(self, text: str) -> int:
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def _intern_encounter(self, encounter: Dict) -> int:
+        key = (self._intern_string(encounter.get("type", "")),
+               self._intern_string(encounter.get("name", "")),
+               self._intern_string(encounter.get("rarity", "common")),
+               self._intern_string(encounter.get("description", "")))
+        encounter_id = self._encounter_ids.get(key)
+        if encounter_id is None:
+            encounter_id = len(self._encounters)
+            self._encounters.append(key)
+            self._encounter_ids[key] = encounter_id
+        return encounter_id
+
+    # ----- recording -----
+
+    def append(self, session_details: Dict) -> None:
+        """Record a session (a dict in the session_details shape), dropping the oldest if full"""
+        self.version += 1
+        if self._count < self.capacity:
+            slot = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        encounter = session_details.get("encounter")
+        stones = [0] * len(STONE_GRADES)
+        for grade, amount in (session_details.get("spirit_stones") or {}).items():
+            if not isinstance(grade, SpiritStoneGrade):
+                grade = SpiritStoneGrade(grade)  # Old saves keep grades by name
+            stones[GRADE_INDEX[grade]] += amount
+        RECORD.pack_into(
+            self._records, slot * RECORD.size,
+            self._intern_string(session_details.get("cultivation_focus", "balanced")),
+            session_details.get("base_exp", 0),
+            session_details.get("final_exp", 0),
+            session_details.get("foundation_gained", 0),
+            session_details.get("effects_before", 0),
+            session_details.get("effects_after", 0),
+            self._intern_encounter(encounter) if encounter else NO_ENCOUNTER,
+            *stones
+        )
+
+        level_ups = session_details.get("level_ups")
+        dao_gains = session_details.get("dao_gains")
+        elemental_gains = session_details.get("elemental_gains")
+        if level_ups or dao_gains or elemental_gains:
+            self._extras[slot] = (tuple(level_ups or ()),
+                                  tuple((dao_gains or {}).items()),
+                                  tuple((elemental_gains or {}).items()))
+        else:
+            self._extras[slot] = None
+
+    def extend(self, sessions) -> None:
+        for session_details in sessions:
+            self.append(session_details)
+
+    def replace_last(self, session_details: Dict) -> None:
+        """Overwrite the most recent session (appends if the history is empty)"""
+        if self._count:
+            self._count -= 1
+        self.append(session_details)
+
+    def clear(self) -> None:
+        self.version += 1
+        self._start = 0
+        self._count = 0
+        self._extras = [None] * self.capacity
+
+    # ----- reading -----
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("session history index out of range")
+        return (self._start + index) % self.capacity
+
+    def _decode(self, slot: int) -> Dict:
+        fields = RECORD.unpack_from(self._records, slot * RECORD.size)
+        focus_id, base_exp, final_exp, foundation, before, after, encounter_id = fields[:7]
+
+        encounter = None
+        if encounter_id != NO_ENCOUNTER:
+            type_id, name_id, rarity_id, description_id = self._encounters[encounter_id]
+            encounter = {
+                "type": self._strings[type_id],
+                "name": self._strings[name_id],
+                "description": self._strings[description_id],
+                "rarity": self._strings[rarity_id]
+            }
+
+        extras = self._extras[slot]
+        level_ups, dao_gains, elemental_gains = extras if extras else ((), (), ())
+
+        return {
+            "base_exp": base_exp,
+            "final_exp": final_exp,
+            "encounter": encounter,
+            "spirit_stones": {grade: amount for grade, amount in zip(STONE_GRADES, fields[7:]) if amount},
+            "level_ups": list(level_ups),
+            "effects_before": before,
+            "effects_after": after,
+            "cultivation_focus": self._strings[focus_id],
+            "foundation_gained": _number(foundation),
+            "elemental_gains": dict(elemental_gains),
+            "dao_gains": dict(dao_gains)
+        }
+
+    def __getitem__(self, index: int) -> Dict:
+        return self._decode(self._slot(index))
+
+    def __iter__(self):
+        """Iterate sessions oldest first, decoding each one on demand"""
+        for index in range(self._count):
+            yield self._decode((self._start + index) % self.capacity)
+
+    def recent(self, limit: int) -> List[Dict]:
+        """Most recent sessions, newest first"""
+        return [self[-i] for i in range(1, min(limit, self._count) + 1)]
+
+    def last(self) -> Optional[Dict]:
+        return self[-1] if self._count else None
+
+    def to_list(self) -> List[Dict]:
+        return list(self)
+
+    # ----- saving -----
+
+    def to_bytes(self) -> bytes:
+        """Serialize the history as one binary blob (records in chronological order)"""
+        records = bytearray()
+        extras = []
+        for index in range(self._count):
+            slot = (self._start + index) % self.capacity
+            offset = slot * RECORD.size
+            records += self._records[offset:offset + RECORD.size]
+            if self._extras[slot]:
+                level_ups, dao_gains, elemental_gains = self._extras[slot]
+                extras.append([index, list(level_ups), dict(dao_gains), dict(elemental_gains)])
+
+        tail = json.dumps({
+            "strings": self._strings,
+            "encounters": self._encounters,
+            "extras": extras
+        }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+        header = BLOB_HEADER.pack(BLOB_MAGIC, BLOB_VERSION, self.capacity, self._count, len(tail))
+        return header + bytes(records) + tail
+
+    def to_blob(self) -> str:
+        """to_bytes() as base64 text, for JSON saves"""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_blob(cls, blob, capacity: Optional[int] = None) -> "SessionHistory":
+        """Rebuild a history from to_blob() or to_bytes() output (optionally into a different capacity)"""
+        data = bytes(blob) if isinstance(blob, (bytes, bytearray, memoryview)) else base64.b64decode(blob)
+        magic, version, saved_capacity, count, tail_length = BLOB_HEADER.unpack_from(data)
+        if magic != BLOB_MAGIC or version != BLOB_VERSION:
+            raise ValueError("Unrecognized session history blob")
+
+        records_start = BLOB_HEADER.size
+        tail_start = records_start + count * RECORD.size
+        tail = json.loads(data[tail_start:tail_start + tail_length].decode("utf-8"))
+
+        history = cls(capacity or saved_capacity)
+        history._strings = list(tail["strings"])
+        history._string_ids = {text: i for i, text in enumerate(history._strings)}
+        history._encounters = [tuple(key) for key in tail["encounters"]]
+        history._encounter_ids = {key: i for i, key in enumerate(history._encounters)}
+
+        extras = {entry[0]: (tuple(entry[1]), tuple(entry[2].items()), tuple(entry[3].items()))
+                  for entry in tail["extras"]}
+
+        # Keep only the newest sessions if the new capacity is smaller
+        first = max(0, count - history.capacity)
+        for index in range(first, count):
+            slot = history._count
+            offset = records_start + index * RECORD.size
+            history._records[slot * RECORD.size:(slot + 1) * RECORD.size] = data[offset:offset + RECORD.size]
+            history._extras[slot] = extras.get(index)
+            history._count += 1
+
+        return history
+
+    @classmethod
+    def from_sessions(cls, sessions: List[Dict], capacity: int = DEFAULT_HISTORY_DEPTH) -> "SessionHistory":
+        """Build a history from a list of session_details dicts (old save format)"""
+        history = cls(capacity)
+        history.extend(sessions)
+        return history
@@ -0,0 +1,244 @@
+"""
+Monte Carlo Progression Simulator for Cultivation Game
+Runs many headless EnhancedPlayer lifecycles in parallel for balance tuning
+
+Usage:
+    python simulate.py --lifecycles 100000 --focus aggressive --target "Nascent Soul"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from player import EnhancedPlayer
+from realm_stage_system import CultivationRealm
+from rng import GameRNG
+
+REALM_ORDER = list(CultivationRealm)
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+
+
+def _lifecycle_seed(base_seed: int, lifecycle_index: int) -> str:
+    """Deterministic per-lifecycle seed, independent of worker count and scheduling"""
+    return f"{base_seed}:{lifecycle_index}"
+
+
+def run_lifecycle(seed, cultivation_focus: str, target_realm: CultivationRealm,
+                  max_sessions: int, batch_size: int = 256) -> Dict:
+    """
+    Run one cultivator from Body Tempering until the target realm (or the session cap)
+
+    Policy: cultivate with the chosen focus, meditate whenever negative effects are
+    present, attempt a breakthrough as soon as it is allowed, and switch to
+    foundation focus while Stage 9 is blocked by the foundation requirement.
+    Meditation and breakthrough attempts each count as one session.
+    """
+    player = EnhancedPlayer("Simulated Cultivator", rng=GameRNG(seed))
+    target_index = REALM_ORDER.index(target_realm)
+    realm_index = REALM_ORDER.index(player.realm)
+
+    sessions = 0
+    sessions_to_realm = {}
+
+    def should_stop(p: EnhancedPlayer) -> bool:
+        return p.stage == 9 or p.ongoing_effects.has_negative_effects()
+
+    while sessions < max_sessions and realm_index < target_index:
+        if player.ongoing_effects.has_negative_effects():
+            player.meditate_for_recovery()
+            sessions += 1
+            if player.ongoing_effects.has_negative_effects():
+                # Let natural recovery and timed expiry work alongside meditation
+                summary = player.cultivate_batch(1, cultivation_focus)
+                sessions += summary["sessions"]
+            continue
+
+        if player.stage == 9:
+            if player.recovery_time > 0:
+                summary = player.cultivate_batch(min(player.recovery_time, max_sessions - sessions), cultivation_focus)
+                sessions += summary["sessions"]
+                continue
+
+            can_breakthrough, _ = player.realm_manager.can_breakthrough_realm(
+                player.realm, player.stage, player.foundation_quality
+            )
+            if can_breakthrough:
+                success, _, _ = player.attempt_realm_breakthrough()
+                sessions += 1
+                if success:
+                    realm_index = REALM_ORDER.index(player.realm)
+                    sessions_to_realm[player.realm.value] = sessions
+                continue
+
+            # Foundation too weak for the breakthrough - shore it up
+            realm_info = player.realm_manager.get_realm_info(player.realm)
+            summary = player.cultivate_batch(
+                min(batch_size, max_sessions - sessions), "foundation",
+                until=lambda p: p.foundation_quality >= realm_info.foundation_requirement
+                or p.ongoing_effects.has_negative_effects()
+            )
+            sessions += summary["sessions"]
+            continue
+
+        summary = player.cultivate_batch(
+            min(batch_size, max_sessions - sessions), cultivation_focus, until=should_stop
+        )
+        sessions += summary["sessions"]
+
+    return {
+        "sessions": sessions,
+        "reached_target": realm_index >= target_index,
+        "sessions_to_realm": sessions_to_realm,
+        "foundation_quality": player.foundation_quality,
+        "spirit_stone_wealth": player.spirit_stones.get_total_value_in_low_grade(),
+        "breakthrough_failures": player.breakthrough_failures
+    }
+
+
+def run_chunk(base_seed: int, start_index: int, count: int, cultivation_focus: str,
+              target_realm_value: str, max_sessions: int) -> List[Dict]:
+    """Worker entry point: run a contiguous range of lifecycles"""
+    target_realm = CultivationRealm(target_realm_value)
+    return [
+        run_lifecycle(_lifecycle_seed(base_seed, index), cultivation_focus, target_realm, max_sessions)
+        for index in range(start_index, start_index + count)
+    ]
+
+
+class ProgressionStats:
+    """Accumulates lifecycle results and renders percentile tables"""
+
+    def __init__(self):
+        self.lifecycles = 0
+        self.reached_target = 0
+        self.sessions_to_realm: Dict[str, List[int]] = {}
+        self.foundation_quality: List[float] = []
+        self.spirit_stone_wealth: List[int] = []
+        self.breakthrough_failures: List[int] = []
+
+    def add(self, result: Dict) -> None:
+        self.lifecycles += 1
+        if result["reached_target"]:
+            self.reached_target += 1
+        for realm_name, sessions in result["sessions_to_realm"].items():
+            self.sessions_to_realm.setdefault(realm_name, []).append(sessions)
+        self.foundation_quality.append(result["foundation_quality"])
+        self.spirit_stone_wealth.append(result["spirit_stone_wealth"])
+        self.breakthrough_failures.append(result["breakthrough_failures"])
+
+    @staticmethod
+    def percentiles(values: List[float]) -> List[float]:
+        """Nearest-rank percentiles for PERCENTILES"""
+        if not values:
+            return []
+        ordered = sorted(values)
+        last = len(ordered) - 1
+        return [ordered[min(last, max(0, -(-p * len(ordered) // 100) - 1))] for p in PERCENTILES]
+
+    def to_dict(self) -> Dict:
+        realms = {}
+        for realm in REALM_ORDER:
+            values = self.sessions_to_realm.get(realm.value)
+            if values:
+                realms[realm.value] = {
+                    "reached": len(values),
+                    "percentiles": dict(zip(PERCENTILES, self.percentiles(values)))
+                }
+        return {
+            "lifecycles": self.lifecycles,
+            "reached_target": self.reached_target,
+            "sessions_to_realm": realms,
+            "foundation_quality": dict(zip(PERCENTILES, self.percentiles(self.foundation_quality))),
+            "spirit_stone_wealth": dict(zip(PERCENTILES, self.percentiles(self.spirit_stone_wealth))),
+            "breakthrough_failures": dict(zip(PERCENTILES, self.percentiles(self.breakthrough_failures)))
+        }
+
+    def render(self) -> str:
+        header = "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+        lines = [
+            f"Lifecycles: {self.lifecycles:,} | Reached target: {self.reached_target:,} "
+            f"({self.reached_target / max(1, self.lifecycles):.1%})",
+            "",
+            f"{'Sessions to realm':<24}{'reached':>10}{header}"
+        ]
+
+        for realm in REALM_ORDER:
+            values = self.sessions_to_realm.get(realm.value)
+            if values:
+                cells = "".join(f"{v:>10,}" for v in self.percentiles(values))
+                lines.append(f"{realm.value:<24}{len(values):>10,}{cells}")
+
+        lines.append("")
+        lines.append(f"{'Final state':<34}{header}")
+        for label, values in [("Foundation quality", self.foundation_quality),
+                              ("Spirit stone wealth", self.spirit_stone_wealth),
+                              ("Breakthrough failures", self.breakthrough_failures)]:
+            cells = "".join(f"{v:>10,.0f}" for v in self.percentiles(values))
+            lines.append(f"{label:<34}{cells}")
+
+        return "\n".join(lines)
+
+
+def simulate(lifecycles: int, cultivation_focus: str, target_realm: CultivationRealm,
+             max_sessions: int = 20000, workers: Optional[int] = None, seed: int = 0,
+             chunk_size: int = 250, report_every: int = 20, output=None) -> ProgressionStats:
+    """Run lifecycles across a process pool, streaming percentile tables as chunks finish"""
+    stats = ProgressionStats()
+    started = time.time()
+    chunks = [(start, min(chunk_size, lifecycles - start)) for start in range(0, lifecycles, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_chunk, seed, start, count, cultivation_focus, target_realm.value, max_sessions)
+            for start, count in chunks
+        ]
+
+        for completed, future in enumerate(as_completed(futures), 1):
+            for result in future.result():
+                stats.add(result)
+
+            if output is not None and (completed % report_every == 0 or completed == len(futures)):
+                elapsed = time.time() - started
+                print(f"\n=== {completed}/{len(futures)} chunks, {elapsed:.1f}s ===", file=output)
+                print(stats.render(), file=output, flush=True)
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the progression simulator"""
+    parser = argparse.ArgumentParser(description="Monte Carlo cultivation progression simulator")
+    parser.add_argument("--lifecycles", "-n", type=int, default=1000, help="Number of independent cultivators")
+    parser.add_argument("--focus", choices=["balanced", "aggressive", "foundation"], default="balanced",
+                        help="Cultivation focus used for regular sessions")
+    parser.add_argument("--target", default=CultivationRealm.NASCENT_SOUL.value,
+                        help="Realm name at which a lifecycle stops")
+    parser.add_argument("--max-sessions", type=int, default=20000, help="Session cap per lifecycle")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed (same seed = same results)")
+    parser.add_argument("--chunk-size", type=int, default=250, help="Lifecycles per worker task")
+    parser.add_argument("--report-every", type=int, default=20, help="Print tables every N completed chunks")
+    parser.add_argument("--json", dest="json_path", help="Write final percentile tables to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        target_realm = CultivationRealm(args.target)
+    except ValueError:
+        parser.error(f"Unknown realm: {args.target}")
+
+    stats = simulate(args.lifecycles, args.focus, target_realm, args.max_sessions, args.workers,
+                     args.seed, args.chunk_size, args.report_every, output=sys.stdout)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,9 +3,12 @@ Spirit Stone System for Cultivation Game
 Manages spirit stones as currency for effect resolution and future economy
 """
 
+import math
+from contextlib import contextmanager
 from enum import Enum
-from typing import Dict, List, Optional, Tuple
-import random
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from rng import GameRNG, default_rng
 
 class SpiritStoneGrade(Enum):
     LOW = "Low-Grade"
@@ -14,6 +17,132 @@ class SpiritStoneGrade(Enum):
     PEAK = "Peak-Grade"
     DIVINE = "Divine-Grade"
 
+# Value of one stone of each grade in low-grade stones
+STONE_VALUES = {
+    SpiritStoneGrade.LOW: 1,
+    SpiritStoneGrade.MID: 10,
+    SpiritStoneGrade.HIGH: 100,
+    SpiritStoneGrade.PEAK: 1000,
+    SpiritStoneGrade.DIVINE: 10000
+}
+GRADES_DESCENDING = tuple(reversed(SpiritStoneGrade))
+
+
+class InsufficientSpiritStones(ValueError):
+    """Raised inside a stone transaction when a debit can't be covered"""
+
+
+def cost_value(cost: Dict[SpiritStoneGrade, int]) -> int:
+    """Value of a cost in low-grade stone equivalents"""
+    return sum(amount * STONE_VALUES[grade] for grade, amount in cost.items())
+
+
+class StoneInventory(dict):
+    """
+    Stone count per grade that keeps its low-grade equivalent total current
+    
+    Every grade is always present. Writes adjust total by the changed value
+    (integers only), so reading the wallet's worth never walks the grades.
+    """
+    
+    __slots__ = ("total",)
+    
+    def __init__(self, counts: Optional[Dict[SpiritStoneGrade, int]] = None):
+        super().__init__((grade, 0) for grade in SpiritStoneGrade)
+        self.total = 0
+        if counts:
+            self.update(counts)
+    
+    def __setitem__(self, grade: SpiritStoneGrade, amount: int) -> None:
+        self.total += (amount - self[grade]) * STONE_VALUES[grade]
+        super().__setitem__(grade, amount)
+    
+    def __delitem__(self, grade: SpiritStoneGrade) -> None:
+        self[grade] = 0
+    
+    def update(self, counts=(), **kwargs) -> None:
+        for grade, amount in dict(counts, **kwargs).items():
+            self[grade] = amount
+    
+    def clear(self) -> None:
+        for grade in SpiritStoneGrade:
+            self[grade] = 0
+    
+    def copy(self) -> "StoneInventory":
+        return StoneInventory(self)
+    
+    __copy__ = copy
+    
+    def __reduce__(self):
+        # Rebuild through __init__: restoring items first would run __setitem__ before total exists
+        return StoneInventory, (dict(self),)
+
+
+class StoneTransaction:
+    """
+    Batch of debits and credits applied to a wallet all-or-nothing
+    
+    Changes are applied as they are made, so later debits can spend earlier
+    credits; the first value of every touched grade is remembered so the
+    whole batch can be undone. Journal entries are only written on commit.
+    Use through SpiritStoneManager.transaction().
+    """
+    
+    def __init__(self, manager: "SpiritStoneManager"):
+        self._manager = manager
+        self._original: Dict[SpiritStoneGrade, int] = {}
+        self._movements: List[Tuple[str, Dict[SpiritStoneGrade, int]]] = []
+        self.open = True
+    
+    def _apply(self, changes: Dict[SpiritStoneGrade, int], label: str) -> None:
+        if not self.open:
+            raise RuntimeError("Stone transaction is already closed")
+        inventory = self._manager.inventory
+        for grade, amount in changes.items():
+            if grade not in self._original:
+                self._original[grade] = inventory[grade]
+            inventory[grade] += amount
+        self._movements.append((label, changes))
+    
+    def credit(self, grade: SpiritStoneGrade, amount: int, source: str = "income") -> None:
+        self._apply({grade: amount}, source)
+    
+    def credit_all(self, stones: Dict[SpiritStoneGrade, int], source: str = "income") -> None:
+        self._apply(dict(stones), source)
+    
+    def debit(self, cost: Dict[SpiritStoneGrade, int], label: str = "payment") -> Dict[SpiritStoneGrade, int]:
+        """Pay a cost (making change if needed); returns the applied changes per grade"""
+        changes = self._manager.plan_payment(cost)
+        if changes is None:
+            raise InsufficientSpiritStones(
+                f"Cannot pay {cost_value(cost):,} low-grade equivalent from "
+                f"{self._manager.inventory.total:,}"
+            )
+        self._apply(changes, label)
+        return changes
+    
+    def net_change(self) -> Dict[SpiritStoneGrade, int]:
+        """Stones gained (positive) or spent (negative) per grade so far"""
+        inventory = self._manager.inventory
+        return {grade: inventory[grade] - before for grade, before in self._original.items()
+                if inventory[grade] != before}
+    
+    def commit(self) -> None:
+        journal = self._manager.journal
+        if journal is not None:
+            for label, changes in self._movements:
+                journal.record(label, changes)
+        self._movements.clear()
+        self.open = False
+    
+    def rollback(self) -> None:
+        """Restore every touched grade to its value before the transaction"""
+        self._manager.inventory.update(self._original)
+        self._original.clear()
+        self._movements.clear()
+        self.open = False
+
+
 class SpiritStoneManager:
     """Manages spirit stone inventory and transactions"""
     
@@ -27,104 +156,155 @@ class SpiritStoneManager:
     }
     
     # Exchange rates (how many lower grade = 1 higher grade)
-    EXCHANGE_RATES = {
-        SpiritStoneGrade.LOW: 1,
-        SpiritStoneGrade.MID: 10,
-        SpiritStoneGrade.HIGH: 100,
-        SpiritStoneGrade.PEAK: 1000,
-        SpiritStoneGrade.DIVINE: 10000
-    }
+    EXCHANGE_RATES = STONE_VALUES
     
     def __init__(self):
-        self.inventory: Dict[SpiritStoneGrade, int] = {
-            grade: 0 for grade in SpiritStoneGrade
-        }
+        self.journal = None  # Optional StoneJournal recording every movement
+        self.inventory = StoneInventory()
         # Give starting stones for testing
         self.inventory[SpiritStoneGrade.LOW] = 50
         self.inventory[SpiritStoneGrade.MID] = 15
         self.inventory[SpiritStoneGrade.HIGH] = 3
     
-    def add_stones(self, grade: SpiritStoneGrade, amount: int) -> None:
+    @property
+    def inventory(self) -> StoneInventory:
+        return self._inventory
+    
+    @inventory.setter
+    def inventory(self, counts: Dict[SpiritStoneGrade, int]) -> None:
+        # Plain dicts (e.g. from older code paths) are wrapped so the total stays maintained
+        self._inventory = counts if isinstance(counts, StoneInventory) else StoneInventory(counts)
+    
+    def attach_journal(self, journal) -> None:
+        """
+        Record every later movement in a StoneJournal
+        Any difference between the journal and this wallet is recorded first as an adjustment.
+        """
+        journal.reconcile(self.inventory)
+        self.journal = journal
+    
+    def restore_inventory(self, counts: Dict[SpiritStoneGrade, int], label: str = "restore") -> None:
+        """Set stone counts (e.g. from a save); the difference is journaled as one movement"""
+        self.inventory.update(counts)
+        if self.journal is not None:
+            self.journal.reconcile(self.inventory, label)
+    
+    def add_stones(self, grade: SpiritStoneGrade, amount: int, source: str = "income") -> None:
         """Add spirit stones to inventory"""
         self.inventory[grade] += amount
+        if self.journal is not None:
+            self.journal.record(source, {grade: amount})
     
-    def remove_stones(self, grade: SpiritStoneGrade, amount: int) -> bool:
+    def remove_stones(self, grade: SpiritStoneGrade, amount: int, label: str = "payment") -> bool:
         """Remove spirit stones if available. Returns True if successful."""
         if self.inventory[grade] >= amount:
             self.inventory[grade] -= amount
+            if self.journal is not None:
+                self.journal.record(label, {grade: -amount})
             return True
         return False
     
     def get_total_value_in_low_grade(self) -> int:
         """Calculate total wealth in low-grade stone equivalents"""
-        total = 0
-        for grade, amount in self.inventory.items():
-            total += amount * self.EXCHANGE_RATES[grade]
-        return total
+        return self.inventory.total
     
     def can_afford_cost(self, cost: Dict[SpiritStoneGrade, int]) -> bool:
-        """Check if player can afford a given cost"""
-        # Try exact payment first
-        for grade, amount in cost.items():
-            if self.inventory[grade] < amount:
-                # If can't pay exactly, check if we can convert higher grades
-                return self._can_afford_with_conversion(cost)
-        return True
+        """Check if player can afford a given cost (with change-making if needed)"""
+        return self.inventory.total >= cost_value(cost)
     
-    def _can_afford_with_conversion(self, cost: Dict[SpiritStoneGrade, int]) -> bool:
-        """Check if cost can be paid with grade conversion"""
-        total_cost = 0
-        for grade, amount in cost.items():
-            total_cost += amount * self.EXCHANGE_RATES[grade]
+    def plan_payment(self, cost: Dict[SpiritStoneGrade, int]) -> Optional[Dict[SpiritStoneGrade, int]]:
+        """
+        Changes per grade that pay a cost, or None if it can't be afforded
         
-        return self.get_total_value_in_low_grade() >= total_cost
-    
-    def pay_cost(self, cost: Dict[SpiritStoneGrade, int]) -> bool:
-        """Pay a cost, using grade conversion if needed"""
-        if not self.can_afford_cost(cost):
-            return False
+        The stones named in the cost are used when they are all on hand;
+        otherwise the value is paid exactly with change (see make_change).
+        """
+        inventory = self.inventory
+        if all(inventory[grade] >= amount for grade, amount in cost.items()):
+            return {grade: -amount for grade, amount in cost.items() if amount}
+        return self.make_change(cost_value(cost))
+    
+    def make_change(self, value: int) -> Optional[Dict[SpiritStoneGrade, int]]:
+        """
+        Pay an amount of low-grade value exactly; returns changes per grade or None
         
-        # Try to pay exactly first
-        temp_inventory = self.inventory.copy()
-        exact_payment = True
+        Stones are spent greedily from the highest grade down without
+        overshooting. If that leaves a remainder, the smallest stone still on
+        hand (necessarily worth more than the remainder) is broken and the
+        difference comes back as lower-grade change.
+        """
+        inventory = self.inventory
+        if value > inventory.total:
+            return None
         
-        for grade, amount in cost.items():
-            if temp_inventory[grade] >= amount:
-                temp_inventory[grade] -= amount
-            else:
-                exact_payment = False
+        changes: Dict[SpiritStoneGrade, int] = {}
+        remaining = value
+        for grade in GRADES_DESCENDING:
+            if remaining <= 0:
                 break
+            used = min(inventory[grade], remaining // STONE_VALUES[grade])
+            if used:
+                changes[grade] = -used
+                remaining -= used * STONE_VALUES[grade]
         
-        if exact_payment:
-            self.inventory = temp_inventory
-            return True
+        if remaining:
+            broken = next(grade for grade in SpiritStoneGrade
+                          if inventory[grade] + changes.get(grade, 0) > 0)
+            changes[broken] = changes.get(broken, 0) - 1
+            change = STONE_VALUES[broken] - remaining
+            for grade in GRADES_DESCENDING:
+                if STONE_VALUES[grade] >= STONE_VALUES[broken]:
+                    continue
+                returned, change = divmod(change, STONE_VALUES[grade])
+                if returned:
+                    changes[grade] = changes.get(grade, 0) + returned
         
-        # Need to use conversion
-        return self._pay_with_conversion(cost)
+        return {grade: amount for grade, amount in changes.items() if amount}
     
-    def _pay_with_conversion(self, cost: Dict[SpiritStoneGrade, int]) -> bool:
-        """Pay cost using grade conversion"""
-        total_cost = 0
-        for grade, amount in cost.items():
-            total_cost += amount * self.EXCHANGE_RATES[grade]
-        
-        # Convert from highest to lowest grade
-        remaining_cost = total_cost
-        grades = list(reversed(list(SpiritStoneGrade)))
-        
-        for grade in grades:
-            if remaining_cost <= 0:
-                break
-                
-            stones_available = self.inventory[grade]
-            stone_value = self.EXCHANGE_RATES[grade]
-            
-            if stones_available > 0 and remaining_cost > 0:
-                stones_to_use = min(stones_available, (remaining_cost + stone_value - 1) // stone_value)
-                self.inventory[grade] -= stones_to_use
-                remaining_cost -= stones_to_use * stone_value
+    def pay_cost(self, cost: Dict[SpiritStoneGrade, int], label: str = "payment") -> bool:
+        """Pay a cost, making exact change from other grades if needed"""
+        changes = self.plan_payment(cost)
+        if changes is None:
+            return False
+        inventory = self.inventory
+        for grade, amount in changes.items():
+            inventory[grade] += amount
+        if self.journal is not None:
+            self.journal.record(label, changes)
+        return True
+    
+    @contextmanager
+    def transaction(self) -> Iterator[StoneTransaction]:
+        """
+        Apply a batch of debits and credits atomically
         
-        return remaining_cost <= 0
+        Everything done through the yielded transaction is rolled back if the
+        block raises (including InsufficientSpiritStones from a debit).
+        """
+        transaction = StoneTransaction(self)
+        try:
+            yield transaction
+        except BaseException:
+            transaction.rollback()
+            raise
+        transaction.commit()
+    
+    def settle(self, credits: Optional[Dict[SpiritStoneGrade, int]] = None,
+               debits: Iterable[Dict[SpiritStoneGrade, int]] = (), source: str = "income",
+               debit_labels: Optional[List[str]] = None) -> bool:
+        """
+        Credit stones and pay several costs in one step; nothing changes if any cost can't be paid
+        debit_labels optionally names each cost for the journal (default "payment")
+        """
+        try:
+            with self.transaction() as transaction:
+                if credits:
+                    transaction.credit_all(credits, source)
+                for i, cost in enumerate(debits):
+                    transaction.debit(cost, debit_labels[i] if debit_labels else "payment")
+        except InsufficientSpiritStones:
+            return False
+        return True
     
     def get_display_string(self) -> str:
         """Get formatted display of spirit stone inventory"""
@@ -145,6 +325,19 @@ class SpiritStoneManager:
         return f"{self.get_display_string()} (Total: {total_value:,} 🔸 equivalent)"
 
 
+# What plan_cures optimizes: total exp multiplier recovered within the budget,
+# multiplier recovered per stone spent, or number of effects cured
+CURE_OBJECTIVES = ("multiplier", "efficiency", "count")
+
+
+def _multiplier_value(effect: Dict) -> float:
+    """Additive value of curing an effect: multipliers compound, so this is -log(multiplier)"""
+    multiplier = effect.get('exp_multiplier')
+    if multiplier is None or not 0 < multiplier < 1:
+        return 0.0
+    return -math.log(multiplier)
+
+
 class EffectResolutionSystem:
     """Handles curing negative effects using spirit stones"""
     
@@ -199,10 +392,85 @@ class EffectResolutionSystem:
         if not cost:
             return False
         
-        if self.spirit_stones.pay_cost(cost):
+        if self.spirit_stones.pay_cost(cost, label=f"cure:{effect_name}"):
             return True
         return False
     
+    def cure_effects(self, effect_names: List[str]) -> bool:
+        """Pay for several cures in one transaction; nothing is paid unless every cure is"""
+        costs = [self.get_cure_cost(effect_name) for effect_name in effect_names]
+        if not all(costs):
+            return False
+        return self.spirit_stones.settle(debits=costs,
+                                         debit_labels=[f"cure:{effect_name}" for effect_name in effect_names])
+    
+    def plan_cures(self, effects: List[Dict], budget: Optional[int] = None,
+                   objective: str = "multiplier") -> Dict:
+        """
+        Choose which negative effects to cure within a budget (low-grade equivalents)
+        
+        A 0/1 knapsack over the cures' grade-converted costs. Each effect is
+        worth -log(exp_multiplier), so summed values correspond to the
+        product of the multipliers removed ("count" values every cure at 1).
+        The DP keeps only the Pareto frontier of (cost, value) states, so
+        its size is bounded by the number of distinct useful subsets rather
+        than by the budget. The budget defaults to the whole wallet.
+        """
+        if objective not in CURE_OBJECTIVES:
+            raise ValueError(f"Unknown cure objective: {objective}")
+        if budget is None:
+            budget = self.spirit_stones.get_total_value_in_low_grade()
+        
+        items = []
+        for effect in effects:
+            cost = self.get_cure_cost(effect.get('name')) if effect.get('type') == 'negative' else None
+            if not cost:
+                continue
+            value = 1.0 if objective == "count" else _multiplier_value(effect)
+            price = cost_value(cost)
+            if value > 0 and price <= budget:
+                items.append((effect, cost, price, value))
+        
+        # States are (cost, value, chosen items as a linked (index, parent) chain),
+        # sorted by cost with strictly increasing value
+        frontier = [(0, 0.0, None)]
+        for index, (_, _, price, value) in enumerate(items):
+            extended = [(cost + price, total + value, (index, chain))
+                        for cost, total, chain in frontier if cost + price <= budget]
+            merged = sorted(frontier + extended, key=lambda state: (state[0], -state[1]))
+            frontier = []
+            for state in merged:
+                if not frontier or state[1] > frontier[-1][1] + 1e-12:
+                    frontier.append(state)
+        
+        if objective == "efficiency" and len(frontier) > 1:
+            best = max(frontier[1:], key=lambda state: (state[1] / state[0], state[1]))
+        else:
+            best = frontier[-1]
+        
+        chosen = []
+        chain = best[2]
+        while chain is not None:
+            index, chain = chain
+            chosen.append(items[index])
+        chosen.reverse()
+        
+        return {
+            "objective": objective,
+            "budget": budget,
+            "effects": [effect for effect, _, _, _ in chosen],
+            "costs": [cost for _, cost, _, _ in chosen],
+            "total_cost": best[0],
+            "exp_multiplier_recovered": math.exp(sum(_multiplier_value(effect) for effect, _, _, _ in chosen)),
+        }
+    
+    def execute_cure_plan(self, plan: Dict) -> bool:
+        """Pay for every cure in a plan in one transaction; nothing is paid unless all of them are"""
+        return self.spirit_stones.settle(
+            debits=plan["costs"],
+            debit_labels=[f"cure:{effect['name']}" for effect in plan["effects"]]
+        )
+    
     def get_curable_effects(self, effects: List[Dict]) -> List[Dict]:
         """Get list of effects that can be cured with current stones"""
         curable = []
@@ -231,40 +499,103 @@ class EffectResolutionSystem:
         return "\n".join(lines)
 
 
-def generate_spirit_stone_reward(player_realm: str) -> Dict[SpiritStoneGrade, int]:
+# Spirit stone reward scaling per realm (other realms use 1.0)
+SPIRIT_STONE_REALM_MULTIPLIERS = {
+    "Qi Gathering": 1.0,
+    "Foundation Building": 1.5,
+    "Core Formation": 2.0,
+    "Nascent Soul": 3.0,
+    "Soul Transformation": 4.0,
+}
+
+
+class StoneRewardRoll(NamedTuple):
+    """Chance and count range of one grade in a spirit stone reward"""
+    grade: SpiritStoneGrade
+    chance: float
+    low: int
+    high: int
+    fixed: bool  # Always exactly low stones, without drawing a count
+
+
+@lru_cache(maxsize=None)
+def spirit_stone_reward_table(player_realm: str) -> Tuple[StoneRewardRoll, ...]:
+    """Per-grade reward rolls for a realm, in SpiritStoneGrade order"""
+    multiplier = SPIRIT_STONE_REALM_MULTIPLIERS.get(player_realm, 1.0)
+    return (
+        StoneRewardRoll(SpiritStoneGrade.LOW, 0.7, 1, int(10 * multiplier), False),       # 70% chance for low grade
+        StoneRewardRoll(SpiritStoneGrade.MID, 0.4, 1, int(3 * multiplier), False),         # 40% chance for mid grade
+        StoneRewardRoll(SpiritStoneGrade.HIGH, 0.2, 1, max(1, int(1 * multiplier)), False),  # 20% chance for high grade
+        StoneRewardRoll(SpiritStoneGrade.PEAK, 0.05, 1, 1, True),                          # 5% chance for peak grade
+        # 1% chance for divine (higher realms only)
+        StoneRewardRoll(SpiritStoneGrade.DIVINE, 0.01 if multiplier >= 2.0 else 0.0, 1, 1, True),
+    )
+
+
+def generate_spirit_stone_reward(player_realm: str, rng: Optional[GameRNG] = None) -> Dict[SpiritStoneGrade, int]:
     """Generate spirit stone rewards based on player realm"""
+    if rng is None:
+        rng = default_rng()
     rewards = {}
     
-    # Base rewards scale with realm
-    realm_multipliers = {
-        "Qi Gathering": 1.0,
-        "Foundation Building": 1.5,
-        "Core Formation": 2.0,
-        "Nascent Soul": 3.0,
-        "Soul Transformation": 4.0,
-    }
-    
-    multiplier = realm_multipliers.get(player_realm, 1.0)
-    
     # Random rewards with realm scaling
-    if random.random() < 0.7:  # 70% chance for low grade
-        rewards[SpiritStoneGrade.LOW] = random.randint(1, int(10 * multiplier))
-    
-    if random.random() < 0.4:  # 40% chance for mid grade
-        rewards[SpiritStoneGrade.MID] = random.randint(1, int(3 * multiplier))
-    
-    if random.random() < 0.2:  # 20% chance for high grade
-        rewards[SpiritStoneGrade.HIGH] = random.randint(1, max(1, int(1 * multiplier)))
-    
-    if random.random() < 0.05:  # 5% chance for peak grade
-        rewards[SpiritStoneGrade.PEAK] = 1
-    
-    if random.random() < 0.01 and multiplier >= 2.0:  # 1% chance for divine (higher realms only)
-        rewards[SpiritStoneGrade.DIVINE] = 1
+    for roll in spirit_stone_reward_table(player_realm):
+        if rng.random() < roll.chance:
+            rewards[roll.grade] = roll.low if roll.fixed else rng.randint(roll.low, roll.high)
     
     return rewards
 
 
+def generate_spirit_stone_rewards(player_realm: str, n: int, rng=None, totals_only: bool = False):
+    """
+    Generate n spirit stone rewards at once
+    
+    Returns an n x grades count matrix (a list of rows in SpiritStoneGrade
+    order), or with totals_only just the summed stones per grade. Each grade
+    uses one uniform value per reward: it decides whether the grade drops
+    and, rescaled, how many stones. The distribution matches n calls to
+    generate_spirit_stone_reward, drawn as one pool per grade instead (with a
+    NumpyRNG the whole computation runs as array operations).
+    """
+    if rng is None:
+        rng = default_rng()
+    table = spirit_stone_reward_table(player_realm)
+    
+    if hasattr(rng, "generator"):
+        return _generate_spirit_stone_rewards_numpy(table, n, rng, totals_only)
+    
+    columns = []
+    for roll in table:
+        if roll.chance <= 0.0 or n == 0:
+            columns.append([0] * n if not totals_only else 0)
+            continue
+        chance, low = roll.chance, roll.low
+        scale = 0.0 if roll.fixed else (roll.high - roll.low + 1) / chance
+        pool = rng.uniform_pool(n)
+        if totals_only:
+            hits = [u for u in pool if u < chance]
+            columns.append(len(hits) * low + sum(int(u * scale) for u in hits))
+        else:
+            columns.append([low + int(u * scale) if u < chance else 0 for u in pool])
+    
+    if totals_only:
+        return {roll.grade: total for roll, total in zip(table, columns) if total}
+    return [list(row) for row in zip(*columns)]
+
+
+def _generate_spirit_stone_rewards_numpy(table: Tuple[StoneRewardRoll, ...], n: int, rng, totals_only: bool):
+    numpy = rng._numpy
+    chances = numpy.array([roll.chance for roll in table])
+    lows = numpy.array([roll.low for roll in table])
+    scales = numpy.array([0.0 if roll.fixed or roll.chance <= 0.0 else (roll.high - roll.low + 1) / roll.chance
+                          for roll in table])
+    draws = rng.generator.random((n, len(table)))
+    counts = numpy.where(draws < chances, lows + (draws * scales).astype(numpy.int64), 0)
+    if totals_only:
+        return {roll.grade: int(total) for roll, total in zip(table, counts.sum(axis=0)) if total}
+    return counts.tolist()
+
+
 def format_spirit_stone_reward(reward: Dict[SpiritStoneGrade, int]) -> str:
     """Format spirit stone reward for display"""
     if not reward:
@@ -314,4 +645,11 @@ if __name__ == "__main__":
     print("\n=== Reward Generation Demo ===")
     for realm in ["Qi Gathering", "Foundation Building", "Core Formation"]:
         reward = generate_spirit_stone_reward(realm)
-        print(f"{realm}: {format_spirit_stone_reward(reward)}")
\ No newline at end of file
+        print(f"{realm}: {format_spirit_stone_reward(reward)}")    
+    # Copies and pickles of the wallet keep their maintained total
+    import copy
+    import pickle
+    inventory = stone_manager.inventory
+    for clone in (copy.copy(inventory), copy.deepcopy(inventory), pickle.loads(pickle.dumps(inventory))):
+        assert type(clone) is StoneInventory and clone == inventory and clone.total == inventory.total
+    print(f"\nCopy/pickle round trip keeps total: {inventory.total}")
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""
+Spirit Stone Journal for Cultivation Game
+Append-only binary log of every stone movement with periodic inventory snapshots
+"""
+
+import atexit
+import os
+import struct
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from spirit_stones import STONE_VALUES, SpiritStoneGrade
+
+FILE_HEADER = struct.Struct("<4sB")  # magic, version
+JOURNAL_MAGIC = b"CSJ1"
+JOURNAL_VERSION = 2
+
+# Record layouts, each starting with a tag byte
+MOVE = struct.Struct("<BQdHBq")        # tag, sequence, timestamp, label id, grade (| LAST_ROW), amount
+LABEL = struct.Struct("<BHH")          # tag, label id, UTF-8 length (text follows)
+SNAPSHOT = struct.Struct("<BQd" + "q" * len(SpiritStoneGrade))  # tag, sequence, timestamp, count per grade
+MOVE_TAG, LABEL_TAG, SNAPSHOT_TAG = 1, 2, 3
+LAST_ROW = 0x80  # Set on the final row of a movement; a movement without it was torn by a crash
+
+# Sidecar index of snapshot positions, so rebuilding can start at the last one
+INDEX_ENTRY = struct.Struct("<QQ")     # sequence, byte offset
+INDEX_SUFFIX = ".snapshots"
+
+GRADES = tuple(SpiritStoneGrade)
+GRADE_INDEX = {grade: i for i, grade in enumerate(GRADES)}
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+class Movement(NamedTuple):
+    """One journaled stone movement (all grades touched by a single wallet operation)"""
+    sequence: int
+    timestamp: float
+    label: str
+    changes: Dict[SpiritStoneGrade, int]
+    value: int  # Net change in low-grade equivalents
+
+
+def _index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+# Journals still open, flushed by a single exit hook (without keeping them alive)
+_open_journals: "weakref.WeakSet[StoneJournal]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_journals() -> None:
+    for journal in list(_open_journals):
+        journal.flush()
+
+
+class _ChunkReader:
+    """Sequential reader over a file that keeps a window of at least the bytes asked for"""
+
+    def __init__(self, f, offset: int):
+        self._file = f
+        self.buffer = b""
+        self.position = 0
+        self.base = offset  # File offset of buffer[0]
+
+    def ensure(self, size: int) -> bool:
+        """Make size bytes available from position; False if the file ends first"""
+        if self.position + size <= len(self.buffer):
+            return True
+        self.base += self.position
+        parts = [self.buffer[self.position:]]
+        available = len(parts[0])
+        while available < size:
+            chunk = self._file.read(max(CHUNK_SIZE, size - available))
+            if not chunk:
+                break
+            parts.append(chunk)
+            available += len(chunk)
+        self.buffer = b"".join(parts)
+        self.position = 0
+        return available >= size
+
+
+def _scan(path: str, offset: int) -> Iterator[Tuple[int, int, tuple, Optional[str]]]:
+    """
+    Stream raw records from a byte offset: (offset, tag, fields, label text)
+
+    The file is read in CHUNK_SIZE pieces. A record cut short at the end of
+    the file (a write interrupted by a crash) ends the scan without error.
+    """
+    layouts = {MOVE_TAG: MOVE, LABEL_TAG: LABEL, SNAPSHOT_TAG: SNAPSHOT}
+    with open(path, "rb") as f:
+        f.seek(offset)
+        reader = _ChunkReader(f, offset)
+        while reader.ensure(1):
+            position = reader.position
+            tag = reader.buffer[position]
+            layout = layouts.get(tag)
+            if layout is None:
+                raise ValueError(f"Corrupt stone journal record at byte {reader.base + position}")
+            if not reader.ensure(layout.size):
+                return
+            position = reader.position
+            fields = layout.unpack_from(reader.buffer, position)
+            size = layout.size
+            text = None
+            if tag == LABEL_TAG:
+                size += fields[2]
+                if not reader.ensure(size):
+                    return
+                position = reader.position
+                text = reader.buffer[position + layout.size:position + size].decode("utf-8")
+            yield reader.base + position, tag, fields, text
+            reader.position = position + size
+
+
+def _records(path: str, offset: int) -> Iterator[Tuple[int, int, tuple, Any]]:
+    """
+    Stream complete records from a byte offset: (end offset, tag, fields, extra)
+
+    The rows of a movement are combined into one MOVE_TAG record with fields
+    (sequence, timestamp, label id) and the changes per grade as extra, so a
+    movement is applied whole or not at all. A movement missing its last row
+    ends the scan. Label records carry their text as extra.
+    """
+    changes: Optional[Dict[SpiritStoneGrade, int]] = None
+    for start, tag, fields, text in _scan(path, offset):
+        if tag == MOVE_TAG:
+            _, sequence, timestamp, label_id, grade_byte, amount = fields
+            if changes is None:
+                changes = {}
+            grade = GRADES[grade_byte & ~LAST_ROW]
+            changes[grade] = changes.get(grade, 0) + amount
+            if grade_byte & LAST_ROW:
+                yield start + MOVE.size, tag, (sequence, timestamp, label_id), changes
+                changes = None
+        elif changes is not None:
+            raise ValueError(f"Corrupt stone journal record at byte {start}")
+        elif tag == LABEL_TAG:
+            yield start + LABEL.size + fields[2], tag, fields, text
+        else:
+            yield start + SNAPSHOT.size, tag, fields, None
+
+
+def _last_snapshot_offset(path: str) -> int:
+    """Byte offset of the newest snapshot, from the index when it is trustworthy"""
+    index_path = _index_path(path)
+    try:
+        with open(index_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            entries = f.tell() // INDEX_ENTRY.size
+            if entries:
+                f.seek((entries - 1) * INDEX_ENTRY.size)
+                sequence, offset = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+                with open(path, "rb") as journal:
+                    journal.seek(offset)
+                    record = journal.read(SNAPSHOT.size)
+                if len(record) == SNAPSHOT.size:
+                    fields = SNAPSHOT.unpack(record)
+                    if fields[0] == SNAPSHOT_TAG and fields[1] == sequence:
+                        return offset
+    except OSError:
+        pass
+
+    # Missing or stale index: find the last snapshot the slow way
+    last = FILE_HEADER.size
+    for offset, tag, _, _ in _scan(path, FILE_HEADER.size):
+        if tag == SNAPSHOT_TAG:
+            last = offset
+    return last
+
+
+def _check_header(path: str) -> None:
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (JOURNAL_MAGIC, JOURNAL_VERSION):
+        raise ValueError(f"{path} is not a stone journal")
+
+
+def iter_movements(path: str, offset: Optional[int] = None) -> Iterator[Movement]:
+    """
+    Stream movements in journal order (from the start, or from a snapshot offset)
+
+    Rows of the same movement are grouped back together; a torn final movement is left out.
+    """
+    _check_header(path)
+    labels: Dict[int, str] = {}
+    for _, tag, fields, extra in _records(path, FILE_HEADER.size if offset is None else offset):
+        if tag == MOVE_TAG:
+            sequence, timestamp, label_id = fields
+            value = sum(amount * STONE_VALUES[grade] for grade, amount in extra.items())
+            yield Movement(sequence, timestamp, labels[label_id], extra, value)
+        elif tag == LABEL_TAG:
+            labels[fields[1]] = extra
+        else:
+            # Label ids restart after every snapshot
+            labels.clear()
+
+
+def aggregate(path: str, key: Callable[[Movement], Optional[str]]) -> Dict[str, int]:
+    """Sum movement values (low-grade equivalents) per key, skipping movements keyed None"""
+    totals: Dict[str, int] = {}
+    for movement in iter_movements(path):
+        name = key(movement)
+        if name is not None:
+            totals[name] = totals.get(name, 0) + movement.value
+    return totals
+
+
+def income_by_source(path: str) -> Dict[str, int]:
+    """Stones gained per source label, in low-grade equivalents"""
+    return aggregate(path, lambda movement: movement.label if movement.value > 0 else None)
+
+
+def sink_by_effect(path: str) -> Dict[str, int]:
+    """Stones spent on cures per effect name, in low-grade equivalents (as positive values)"""
+    totals = aggregate(path, lambda movement: movement.label[len("cure:"):]
+                       if movement.value < 0 and movement.label.startswith("cure:") else None)
+    return {effect: -value for effect, value in totals.items()}
+
+
+def rebuild(path: str) -> Tuple[Dict[SpiritStoneGrade, int], int]:
+    """Inventory and last sequence number, replayed from the newest snapshot plus the records after it"""
+    _check_header(path)
+    balance = {grade: 0 for grade in GRADES}
+    sequence = 0
+    for _, tag, fields, extra in _records(path, _last_snapshot_offset(path)):
+        if tag == MOVE_TAG:
+            sequence = fields[0]
+            for grade, amount in extra.items():
+                balance[grade] += amount
+        elif tag == SNAPSHOT_TAG:
+            sequence = fields[1]
+            balance = dict(zip(GRADES, fields[3:]))
+    return balance, sequence
+
+
+class StoneJournal:
+    """
+    Append-only journal of spirit stone movements
+
+    Each movement is written as one fixed-size binary record per grade it
+    touches, the last one flagged so a movement torn by a crash is dropped
+    whole on recovery. Movements are labelled with its source ("encounter", "cure:Qi Stagnation",
+    ...). Every snapshot_interval movements the running inventory is
+    written as a snapshot and its position is added to a sidecar index, so
+    the inventory can be rebuilt from the newest snapshot plus the records
+    after it. Label ids are scoped to the records between two snapshots,
+    which keeps every such tail self-contained.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.sequence = 0
+        self.balance: Dict[SpiritStoneGrade, int] = {grade: 0 for grade in GRADES}
+        self._labels: Dict[str, int] = {}
+        self._since_snapshot = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._recover()
+            self._file = open(path, "ab")
+            self._index = open(_index_path(path), "ab")
+        else:
+            self._file = open(path, "wb")
+            self._index = open(_index_path(path), "wb")
+            self._file.write(FILE_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+            self.snapshot()
+        _open_journals.add(self)
+
+    def _recover(self) -> None:
+        """Restore the running state from the newest snapshot and cut off a torn final movement"""
+        _check_header(self.path)
+        end = FILE_HEADER.size
+        for end, tag, fields, extra in _records(self.path, _last_snapshot_offset(self.path)):
+            if tag == MOVE_TAG:
+                self.sequence = fields[0]
+                for grade, amount in extra.items():
+                    self.balance[grade] += amount
+                self._since_snapshot += 1
+            elif tag == LABEL_TAG:
+                self._labels[extra] = fields[1]
+            else:
+                self.sequence = fields[1]
+                self.balance = dict(zip(GRADES, fields[3:]))
+                self._labels.clear()
+                self._since_snapshot = 0
+        if end < os.path.getsize(self.path):
+            os.truncate(self.path, end)
+
+    def _label_id(self, label: str) -> int:
+        label_id = self._labels.get(label)
+        if label_id is None:
+            label_id = len(self._labels)
+            self._labels[label] = label_id
+            text = label.encode("utf-8")
+            self._file.write(LABEL.pack(LABEL_TAG, label_id, len(text)) + text)
+        return label_id
+
+    def record(self, label: str, changes: Dict[SpiritStoneGrade, int]) -> None:
+        """Append one movement (stone count changes per grade)"""
+        changes = {grade: amount for grade, amount in changes.items() if amount}
+        if not changes:
+            return
+        self.sequence += 1
+        label_id = self._label_id(label)
+        timestamp = time.time()
+        last = len(changes) - 1
+        rows = []
+        for row, (grade, amount) in enumerate(changes.items()):
+            grade_byte = GRADE_INDEX[grade] | (LAST_ROW if row == last else 0)
+            rows.append(MOVE.pack(MOVE_TAG, self.sequence, timestamp, label_id, grade_byte, amount))
+            self.balance[grade] += amount
+        self._file.write(b"".join(rows))
+
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self) -> None:
+        """Write the running inventory so later rebuilds can start here"""
+        offset = self._file.tell()
+        self._file.write(SNAPSHOT.pack(SNAPSHOT_TAG, self.sequence, time.time(),
+                                       *(self.balance[grade] for grade in GRADES)))
+        # The snapshot must be in the journal before the index points at it
+        self._file.flush()
+        self._index.write(INDEX_ENTRY.pack(self.sequence, offset))
+        self._labels.clear()
+        self._since_snapshot = 0
+
+    def reconcile(self, inventory: Dict[SpiritStoneGrade, int], label: str = "adjustment") -> None:
+        """Record whatever difference there is between the journal and a wallet as one movement"""
+        self.record(label, {grade: inventory[grade] - self.balance[grade] for grade in GRADES})
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+        self._index.close()
+        _open_journals.discard(self)
+
+    def __enter__(self) -> "StoneJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    from rng import GameRNG
+    from spirit_stones import EffectResolutionSystem, SpiritStoneManager, generate_spirit_stone_reward
+
+    rng = GameRNG(7)
+    wallet = SpiritStoneManager()
+    cures = EffectResolutionSystem(wallet)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stones.journal")
+        with StoneJournal(path, snapshot_interval=100) as journal:
+            wallet.attach_journal(journal)
+            for session in range(1000):
+                for grade, amount in generate_spirit_stone_reward("Core Formation", rng=rng).items():
+                    wallet.add_stones(grade, amount, source="encounter")
+                if session % 50 == 0:
+                    cures.cure_effect(rng.choice(["Qi Stagnation", "Chaotic Qi", "Technique Backlash"]))
+
+        print("=== Stone Journal ===")
+        print(f"Journal size: {os.path.getsize(path):,} bytes")
+        print(f"Income by source: {income_by_source(path)}")
+        print(f"Sink by effect: {sink_by_effect(path)}")
+        inventory, sequence = rebuild(path)
+        print(f"Rebuilt at movement {sequence}: matches wallet = {inventory == dict(wallet.inventory)}")